@@ -2,8 +2,12 @@ from fastapi import APIRouter
 
 from .endpoints.task import router as task_router
 from .endpoints.general import router as general_router
+from .endpoints.submission import router as submission_router
 
 router = APIRouter()
 
 router.include_router(router=general_router, prefix="", tags=["General"])
 router.include_router(router=task_router, prefix="/tasks", tags=["Tasks"])
+router.include_router(
+    router=submission_router, prefix="/submissions", tags=["Submissions"]
+)
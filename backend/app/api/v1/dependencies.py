@@ -1,12 +1,24 @@
 from app.db.database import db_client
 from app.repositories.task import TaskRepository
-from app.services.task import TaskService
+from app.repositories.test_case import TestCaseSetRepository
+from app.services.task import TaskService, task_cache, test_case_cache
+from app.services.submission import SubmissionService, submission_service
+from app.utils.result_cache import result_cache
 from app.core.logger_setup import get_logger
 
 logger = get_logger(__name__)
 
 
 async def get_task_service() -> TaskService:
-    repository = TaskRepository(db_client)
-    service = TaskService(repository)
+    service = TaskService(
+        TaskRepository(db_client),
+        TestCaseSetRepository(db_client),
+        result_cache,
+        task_cache,
+        test_case_cache,
+    )
     return service
+
+
+async def get_submission_service() -> SubmissionService:
+    return submission_service
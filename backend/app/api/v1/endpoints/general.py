@@ -3,8 +3,9 @@ import platform
 from datetime import datetime
 from fastapi import APIRouter, HTTPException
 
-from app.db.database import AsyncMongoDBClient
+from app.db.database import db_client
 from app.core.logger_setup import get_logger
+from app.core.metrics import metrics
 
 logger = get_logger(__name__)
 
@@ -12,8 +13,6 @@ router = APIRouter()
 
 START_TIME = datetime.utcnow()
 
-mongo_client = AsyncMongoDBClient()
-
 
 @router.get(
     "/",
@@ -50,8 +49,8 @@ async def healthcheck() -> dict[str, str]:
         dict[str, str]: Status of the MongoDB connection.
     """
     try:
-        await mongo_client.connect()
-        test_collection = await mongo_client.get_collection("test")
+        await db_client.connect()
+        test_collection = await db_client.get_collection("test")
         await test_collection.count_documents({})
         return {"status": "Healthy", "database": "Connected"}
     except Exception as e:
@@ -59,3 +58,17 @@ async def healthcheck() -> dict[str, str]:
         raise HTTPException(
             status_code=503, detail="Database connection failed."
         ) from e
+
+
+@router.get(
+    "/metrics",
+    response_model=dict[str, float],
+)
+async def get_metrics() -> dict[str, float]:
+    """
+    Metrics endpoint exposing in-process counters and gauges.
+
+    Returns:
+        dict[str, float]: Current value of every metric.
+    """
+    return metrics.snapshot()
@@ -0,0 +1,61 @@
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+
+from app.api.v1.dependencies import get_submission_service
+from app.core.logger_setup import get_logger
+from app.errors.submission_errors import SubmissionNotFound, SubmissionQueueFull
+from app.schemas.code import Code
+from app.schemas.submission import ExecutionOptions, SubmissionSchema
+from app.services.submission import SubmissionService
+
+logger = get_logger(__name__)
+router = APIRouter()
+
+
+@router.post(
+    "/{task_name}",
+    response_model=SubmissionSchema,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def create_submission(
+    task_name: str,
+    code: Code,
+    options: Annotated[ExecutionOptions, Query()],
+    submission_service: Annotated[SubmissionService, Depends(get_submission_service)],
+) -> SubmissionSchema:
+    """
+    Queue user code for execution against a task and return the submission ID.
+
+    Raises:
+        HTTPException: 429 if the submission queue is full.
+    """
+    try:
+        return await submission_service.submit(
+            task_name, code.code, options, code.language
+        )
+    except SubmissionQueueFull as e:
+        logger.warning(f"Submission for task '{task_name}' rejected: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many pending submissions, try again later.",
+            headers={"Retry-After": "1"},
+        ) from e
+
+
+@router.get("/{submission_id}", response_model=SubmissionSchema)
+async def get_submission(
+    submission_id: str,
+    submission_service: Annotated[SubmissionService, Depends(get_submission_service)],
+) -> SubmissionSchema:
+    """
+    Retrieve the status and per-test results of a submission.
+    """
+    try:
+        return await submission_service.get_submission(submission_id)
+    except SubmissionNotFound as e:
+        logger.warning(f"Submission not found: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Submission with id '{submission_id}' not found.",
+        ) from e
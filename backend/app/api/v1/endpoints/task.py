@@ -1,15 +1,33 @@
+import json
+from collections.abc import AsyncIterator
 from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi import APIRouter, HTTPException, Depends, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
 
 from app.api.v1.dependencies import get_task_service
-from app.errors.task_errors import TaskNotFound
+from app.errors.task_errors import (
+    TaskAlreadyExists,
+    TaskNotFound,
+    TaskVersionConflict,
+    TestCaseSetNotFound,
+)
 from app.core.logger_setup import get_logger
-from app.schemas.code import Code
+from app.schemas.bulk import BulkWriteReport
+from app.schemas.code import Code, Language
 from app.services.task import TaskService
-from app.schemas.task import TaskSchema, TaskCreateSchema, TaskUpdateSchema
-from app.utils.task_runner import run_code_in_docker
+from app.schemas.submission import ExecutionOptions, SubmissionResult
+from app.core.config import settings
+from app.schemas.task import (
+    TaskCreateSchema,
+    TaskField,
+    TaskPage,
+    TaskPublicSchema,
+    TaskSchema,
+    TaskUpdateSchema,
+)
+from app.utils.task_runner import run_code_in_docker, stream_test_results
 
 logger = get_logger(__name__)
 router = APIRouter()
@@ -26,15 +44,109 @@ def handle_task_not_found(name: str, exception: TaskNotFound) -> None:
     ) from exception
 
 
-@router.get("/", response_model=list[TaskSchema])
+def handle_task_already_exists(exception: TaskAlreadyExists) -> None:
+    """
+    Handle task already exists exception.
+    """
+    logger.warning(f"Task already exists: {exception}")
+    raise HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail=str(exception),
+    ) from exception
+
+
+def test_cases_not_found_detail(name: str, exception: TestCaseSetNotFound) -> str:
+    """
+    Logs test cases missing for an existing task and describes the problem.
+    """
+    logger.error(f"Test cases of task '{name}' not found: {exception}")
+    return f"The test cases of task '{name}' are missing."
+
+
+def handle_test_cases_not_found(name: str, exception: TestCaseSetNotFound) -> None:
+    """
+    Handle test case set not found exception.
+
+    The task exists but refers to test cases that are not stored, so this is
+    a server-side problem rather than a missing resource.
+    """
+    raise HTTPException(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        detail=test_cases_not_found_detail(name, exception),
+    ) from exception
+
+
+def format_sse(event: str, data: str) -> str:
+    """
+    Formats a single Server-Sent Events message.
+    """
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def stream_submission_events(
+    task: TaskSchema,
+    user_code: str,
+    options: ExecutionOptions,
+    language: Language = Language.PYTHON,
+) -> AsyncIterator[str]:
+    """
+    Yields a ``start`` event, one ``test_case`` event per finished test case and
+    a final ``summary`` event. Failures are reported as an ``error`` event.
+    """
+    total = len(task.test_cases)
+    yield format_sse("start", json.dumps({"task_name": task.name, "total": total}))
+
+    if not task.test_cases:
+        summary = SubmissionResult.no_test_cases(task.name)
+        yield format_sse("summary", summary.model_dump_json())
+        return
+
+    results = []
+    try:
+        async for result in stream_test_results(
+            task, user_code, options, language=language
+        ):
+            results.append(result)
+            yield format_sse("test_case", result.model_dump_json())
+    except Exception as e:
+        logger.exception(f"Streaming execution failed for task '{task.name}'")
+        yield format_sse("error", json.dumps({"detail": type(e).__name__}))
+        return
+
+    summary = SubmissionResult.from_results(task.name, total, results)
+    logger.info(
+        f"Streamed execution completed for task '{task.name}': {summary.summary}"
+    )
+    yield format_sse("summary", summary.model_dump_json())
+
+
+async def stream_error_event(detail: str) -> AsyncIterator[str]:
+    """
+    Yields a single ``error`` event, for submissions that cannot start.
+    """
+    yield format_sse("error", json.dumps({"detail": detail}))
+
+
+@router.get("/", response_model=TaskPage, response_model_exclude_unset=True)
 async def get_all_tasks(
     task_service: Annotated[TaskService, Depends(get_task_service)],
-) -> list[TaskSchema]:
+    limit: Annotated[
+        int, Query(ge=1, le=settings.TASK_PAGE_MAX_SIZE)
+    ] = settings.TASK_PAGE_SIZE,
+    after: Annotated[
+        str | None, Query(description="Name of the last task of the previous page.")
+    ] = None,
+    fields: Annotated[
+        list[TaskField] | None,
+        Query(description="Fields to return besides the name, all by default."),
+    ] = None,
+) -> TaskPage:
     """
-    Retrieve all tasks.
+    Retrieve a page of tasks ordered by name.
+
+    Test cases are never included. Follow ``next_after`` to get the next page.
     """
-    tasks = await task_service.get_all_tasks()
-    return tasks
+    return await task_service.get_tasks_page(limit, after, fields)
 
 
 @router.get("/names", response_model=list[str])
@@ -48,13 +160,44 @@ async def get_all_task_names(
     return task_names
 
 
-@router.get("/{name}", response_model=TaskSchema)
+@router.get("/export", response_class=StreamingResponse)
+async def export_tasks(
+    task_service: Annotated[TaskService, Depends(get_task_service)],
+    after: Annotated[
+        str | None, Query(description="Only export tasks whose name sorts after.")
+    ] = None,
+    fields: Annotated[
+        list[TaskField] | None,
+        Query(description="Fields to export besides the name, all by default."),
+    ] = None,
+) -> StreamingResponse:
+    """
+    Export tasks ordered by name as newline-delimited JSON, one task per line.
+
+    Tasks are read from the database in batches and written out as they
+    arrive, so the export never holds the whole catalogue in memory. Without
+    ``fields`` the tasks include their test cases and can be re-imported
+    through ``POST /tasks/bulk``.
+    """
+
+    async def lines() -> AsyncIterator[str]:
+        async for document in task_service.export_tasks(after, fields):
+            yield json.dumps(document, ensure_ascii=False, default=str) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="tasks.ndjson"'},
+    )
+
+
+@router.get("/{name}", response_model=TaskPublicSchema)
 async def get_task_by_name(  # type: ignore
     name: str,
     task_service: Annotated[TaskService, Depends(get_task_service)],
-) -> TaskSchema:
+) -> TaskPublicSchema:
     """
-    Retrieve a task by its name.
+    Retrieve a task by its name. Test cases are not returned, only examples.
     """
     try:
         return await task_service.get_task_by_name(name)
@@ -62,46 +205,66 @@ async def get_task_by_name(  # type: ignore
         handle_task_not_found(name, e)
 
 
-@router.post("/", response_model=TaskSchema, status_code=status.HTTP_201_CREATED)
-async def create_task(
+@router.post("/", response_model=TaskPublicSchema, status_code=status.HTTP_201_CREATED)
+async def create_task(  # type: ignore
     task_data: TaskCreateSchema,
     task_service: Annotated[TaskService, Depends(get_task_service)],
-) -> TaskSchema:
+) -> TaskPublicSchema:
     """
     Create a new task.
+
+    Raises:
+        HTTPException: 409 if a task with the same name exists.
     """
-    created_task = await task_service.create_task(task_data)
-    return created_task
+    try:
+        return await task_service.create_task(task_data)
+    except TaskAlreadyExists as e:
+        handle_task_already_exists(e)
 
 
-@router.post(
-    "/bulk", response_model=list[TaskSchema], status_code=status.HTTP_201_CREATED
-)
+@router.post("/bulk", response_model=BulkWriteReport)
 async def create_tasks_bulk(
     tasks_data: list[TaskCreateSchema],
     task_service: Annotated[TaskService, Depends(get_task_service)],
-) -> list[TaskSchema]:
+) -> BulkWriteReport:
     """
-    Create multiple tasks in bulk.
+    Create or replace multiple tasks by name.
+
+    Tasks that fail do not stop the others. The report says for every task,
+    in request order, whether it was created, updated or failed.
     """
-    created_tasks = await task_service.create_many_tasks(tasks_data)
-    return created_tasks
+    return await task_service.upsert_many_tasks(tasks_data)
 
 
-@router.put("/{name}", response_model=TaskSchema)
+@router.put("/{name}", response_model=TaskPublicSchema)
 async def update_task(  # type: ignore
     name: str,
     update_data: TaskUpdateSchema,
     task_service: Annotated[TaskService, Depends(get_task_service)],
-) -> TaskSchema:
+    expected_version: Annotated[
+        int | None,
+        Query(ge=0, description="Only update the task if it is at this version."),
+    ] = None,
+) -> TaskPublicSchema:
     """
     Update a task by its name.
+
+    Raises:
+        HTTPException: 404 if the task does not exist, 409 if the name is
+            taken or the task is no longer at ``expected_version``.
     """
     try:
-        updated_task = await task_service.update_task(name, update_data)
+        updated_task = await task_service.update_task(
+            name, update_data, expected_version
+        )
         return updated_task
     except TaskNotFound as e:
         handle_task_not_found(name, e)
+    except TaskAlreadyExists as e:
+        handle_task_already_exists(e)
+    except TaskVersionConflict as e:
+        logger.warning(f"Task version conflict: {e}")
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e)) from e
 
 
 @router.delete("/{name}", status_code=status.HTTP_204_NO_CONTENT)
@@ -123,28 +286,82 @@ async def delete_task(
     tags=["Tasks"],
     response_model=dict[str, str],
 )
-async def send_task(task_name: str, code: Code) -> dict[str, str]:
+async def send_task(  # type: ignore
+    task_name: str,
+    code: Code,
+    options: Annotated[ExecutionOptions, Query()],
+    task_service: Annotated[TaskService, Depends(get_task_service)],
+) -> dict[str, str]:
     """
     Endpoint to execute user code against a specific task.
 
     Args:
         task_name (str): The name of the task.
         code (Code): User-submitted code.
+        options (ExecutionOptions): Execution mode (``all``, ``fail_fast`` or
+            ``first_n`` with ``n``), controls when to stop running test cases.
+        task_service (TaskService): Service used to load the task.
 
     Returns:
         dict[str, Any]: The result of the execution or an error message.
 
     Raises:
-        HTTPException: If execution fails or the task does not exist.
+        HTTPException: 404 if the task does not exist, 500 if its test cases
+            are missing, 422 on validation errors.
     """
     logger.info(f"Received task '{task_name}' with user code.")
     try:
-        result = await run_code_in_docker(task_name, code.code)
-        logger.info(f"Execution completed for task '{task_name}'. Result: {result}")
-        return {"result": result}
+        result = await run_code_in_docker(
+            task_name, code.code, task_service, options, code.language
+        )
+        logger.info(
+            f"Execution completed for task '{task_name}'. Result: {result.summary}"
+        )
+        return {"result": result.summary}
+    except TaskNotFound as e:
+        handle_task_not_found(task_name, e)
+    except TestCaseSetNotFound as e:
+        handle_test_cases_not_found(task_name, e)
     except ValidationError as ve:
         logger.error(f"Validation error for task '{task_name}': {ve}")
         raise HTTPException(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=f"Validation Error: {ve.errors()}",
         ) from ve
+
+
+@router.post(
+    "/send_task/{task_name}/stream",
+    tags=["Tasks"],
+    response_class=StreamingResponse,
+)
+async def send_task_stream(
+    task_name: str,
+    code: Code,
+    options: Annotated[ExecutionOptions, Query()],
+    task_service: Annotated[TaskService, Depends(get_task_service)],
+) -> StreamingResponse:
+    """
+    Endpoint to execute user code against a task, streaming results as Server-Sent Events.
+
+    Each test case is pushed as soon as it finishes, followed by the summary.
+    If the test cases of the task are missing, the stream only holds an
+    ``error`` event.
+
+    Raises:
+        HTTPException: If the task does not exist.
+    """
+    logger.info(f"Received task '{task_name}' with user code for streaming.")
+    events: AsyncIterator[str]
+    try:
+        task = await task_service.get_task_for_execution(task_name)
+        events = stream_submission_events(task, code.code, options, code.language)
+    except TaskNotFound as e:
+        handle_task_not_found(task_name, e)
+    except TestCaseSetNotFound as e:
+        events = stream_error_event(test_cases_not_found_detail(task_name, e))
+    return StreamingResponse(
+        events,
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -30,6 +30,13 @@ class Settings(BaseSettings):
     MONGO_DB_PORT: int
     MONGO_DB_NAME: str
 
+    # mongodb connection pool parameters
+    MONGO_MAX_POOL_SIZE: int = 100
+    MONGO_MIN_POOL_SIZE: int = 4
+    MONGO_MAX_IDLE_TIME_MS: int = 300000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 10000
+    MONGO_COMPRESSORS: str = ""
+
     # application parameters
     BACKEND_HOST: str
     BACKEND_PORT: int
@@ -42,6 +49,64 @@ class Settings(BaseSettings):
     FRONTEND_PORT: int
     USE_HTTPS: bool
 
+    # sandbox parameters
+    SANDBOX_IMAGE: str = "python:3.12-slim"
+    SANDBOX_MEM_LIMIT: str = "128m"
+    SANDBOX_CPU_QUOTA: int = 50000
+    SANDBOX_PIDS_LIMIT: int = 64
+    SANDBOX_MAX_WORKERS: int = 8
+    SANDBOX_PARALLELISM: int = 4
+    SANDBOX_TEST_TIMEOUT_MS: int = 5000
+    SANDBOX_SUBMISSION_TIMEOUT: float = 60
+    SANDBOX_POOL_SIZE: int = 4
+    SANDBOX_POOL_MAX_LIFETIME: int = 300
+    SANDBOX_POOL_MAX_USES: int = 1
+    SANDBOX_POOL_HEALTHCHECK_INTERVAL: int = 30
+    SANDBOX_COMPILE_TIMEOUT: float = 30
+
+    # language parameters
+    MAX_CODE_LENGTH: int = 65536
+    CPP_COMPILE_IMAGE: str = "gcc:14"
+    BUILD_CACHE_SIZE: int = 32
+    BUILD_CACHE_TTL: int = 3600
+
+    # docker client parameters
+    DOCKER_MAX_POOL_SIZE: int = 16
+    DOCKER_TIMEOUT: int = 60
+
+    # execution backend parameters
+    EXECUTION_BACKEND: str = "docker"
+    PROCESS_POOL_SIZE: int = 4
+    PROCESS_PYTHON: str | None = None
+    PROCESS_SANDBOX_USER: str = "nobody"
+    PROCESS_ALLOW_UNPRIVILEGED: bool = False
+    PROCESS_MEMORY_LIMIT_MB: int = 512
+    PROCESS_MAX_OPEN_FILES: int = 64
+    PROCESS_MAX_FILE_SIZE_MB: int = 16
+
+    # submission queue parameters
+    SUBMISSION_QUEUE_SIZE: int = 100
+    SUBMISSION_WORKERS: int = 4
+    SUBMISSION_MAX_RETAINED: int = 1000
+
+    # submission result cache parameters
+    RESULT_CACHE_SIZE: int = 1024
+    RESULT_CACHE_TTL: int = 3600
+    RESULT_CACHE_MONGO_ENABLED: bool = False
+    RESULT_CACHE_MAX_OUTPUT: int = 65536
+
+    # task cache parameters
+    TASK_CACHE_SIZE: int = 256
+    TASK_CACHE_TTL: int = 60
+    TEST_CASE_CACHE_SIZE: int = 32
+    TEST_CASE_CACHE_TTL: int = 3600
+
+    # task list parameters
+    TASK_PAGE_SIZE: int = 50
+    TASK_PAGE_MAX_SIZE: int = 200
+    TASK_EXPORT_BATCH_SIZE: int = 500
+    BULK_WRITE_CHUNK_SIZE: int = 1000
+
     def __init__(self, **kwargs: Any) -> None:
         super().__init__(**kwargs)
         logger.info("Settings initialized successfully")
@@ -0,0 +1,58 @@
+__all__ = [
+    "MetricsRegistry",
+    "metrics",
+]
+
+import threading
+
+
+class MetricsRegistry:
+    """
+    Thread-safe in-process registry of counters and gauges.
+
+    Counters only go up; gauges hold the last value that was set.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[str, float] = {}
+        self._gauges: dict[str, float] = {}
+
+    def increment(self, name: str, value: float = 1.0) -> None:
+        """
+        Increments a counter by the given value.
+        """
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0.0) + value
+
+    def set_gauge(self, name: str, value: float) -> None:
+        """
+        Sets a gauge to the given value.
+        """
+        with self._lock:
+            self._gauges[name] = value
+
+    def get(self, name: str) -> float:
+        """
+        Returns the current value of a counter or gauge, 0 if it was never set.
+        """
+        with self._lock:
+            return self._counters.get(name, self._gauges.get(name, 0.0))
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Returns a copy of all counters and gauges.
+        """
+        with self._lock:
+            return {**self._counters, **self._gauges}
+
+    def reset(self) -> None:
+        """
+        Clears all counters and gauges.
+        """
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = MetricsRegistry()
@@ -4,6 +4,7 @@ from pymongo.asynchronous.collection import AsyncCollection
 
 from app.core.logger_setup import get_logger
 from app.core.config import settings
+from app.db.pool_metrics import PoolMetricsListener
 
 logger = get_logger(__name__)
 
@@ -11,16 +12,41 @@ logger = get_logger(__name__)
 class AsyncMongoDBClient:
     """
     Asynchronous MongoDB client and database access.
+
+    The application shares one client, ``db_client``, and so one connection
+    pool of at most ``max_pool_size`` connections. Operations wait up to
+    ``wait_queue_timeout_ms`` for a free connection, and idle connections
+    are closed after ``max_idle_time_ms``. ``compressors`` is a comma
+    separated list (``zstd``, ``snappy``, ``zlib``), empty to disable wire
+    compression. Pool events are exported as metrics.
+
+    Collection handles are resolved once and reused until the client is
+    closed, since every repository call asks for one.
     """
 
     def __init__(
         self,
         database_name: str = settings.MONGO_DB_NAME,
+        max_pool_size: int = settings.MONGO_MAX_POOL_SIZE,
+        min_pool_size: int = settings.MONGO_MIN_POOL_SIZE,
+        max_idle_time_ms: int = settings.MONGO_MAX_IDLE_TIME_MS,
+        wait_queue_timeout_ms: int = settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        compressors: str = settings.MONGO_COMPRESSORS,
     ):
         self.uri = settings.get_mongo_db_url()
-        self._client: AsyncMongoClient[Any] = AsyncMongoClient(self.uri)
+        options: dict[str, Any] = {
+            "maxPoolSize": max_pool_size,
+            "minPoolSize": min_pool_size,
+            "maxIdleTimeMS": max_idle_time_ms,
+            "waitQueueTimeoutMS": wait_queue_timeout_ms,
+            "event_listeners": [PoolMetricsListener()],
+        }
+        if compressors:
+            options["compressors"] = compressors
+        self._client: AsyncMongoClient[Any] = AsyncMongoClient(self.uri, **options)
         self.database_name = database_name
         self._connected = False
+        self._collections: dict[str, AsyncCollection[dict[str, Any]]] = {}
         logger.info(
             f"Initialized AsyncMongoDBClient with URI: {self.uri} and database: {database_name}"
         )
@@ -45,12 +71,13 @@ class AsyncMongoDBClient:
             raise RuntimeError(
                 "MongoDB client is not connected. Call `connect()` first."
             )
-        logger.info(
-            f"Getting collection '{collection_name}' from database: '{self.database_name}'"
-        )
-        database = self._client[self.database_name]
-        collection = database[collection_name]
-        logger.info(f"Successfully retrieved collection '{collection_name}'")
+        collection = self._collections.get(collection_name)
+        if collection is None:
+            collection = self._client[self.database_name][collection_name]
+            self._collections[collection_name] = collection
+            logger.debug(
+                f"Resolved collection '{collection_name}' from database: '{self.database_name}'"
+            )
         return collection
 
     async def close(self) -> None:
@@ -60,6 +87,7 @@ class AsyncMongoDBClient:
             logger.info(f"Closing MongoDB client at {address}")
             await self._client.close()
             self._connected = False
+            self._collections.clear()
             logger.info("Successfully closed MongoDB client")
         else:
             logger.warning(
@@ -0,0 +1,91 @@
+import threading
+
+from pymongo import monitoring
+
+from app.core.logger_setup import get_logger
+from app.core.metrics import metrics
+
+logger = get_logger(__name__)
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Exports MongoDB connection pool events as metrics.
+
+    Gauges ``mongo_pool_connections``, ``mongo_pool_in_use`` and
+    ``mongo_pool_wait_queue`` hold the open connections, the checked out
+    connections and the operations waiting for one. The checkout latency is
+    exported as ``mongo_pool_checkout_seconds`` over ``mongo_pool_checkouts``
+    and ``mongo_pool_checkout_last_ms``. Failed checkouts are counted by
+    ``mongo_pool_checkout_failures``, and those that gave up waiting also by
+    ``mongo_pool_checkout_timeouts``.
+
+    The driver calls the listener on its own hot path, so every method only
+    updates counters.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._connections = 0
+        self._in_use = 0
+        self._waiting = 0
+
+    def _add(self, connections: int = 0, in_use: int = 0, waiting: int = 0) -> None:
+        with self._lock:
+            self._connections += connections
+            self._in_use += in_use
+            self._waiting += waiting
+            gauges = {
+                "mongo_pool_connections": self._connections,
+                "mongo_pool_in_use": self._in_use,
+                "mongo_pool_wait_queue": self._waiting,
+            }
+        for name, value in gauges.items():
+            metrics.set_gauge(name, value)
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        logger.info(f"MongoDB connection pool created for {event.address}")
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        metrics.increment("mongo_pool_cleared")
+        logger.warning(f"MongoDB connection pool cleared for {event.address}")
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        self._add(connections=1)
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        self._add(connections=-1)
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        self._add(waiting=1)
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        self._add(waiting=-1)
+        metrics.increment("mongo_pool_checkout_failures")
+        if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+            metrics.increment("mongo_pool_checkout_timeouts")
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        self._add(in_use=1, waiting=-1)
+        metrics.increment("mongo_pool_checkouts")
+        if event.duration is not None:
+            metrics.increment("mongo_pool_checkout_seconds", event.duration)
+            metrics.set_gauge("mongo_pool_checkout_last_ms", event.duration * 1000)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        self._add(in_use=-1)
@@ -28,6 +28,26 @@ class NotFoundError(RepositoryError):
         super().__init__(message)
 
 
+class AlreadyExistsError(RepositoryError):
+    """
+    Base class for all "already exists" exceptions.
+    """
+
+    def __init__(self, entity: str, query: dict[str, Any]) -> None:
+        message = f"{entity} with query '{query}' already exists."
+        super().__init__(message)
+
+
+class VersionConflictError(RepositoryError):
+    """
+    Base class for all optimistic concurrency exceptions.
+    """
+
+    def __init__(self, entity: str, query: dict[str, Any], version: int) -> None:
+        message = f"{entity} with query '{query}' is no longer at version {version}."
+        super().__init__(message)
+
+
 class DatabaseConnectionError(RepositoryError):
     """
     Base class for all connection-related exceptions.
@@ -0,0 +1,16 @@
+from app.errors.base import BaseError
+
+
+class SandboxPrivilegeError(BaseError):
+    """
+    Exception raised when a sandbox cannot run code with dropped privileges.
+    """
+
+    def __init__(
+        self,
+        message: str = (
+            "The process backend cannot drop privileges: run it as root or set "
+            "PROCESS_ALLOW_UNPRIVILEGED."
+        ),
+    ) -> None:
+        super().__init__(message)
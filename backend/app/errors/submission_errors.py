@@ -0,0 +1,39 @@
+from typing import Any
+
+from app.errors.base import BaseError, DatabaseConnectionError, NotFoundError
+
+
+class SubmissionNotFound(NotFoundError):
+    """
+    Exception raised when a submission is not found.
+    """
+
+    def __init__(self, submission_id: str) -> None:
+        super().__init__("Submission", {"id": submission_id})
+
+
+class SubmissionQueueFull(BaseError):
+    """
+    Exception raised when the submission queue cannot accept more jobs.
+    """
+
+    def __init__(self, message: str = "Submission queue is full.") -> None:
+        super().__init__(message)
+
+
+class SubmissionResultNotFound(NotFoundError):
+    """
+    Exception raised when a cached submission result is not found.
+    """
+
+    def __init__(self, entity: str, query: dict[str, Any]) -> None:
+        super().__init__(entity, query)
+
+
+class SubmissionResultDatabaseConnectionError(DatabaseConnectionError):
+    """
+    Exception raised when the submission result cache database fails.
+    """
+
+    def __init__(self, message: str = "Failed to connect to the database.") -> None:
+        super().__init__(message)
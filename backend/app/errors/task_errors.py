@@ -1,8 +1,10 @@
 from typing import Any
 
 from app.errors.base import (
+    AlreadyExistsError,
     RepositoryError,
     NotFoundError,
+    VersionConflictError,
     InvalidDataError,
     DatabaseConnectionError,
 )
@@ -25,6 +27,24 @@ class TaskNotFound(NotFoundError):
         super().__init__(entity, query)
 
 
+class TaskAlreadyExists(AlreadyExistsError):
+    """
+    Exception raised when a task with the same name already exists.
+    """
+
+    def __init__(self, entity: str, query: dict[str, Any]) -> None:
+        super().__init__(entity, query)
+
+
+class TaskVersionConflict(VersionConflictError):
+    """
+    Exception raised when a task was changed since the version being updated.
+    """
+
+    def __init__(self, entity: str, query: dict[str, Any], version: int) -> None:
+        super().__init__(entity, query, version)
+
+
 class TaskDatabaseConnectionError(DatabaseConnectionError):
     """
     Exception raised when a database connection fails.
@@ -34,6 +54,24 @@ class TaskDatabaseConnectionError(DatabaseConnectionError):
         super().__init__(message)
 
 
+class TestCaseSetNotFound(NotFoundError):
+    """
+    Exception raised when the test cases a task refers to are not stored.
+    """
+
+    def __init__(self, entity: str, query: dict[str, Any]) -> None:
+        super().__init__(entity, query)
+
+
+class TestCaseSetDatabaseConnectionError(DatabaseConnectionError):
+    """
+    Exception raised when the test case database fails.
+    """
+
+    def __init__(self, message: str = "Failed to connect to the database.") -> None:
+        super().__init__(message)
+
+
 class InvalidTaskDataError(InvalidDataError):
     """
     Exception raised when invalid task data is provided.
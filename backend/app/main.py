@@ -1,3 +1,4 @@
+import docker
 import uvicorn
 
 from contextlib import asynccontextmanager
@@ -8,6 +9,16 @@ from starlette.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
 from app.db.database import db_client
+from app.repositories.submission_result import SubmissionResultRepository
+from app.repositories.task import TaskRepository
+from app.services.submission import submission_service
+from app.utils.docker_client import docker_client
+from app.utils.repository import ensure_indexes
+from app.utils.task_runner import (
+    execution_backends,
+    get_default_backend,
+    sandbox_executor,
+)
 from app.middlewares.exception_middleware import ExceptionMiddleware
 from app.middlewares.logging_middleware import LoggingMiddleware
 from app.core.logger_setup import get_logger
@@ -21,7 +32,21 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
     logger.info("Starting up the application...")
     await db_client.connect()
     logger.info("MongoDB client initialized and connected.")
+    await ensure_indexes(
+        [TaskRepository(db_client), SubmissionResultRepository(db_client)]
+    )
+    try:
+        docker_client.connect()
+    except docker.errors.DockerException as e:
+        logger.warning(f"Docker is not available, sandboxes will retry: {e}")
+    get_default_backend().start()
+    await submission_service.start()
     yield
+    await submission_service.stop()
+    sandbox_executor.shutdown()
+    for backend in execution_backends.values():
+        backend.stop()
+    docker_client.close()
     await db_client.close()
     logger.info("MongoDB client closed.")
     logger.info("Shutting down the application...")
@@ -0,0 +1,37 @@
+from pymongo import ASCENDING, IndexModel
+
+from app.db.database import AsyncMongoDBClient
+from app.errors.submission_errors import (
+    SubmissionResultNotFound,
+    SubmissionResultDatabaseConnectionError,
+)
+from app.utils.repository import MongoDBRepository
+
+
+class SubmissionResultRepository(MongoDBRepository):
+    """
+    Repository class for cached submission results.
+
+    Results are invalidated by task name, and MongoDB removes them once
+    ``expires_at`` has passed.
+    """
+
+    indexes = (
+        IndexModel([("task_name", ASCENDING)], name="task_name"),
+        IndexModel(
+            [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+        ),
+    )
+
+    def __init__(
+        self,
+        db_client: AsyncMongoDBClient,
+        collection_name: str = "submission_results",
+    ) -> None:
+        super().__init__(
+            db_client=db_client,
+            collection_name=collection_name,
+            log_name="submission result",
+            not_found_error=SubmissionResultNotFound,
+            database_connection_error=SubmissionResultDatabaseConnectionError,
+        )
@@ -1,6 +1,13 @@
 import asyncio
 
-from app.errors.task_errors import TaskNotFound, TaskDatabaseConnectionError
+from pymongo import ASCENDING, IndexModel
+
+from app.errors.task_errors import (
+    TaskAlreadyExists,
+    TaskNotFound,
+    TaskDatabaseConnectionError,
+    TaskVersionConflict,
+)
 from app.db.database import AsyncMongoDBClient
 from app.core.logger_setup import get_logger
 from app.utils.repository import MongoDBRepository
@@ -11,8 +18,14 @@ logger = get_logger(__name__)
 class TaskRepository(MongoDBRepository):
     """
     Repository class for managing tasks.
+
+    Tasks are looked up, updated and deleted by name, which is unique.
+    Every update increments the task's ``version``.
     """
 
+    indexes = (IndexModel([("name", ASCENDING)], name="name_unique", unique=True),)
+    version_field = "version"
+
     def __init__(
         self,
         db_client: AsyncMongoDBClient,
@@ -24,6 +37,8 @@ class TaskRepository(MongoDBRepository):
             log_name="task",
             not_found_error=TaskNotFound,
             database_connection_error=TaskDatabaseConnectionError,
+            already_exists_error=TaskAlreadyExists,
+            version_conflict_error=TaskVersionConflict,
         )
 
 
@@ -0,0 +1,30 @@
+from app.db.database import AsyncMongoDBClient
+from app.errors.task_errors import (
+    TestCaseSetNotFound,
+    TestCaseSetDatabaseConnectionError,
+)
+from app.utils.repository import MongoDBRepository
+
+
+class TestCaseSetRepository(MongoDBRepository):
+    """
+    Repository class for the test cases of tasks.
+
+    Test case sets are content-addressed: their ``_id`` is the hash of the
+    test cases, so a set is never modified once written and tasks with the
+    same test cases share one set. A set must fit in one MongoDB document
+    (16 MB).
+    """
+
+    def __init__(
+        self,
+        db_client: AsyncMongoDBClient,
+        collection_name: str = "test_case_sets",
+    ) -> None:
+        super().__init__(
+            db_client=db_client,
+            collection_name=collection_name,
+            log_name="test case set",
+            not_found_error=TestCaseSetNotFound,
+            database_connection_error=TestCaseSetDatabaseConnectionError,
+        )
@@ -0,0 +1,39 @@
+from enum import Enum
+
+from pydantic import BaseModel
+
+
+class BulkItemStatus(str, Enum):
+    """
+    Enum representing what a bulk write did with one item.
+    """
+
+    CREATED = "created"
+    UPDATED = "updated"
+    FAILED = "failed"
+
+
+class BulkItemResult(BaseModel):
+    index: int
+    key: str
+    status: BulkItemStatus
+    error: str | None = None
+
+
+class BulkWriteReport(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    items: list[BulkItemResult]
+
+    @classmethod
+    def from_items(cls, items: list[BulkItemResult]) -> "BulkWriteReport":
+        """
+        Builds a report with the number of items per status.
+        """
+        return cls(
+            created=sum(1 for item in items if item.status is BulkItemStatus.CREATED),
+            updated=sum(1 for item in items if item.status is BulkItemStatus.UPDATED),
+            failed=sum(1 for item in items if item.status is BulkItemStatus.FAILED),
+            items=items,
+        )
@@ -1,12 +1,31 @@
+from enum import Enum
+
 from pydantic import BaseModel, Field
 
+from app.core.config import settings
+
+
+class Language(str, Enum):
+    """
+    Enum representing the programming language of a submission.
+    """
+
+    PYTHON = "python"
+    CPP = "cpp"
+
 
 class Code(BaseModel):
     code: str = Field(
         ...,
         title="User Code",
         description="The code to be executed.",
+        max_length=settings.MAX_CODE_LENGTH,
         examples=[
             'number = int(input())\nreversed_number = int(str(number)[::-1])\nprint(f"{number} + {reversed_number} = {number + reversed_number}")',
         ],
     )
+    language: Language = Field(
+        default=Language.PYTHON,
+        title="Language",
+        description="The programming language the code is written in.",
+    )
@@ -0,0 +1,128 @@
+from datetime import datetime
+from enum import Enum
+
+from pydantic import BaseModel, Field
+
+
+class Verdict(str, Enum):
+    """
+    Enum representing the outcome of a single test case.
+    """
+
+    ACCEPTED = "ACCEPTED"
+    WRONG_ANSWER = "WRONG_ANSWER"
+    RUNTIME_ERROR = "RUNTIME_ERROR"
+    COMPILATION_ERROR = "COMPILATION_ERROR"
+    TIME_LIMIT_EXCEEDED = "TIME_LIMIT_EXCEEDED"
+    MEMORY_LIMIT_EXCEEDED = "MEMORY_LIMIT_EXCEEDED"
+    SKIPPED = "SKIPPED"
+
+
+class ExecutionMode(str, Enum):
+    """
+    Enum representing when to stop running test cases.
+
+    ``all`` runs every test case, ``fail_fast`` stops after the first failure
+    and ``first_n`` stops after the first ``n`` failures.
+    """
+
+    ALL = "all"
+    FAIL_FAST = "fail_fast"
+    FIRST_N = "first_n"
+
+
+class ExecutionOptions(BaseModel):
+    mode: ExecutionMode = ExecutionMode.ALL
+    n: int = Field(
+        default=1,
+        ge=1,
+        description="Number of failures after which 'first_n' stops.",
+    )
+    parallel: bool = Field(
+        default=False,
+        description="Spread the test cases over several sandboxes.",
+    )
+
+    @property
+    def max_failures(self) -> int | None:
+        """
+        Number of failed test cases after which execution stops, None for no limit.
+        """
+        if self.mode is ExecutionMode.FAIL_FAST:
+            return 1
+        if self.mode is ExecutionMode.FIRST_N:
+            return self.n
+        return None
+
+
+class TestCaseResult(BaseModel):
+    index: int
+    verdict: Verdict
+    output: str = ""
+    error: str | None = None
+    wall_time_ms: float | None = None
+    cpu_time_ms: float | None = None
+    peak_memory_kb: int | None = None
+
+    @property
+    def passed(self) -> bool:
+        return self.verdict is Verdict.ACCEPTED
+
+
+class SubmissionResult(BaseModel):
+    task_name: str
+    passed: int
+    total: int
+    summary: str
+    results: list[TestCaseResult]
+
+    @classmethod
+    def no_test_cases(cls, task_name: str) -> "SubmissionResult":
+        """
+        Builds the result returned for a task that has no test cases.
+        """
+        return cls(
+            task_name=task_name,
+            passed=0,
+            total=0,
+            summary="Warning: No test cases found.",
+            results=[],
+        )
+
+    @classmethod
+    def from_results(
+        cls, task_name: str, total: int, results: list[TestCaseResult]
+    ) -> "SubmissionResult":
+        """
+        Builds a submission result and its human-readable summary.
+        """
+        passed = sum(1 for result in results if result.passed)
+        percentage = (passed / total) * 100 if total > 0 else 0
+        return cls(
+            task_name=task_name,
+            passed=passed,
+            total=total,
+            summary=f"{passed} out of {total} tests passed ({percentage:.2f}%).",
+            results=results,
+        )
+
+
+class SubmissionStatus(str, Enum):
+    """
+    Enum representing the lifecycle of a queued submission.
+    """
+
+    QUEUED = "QUEUED"
+    RUNNING = "RUNNING"
+    COMPLETED = "COMPLETED"
+    FAILED = "FAILED"
+
+
+class SubmissionSchema(BaseModel):
+    id: str
+    task_name: str
+    status: SubmissionStatus
+    created_at: datetime
+    finished_at: datetime | None = None
+    result: SubmissionResult | None = None
+    error: str | None = None
@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from enum import Enum
+
+from pydantic import BaseModel, Field
 
 
 class Example(BaseModel):
@@ -11,17 +13,128 @@ class TestCase(BaseModel):
     expected_output: str
 
 
-class TaskSchema(BaseModel):
+class ExecutionBackendName(str, Enum):
+    """
+    Enum representing where submissions of a task are executed.
+
+    ``docker`` runs them in locked-down containers, ``process`` in local
+    subprocesses with resource limits, for trusted or low-risk tasks.
+    """
+
+    DOCKER = "docker"
+    PROCESS = "process"
+
+
+class ResourceLimits(BaseModel):
+    time_limit_ms: int | None = None
+    memory_limit_mb: int | None = None
+
+
+class TaskContentSchema(BaseModel):
+    """
+    What a task is made of besides its test cases, as clients write it.
+    """
+
     name: str
     description: str
     input: str
     output: str
     examples: list[Example]
+    time_limit_ms: int | None = Field(
+        default=None, gt=0, description="Time limit per test case."
+    )
+    memory_limit_mb: int | None = Field(
+        default=None, gt=0, description="Peak memory limit per test case."
+    )
+    execution_backend: ExecutionBackendName | None = Field(
+        default=None, description="Overrides the default execution backend."
+    )
+
+    @property
+    def limits(self) -> ResourceLimits:
+        return ResourceLimits(
+            time_limit_ms=self.time_limit_ms, memory_limit_mb=self.memory_limit_mb
+        )
+
+
+class TaskPublicSchema(TaskContentSchema):
+    """
+    A task as shown to users: the statement and examples, without test cases.
+    """
+
+    version: int = Field(
+        default=0, ge=0, description="Incremented by every update of the task."
+    )
+
+
+class StoredTaskSchema(TaskPublicSchema):
+    """
+    A task document: test cases are stored apart and referred to by hash.
+
+    ``test_cases_hash`` is None for tasks stored with inline test cases.
+    """
+
+    test_cases_hash: str | None = None
+
+
+class TaskSchema(TaskPublicSchema):
+    """
+    A complete task, test cases included, as created and executed.
+
+    ``test_cases_hash`` is set when the test cases were loaded from their
+    content-addressed set.
+    """
+
     test_cases: list[TestCase]
+    test_cases_hash: str | None = None
+
+
+class TaskField(str, Enum):
+    """
+    Enum representing the task fields a task list can be projected to.
+
+    Test cases are hidden from task lists, so they are not listed.
+    """
+
+    NAME = "name"
+    DESCRIPTION = "description"
+    INPUT = "input"
+    OUTPUT = "output"
+    EXAMPLES = "examples"
+    TIME_LIMIT_MS = "time_limit_ms"
+    MEMORY_LIMIT_MB = "memory_limit_mb"
+    EXECUTION_BACKEND = "execution_backend"
+
+
+class TaskSummarySchema(BaseModel):
+    """
+    A task as shown in task lists: without test cases, possibly projected.
+    """
+
+    name: str
+    description: str | None = None
+    input: str | None = None
+    output: str | None = None
+    examples: list[Example] | None = None
+    time_limit_ms: int | None = None
+    memory_limit_mb: int | None = None
+    execution_backend: ExecutionBackendName | None = None
 
 
-class TaskCreateSchema(TaskSchema):
-    pass
+class TaskPage(BaseModel):
+    items: list[TaskSummarySchema]
+    next_after: str | None = Field(
+        default=None,
+        description="Pass as ``after`` to get the next page, None on the last page.",
+    )
+
+
+class TaskCreateSchema(TaskContentSchema):
+    """
+    A new task. Its version is managed by the server and starts at 0.
+    """
+
+    test_cases: list[TestCase]
 
 
 class TaskUpdateSchema(BaseModel):
@@ -31,6 +144,9 @@ class TaskUpdateSchema(BaseModel):
     output: str | None = None
     examples: list[Example] | None = None
     test_cases: list[TestCase] | None = None
+    time_limit_ms: int | None = Field(default=None, gt=0)
+    memory_limit_mb: int | None = Field(default=None, gt=0)
+    execution_backend: ExecutionBackendName | None = None
 
 
 if __name__ == "__main__":
@@ -0,0 +1,222 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+from app.core.config import settings
+from app.core.logger_setup import get_logger
+from app.core.metrics import metrics
+from app.db.database import db_client
+from app.errors.submission_errors import SubmissionNotFound, SubmissionQueueFull
+from app.errors.task_errors import TaskNotFound
+from app.repositories.task import TaskRepository
+from app.repositories.test_case import TestCaseSetRepository
+from app.schemas.code import Language
+from app.schemas.submission import (
+    ExecutionOptions,
+    SubmissionSchema,
+    SubmissionStatus,
+)
+from app.services.task import TaskService, task_cache, test_case_cache
+from app.utils.result_cache import result_cache
+from app.utils.task_runner import run_code_in_docker
+
+logger = get_logger(__name__)
+
+EXECUTION_ERROR = "The submission could not be executed."
+SHUTDOWN_ERROR = "The server shut down before the submission finished."
+
+
+@dataclass
+class SubmissionJob:
+    """
+    Queued unit of work.
+
+    Attributes:
+        submission_id (str): ID of the submission to execute.
+        user_code (str): The user's code.
+        options (ExecutionOptions): Execution mode of the submission.
+        language (Language): Language the code is written in.
+    """
+
+    submission_id: str
+    user_code: str
+    options: ExecutionOptions
+    language: Language = Language.PYTHON
+
+
+class SubmissionService:
+    """
+    Service layer for asynchronous submissions.
+
+    Submissions are put on a bounded in-process queue and drained by a fixed
+    number of worker tasks. When the queue is full new submissions are
+    rejected instead of piling up in memory. Finished submissions are kept
+    for polling until ``max_retained`` newer ones push them out.
+    """
+
+    def __init__(
+        self,
+        task_service: TaskService,
+        max_queue_size: int = settings.SUBMISSION_QUEUE_SIZE,
+        workers: int = settings.SUBMISSION_WORKERS,
+        max_retained: int = settings.SUBMISSION_MAX_RETAINED,
+    ) -> None:
+        self.task_service = task_service
+        self.max_queue_size = max_queue_size
+        self.workers = workers
+        self.max_retained = max_retained
+        self._queue: asyncio.Queue[SubmissionJob] | None = None
+        self._worker_tasks: list[asyncio.Task[None]] = []
+        self._submissions: OrderedDict[str, SubmissionSchema] = OrderedDict()
+
+    async def start(self) -> None:
+        """
+        Creates the queue and starts the worker tasks.
+        """
+        if self._worker_tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._worker_tasks = [
+            asyncio.create_task(self._work(), name=f"submission-worker-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} submission worker(s)")
+
+    async def stop(self) -> None:
+        """
+        Cancels the worker tasks.
+
+        Submissions still queued or running are marked as failed, so clients
+        polling them stop waiting.
+        """
+        for worker in self._worker_tasks:
+            worker.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+        self._queue = None
+        for submission in self._submissions.values():
+            if submission.status in (SubmissionStatus.QUEUED, SubmissionStatus.RUNNING):
+                self._fail(submission, SHUTDOWN_ERROR)
+        logger.info("Stopped submission workers")
+
+    async def submit(
+        self,
+        task_name: str,
+        user_code: str,
+        options: ExecutionOptions | None = None,
+        language: Language = Language.PYTHON,
+    ) -> SubmissionSchema:
+        """
+        Queues a submission and returns it immediately.
+
+        Raises:
+            SubmissionQueueFull: If the queue is full or not running.
+        """
+        if self._queue is None:
+            raise SubmissionQueueFull("Submission queue is not running.")
+
+        submission = SubmissionSchema(
+            id=uuid.uuid4().hex,
+            task_name=task_name,
+            status=SubmissionStatus.QUEUED,
+            created_at=datetime.now(UTC),
+        )
+        try:
+            self._queue.put_nowait(
+                SubmissionJob(
+                    submission.id,
+                    user_code,
+                    options or ExecutionOptions(),
+                    language,
+                )
+            )
+        except asyncio.QueueFull as e:
+            metrics.increment("submissions_rejected")
+            logger.warning(f"Rejected submission for task '{task_name}': queue full")
+            raise SubmissionQueueFull() from e
+
+        self._store(submission)
+        metrics.increment("submissions_queued")
+        metrics.set_gauge("submission_queue_depth", self._queue.qsize())
+        logger.info(f"Queued submission {submission.id} for task '{task_name}'")
+        return submission
+
+    async def get_submission(self, submission_id: str) -> SubmissionSchema:
+        """
+        Retrieve a submission by its ID.
+
+        Raises:
+            SubmissionNotFound: If the submission is unknown or was evicted.
+        """
+        submission = self._submissions.get(submission_id)
+        if submission is None:
+            raise SubmissionNotFound(submission_id)
+        return submission
+
+    @staticmethod
+    def _fail(submission: SubmissionSchema, error: str) -> None:
+        submission.status = SubmissionStatus.FAILED
+        submission.error = error
+        submission.finished_at = datetime.now(UTC)
+        metrics.increment("submissions_failed")
+
+    def _store(self, submission: SubmissionSchema) -> None:
+        self._submissions[submission.id] = submission
+        while len(self._submissions) > self.max_retained:
+            oldest_id, oldest = next(iter(self._submissions.items()))
+            if oldest.status in (SubmissionStatus.QUEUED, SubmissionStatus.RUNNING):
+                break
+            del self._submissions[oldest_id]
+
+    async def _work(self) -> None:
+        """
+        Worker loop: executes queued submissions one at a time.
+        """
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job = await queue.get()
+            metrics.set_gauge("submission_queue_depth", queue.qsize())
+            try:
+                await self._execute(job)
+            finally:
+                queue.task_done()
+
+    async def _execute(self, job: SubmissionJob) -> None:
+        submission = self._submissions.get(job.submission_id)
+        if submission is None:
+            return
+
+        submission.status = SubmissionStatus.RUNNING
+        try:
+            submission.result = await run_code_in_docker(
+                submission.task_name,
+                job.user_code,
+                self.task_service,
+                job.options,
+                job.language,
+            )
+            submission.status = SubmissionStatus.COMPLETED
+            submission.finished_at = datetime.now(UTC)
+            metrics.increment("submissions_completed")
+        except TaskNotFound:
+            self._fail(
+                submission, f"Task with name '{submission.task_name}' not found."
+            )
+        except Exception:
+            # The details stay in the log, they are not for the client.
+            logger.exception(f"Submission {submission.id} failed")
+            self._fail(submission, EXECUTION_ERROR)
+
+
+submission_service = SubmissionService(
+    TaskService(
+        TaskRepository(db_client),
+        TestCaseSetRepository(db_client),
+        result_cache,
+        task_cache,
+        test_case_cache,
+    )
+)
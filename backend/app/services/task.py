@@ -1,21 +1,120 @@
+import hashlib
+import json
+from collections.abc import AsyncIterator
+from typing import Any
+
+from app.core.config import settings
+from app.core.logger_setup import get_logger
 from app.repositories.task import TaskRepository
-from app.schemas.task import TaskSchema, TaskCreateSchema, TaskUpdateSchema
+from app.repositories.test_case import TestCaseSetRepository
+from app.schemas.bulk import BulkItemResult, BulkItemStatus, BulkWriteReport
+from app.schemas.task import (
+    StoredTaskSchema,
+    TaskCreateSchema,
+    TaskField,
+    TaskPage,
+    TaskSchema,
+    TaskSummarySchema,
+    TaskUpdateSchema,
+    TestCase,
+)
+from app.utils.cache import TTLCache
+from app.utils.result_cache import SubmissionResultCache
+
+logger = get_logger(__name__)
 
 
 class TaskService:
     """
     Service layer for task-related operations.
+
+    Test cases are stored apart from the task documents, in content-addressed
+    test case sets, and are only loaded to execute a submission
+    (``get_task_for_execution``). Sets are never modified, so a
+    ``test_case_cache`` keyed by hash never serves stale test cases. Sets are
+    shared between tasks and are kept when a task is deleted or changed.
+
+    With a ``task_cache``, tasks looked up by name are served from memory
+    until they expire or are written through this service. The cache is per
+    process, so writes made by other processes show up after at most
+    ``TASK_CACHE_TTL`` seconds. Cached tasks are shared and must not be
+    modified.
     """
 
-    def __init__(self, task_repository: TaskRepository) -> None:
+    def __init__(
+        self,
+        task_repository: TaskRepository,
+        test_case_repository: TestCaseSetRepository,
+        result_cache: SubmissionResultCache | None = None,
+        task_cache: TTLCache[str, StoredTaskSchema] | None = None,
+        test_case_cache: TTLCache[str, list[TestCase]] | None = None,
+    ) -> None:
         self.task_repository = task_repository
+        self.test_case_repository = test_case_repository
+        self.result_cache = result_cache
+        self.task_cache = task_cache
+        self.test_case_cache = test_case_cache
+
+    async def get_tasks_page(
+        self,
+        limit: int = settings.TASK_PAGE_SIZE,
+        after: str | None = None,
+        fields: list[TaskField] | None = None,
+    ) -> TaskPage:
+        """
+        Retrieve one page of tasks ordered by name, without their test cases.
+
+        Args:
+            limit (int): Maximum number of tasks on the page.
+            after (str | None): Name of the last task of the previous page.
+            fields (list[TaskField] | None): Fields to return besides the name,
+                every field but the test cases by default.
 
-    async def get_all_tasks(self) -> list[TaskSchema]:
+        Returns:
+            TaskPage: The tasks and the cursor of the next page.
         """
-        Retrieve all tasks.
+        # One extra document tells whether there is a next page.
+        documents = await self.task_repository.find_page(
+            limit + 1, after=after, projection=task_projection(fields)
+        )
+        items = [TaskSummarySchema.model_validate(doc) for doc in documents[:limit]]
+        next_after = items[-1].name if len(documents) > limit else None
+        return TaskPage(items=items, next_after=next_after)
+
+    async def export_tasks(
+        self,
+        after: str | None = None,
+        fields: list[TaskField] | None = None,
+        batch_size: int = settings.TASK_EXPORT_BATCH_SIZE,
+    ) -> AsyncIterator[dict[str, Any]]:
         """
-        tasks = await self.task_repository.find_all()
-        return [TaskSchema.model_validate(task) for task in tasks]
+        Iterates over the stored tasks ordered by name, for exports.
+
+        Without ``fields`` the tasks are complete, test cases included, so an
+        export can be loaded back with ``upsert_many_tasks``. The test cases
+        of each batch are fetched with one query.
+
+        Args:
+            after (str | None): Only tasks whose name sorts after this one.
+            fields (list[TaskField] | None): Fields to return besides the name.
+            batch_size (int): Number of tasks fetched from MongoDB at a time.
+
+        Yields:
+            dict[str, Any]: One task document at a time.
+        """
+        projection = task_projection(fields, include_test_cases=True)
+        filter_query = {"name": {"$gt": after}} if after is not None else None
+        batch: list[dict[str, Any]] = []
+        async for document in self.task_repository.iter_all(
+            filter_query, projection, batch_size
+        ):
+            batch.append(document)
+            if len(batch) >= batch_size:
+                for task in await self._attach_test_cases(batch):
+                    yield task
+                batch = []
+        for task in await self._attach_test_cases(batch):
+            yield task
 
     async def get_all_task_names(self) -> list[str]:
         """
@@ -26,44 +125,296 @@ class TaskService:
         )
         return [task["name"] for task in task_names]
 
-    async def get_task_by_name(self, name: str) -> TaskSchema:
+    async def get_task_by_name(self, name: str) -> StoredTaskSchema:
         """
-        Retrieve a specific task by its name.
+        Retrieve a specific task by its name, without its test cases.
         """
-        task = await self.task_repository.find_one({"name": name})
-        return TaskSchema.model_validate(task)
+        if self.task_cache is not None:
+            cached = self.task_cache.get(name)
+            if cached is not None:
+                return cached
+        task = StoredTaskSchema.model_validate(
+            await self.task_repository.find_one(
+                {"name": name}, projection=INLINE_TEST_CASES
+            )
+        )
+        if self.task_cache is not None:
+            self.task_cache.set(name, task)
+        return task
+
+    async def get_task_for_execution(self, name: str) -> TaskSchema:
+        """
+        Retrieve a task by its name together with its test cases.
+
+        Raises:
+            TaskNotFound: If the task does not exist.
+            TestCaseSetNotFound: If its test cases are missing.
+        """
+        task = await self.get_task_by_name(name)
+        test_cases = await self._load_test_cases(task)
+        return TaskSchema.model_validate(
+            {**task.model_dump(), "test_cases": test_cases}
+        )
 
-    async def create_task(self, task_data: TaskCreateSchema) -> TaskSchema:
+    async def create_task(self, task_data: TaskCreateSchema) -> StoredTaskSchema:
         """
         Create a new task.
         """
-        task_dict = task_data.model_dump()
-        created_task = await self.task_repository.add_one(task_dict)
-        return TaskSchema.model_validate(created_task)
+        digest = await self._store_test_cases(task_data.test_cases)
+        created_task = await self.task_repository.add_one(
+            task_document(task_data, digest)
+        )
+        self._invalidate_tasks([task_data.name])
+        return StoredTaskSchema.model_validate(created_task)
 
-    async def update_task(self, name: str, update_data: TaskUpdateSchema) -> TaskSchema:
+    async def update_task(
+        self,
+        name: str,
+        update_data: TaskUpdateSchema,
+        expected_version: int | None = None,
+    ) -> StoredTaskSchema:
         """
         Update an existing task.
+
+        With ``expected_version``, the update only applies if nobody changed
+        the task since that version.
         """
         update_dict = update_data.model_dump(exclude_unset=True)
+        update: dict[str, Any] = update_dict
+        test_cases = update_dict.pop("test_cases", None)
+        if test_cases is not None:
+            update_dict["test_cases_hash"] = await self._store_test_cases(
+                update_data.test_cases or []
+            )
+            # Also drops the inline test cases of tasks stored before the split.
+            update = {"$set": update_dict, "$unset": {"test_cases": ""}}
         updated_task = await self.task_repository.update_one(
-            {"name": name},
-            {"$set": update_dict},
+            {"name": name}, update, expected_version
         )
-        return TaskSchema.model_validate(updated_task)
+        self._invalidate_tasks([name, update_dict.get("name", name)])
+        await self._invalidate_results(name)
+        return StoredTaskSchema.model_validate(updated_task)
 
     async def delete_task(self, name: str) -> None:
         """
         Delete a task by its name.
         """
         await self.task_repository.delete_one({"name": name})
+        self._invalidate_tasks([name])
+        await self._invalidate_results(name)
+
+    async def upsert_many_tasks(
+        self,
+        tasks_data: list[TaskCreateSchema],
+        chunk_size: int = settings.BULK_WRITE_CHUNK_SIZE,
+    ) -> BulkWriteReport:
+        """
+        Create or replace multiple tasks by name.
+
+        Every task is written even if others fail, and the report says for
+        each one whether it was created, updated or failed. A task whose
+        test cases could not be stored is not written.
+        """
+        digests = [hash_test_cases(task.test_cases) for task in tasks_data]
+        set_errors = await self._store_test_case_sets(tasks_data, digests, chunk_size)
+
+        written: list[int] = []
+        documents: list[dict[str, Any]] = []
+        items: list[BulkItemResult] = []
+        for index, (task, digest) in enumerate(zip(tasks_data, digests, strict=True)):
+            if digest in set_errors:
+                items.append(
+                    BulkItemResult(
+                        index=index,
+                        key=task.name,
+                        status=BulkItemStatus.FAILED,
+                        error=f"Test cases not stored: {set_errors[digest]}",
+                    )
+                )
+                continue
+            written.append(index)
+            documents.append(task_document(task, digest))
+
+        task_items = await self.task_repository.bulk_upsert(
+            documents, key="name", chunk_size=chunk_size
+        )
+        # Indexes in the report refer to ``tasks_data``, not ``documents``.
+        items.extend(
+            item.model_copy(update={"index": written[item.index]})
+            for item in task_items
+        )
+        items.sort(key=lambda item: item.index)
+        self._invalidate_tasks([task.name for task in tasks_data])
+        for item in items:
+            if item.status is BulkItemStatus.UPDATED:
+                await self._invalidate_results(item.key)
+        return BulkWriteReport.from_items(items)
+
+    async def _store_test_cases(self, test_cases: list[TestCase]) -> str:
+        """
+        Stores a test case set and returns its hash.
+        """
+        digest = hash_test_cases(test_cases)
+        await self.test_case_repository.upsert_one(
+            {"_id": digest}, make_test_case_set(digest, test_cases)
+        )
+        return digest
+
+    async def _store_test_case_sets(
+        self,
+        tasks_data: list[TaskCreateSchema],
+        digests: list[str],
+        chunk_size: int,
+    ) -> dict[str, str]:
+        """
+        Stores the distinct test case sets of many tasks.
+
+        Returns:
+            dict[str, str]: Errors by hash of the sets that were not stored.
+        """
+        sets = {
+            digest: make_test_case_set(digest, task.test_cases)
+            for digest, task in zip(digests, tasks_data, strict=True)
+        }
+        items = await self.test_case_repository.bulk_upsert(
+            list(sets.values()), key="_id", chunk_size=chunk_size
+        )
+        return {
+            item.key: item.error or "unknown error"
+            for item in items
+            if item.status is BulkItemStatus.FAILED
+        }
 
-    async def create_many_tasks(
-        self, tasks_data: list[TaskCreateSchema]
-    ) -> list[TaskSchema]:
+    async def _load_test_cases(self, task: StoredTaskSchema) -> list[TestCase]:
         """
-        Create multiple tasks.
+        Loads the test cases of a task, from the cache when possible.
         """
-        tasks_dict = [task.model_dump() for task in tasks_data]
-        created_tasks = await self.task_repository.add_many(tasks_dict)
-        return [TaskSchema.model_validate(task) for task in created_tasks]
+        if task.test_cases_hash is None:
+            # Stored before test cases moved out of task documents.
+            document = await self.task_repository.find_one(
+                {"name": task.name}, projection={"test_cases": True}
+            )
+            return parse_test_cases(document.get("test_cases", []))
+
+        digest = task.test_cases_hash
+        if self.test_case_cache is not None:
+            cached = self.test_case_cache.get(digest)
+            if cached is not None:
+                return cached
+        document = await self.test_case_repository.find_one({"_id": digest})
+        test_cases = parse_test_cases(document["test_cases"])
+        if self.test_case_cache is not None:
+            self.test_case_cache.set(digest, test_cases)
+        return test_cases
+
+    async def _attach_test_cases(
+        self, documents: list[dict[str, Any]]
+    ) -> list[dict[str, Any]]:
+        """
+        Replaces the test case hash of task documents with the test cases.
+
+        The sets of all the documents are fetched with one query.
+        """
+        digests = {
+            document["test_cases_hash"]
+            for document in documents
+            if document.get("test_cases_hash") is not None
+        }
+        sets: dict[str, list[dict[str, Any]]] = {}
+        if digests:
+            found = await self.test_case_repository.find_all(
+                {"_id": {"$in": sorted(digests)}}
+            )
+            sets = {document["_id"]: document["test_cases"] for document in found}
+        for document in documents:
+            digest = document.pop("test_cases_hash", None)
+            if digest is not None:
+                document["test_cases"] = sets.get(digest, [])
+        return documents
+
+    def _invalidate_tasks(self, names: list[str]) -> None:
+        """
+        Drops cached copies of tasks that were written.
+        """
+        if self.task_cache is None:
+            return
+        for name in names:
+            self.task_cache.delete(name)
+        logger.debug(f"Invalidated cached task(s): {names}")
+
+    async def _invalidate_results(self, name: str) -> None:
+        """
+        Drops cached submission results of a task whose definition changed.
+        """
+        if self.result_cache is not None:
+            await self.result_cache.invalidate_task(name)
+
+
+INLINE_TEST_CASES = {"test_cases": False}
+
+
+def hash_test_cases(test_cases: list[TestCase]) -> str:
+    """
+    Returns the content hash a test case set is stored under.
+    """
+    payload = json.dumps(
+        [case.model_dump() for case in test_cases],
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def make_test_case_set(digest: str, test_cases: list[TestCase]) -> dict[str, Any]:
+    """
+    Builds the document of a test case set.
+    """
+    return {"_id": digest, "test_cases": [case.model_dump() for case in test_cases]}
+
+
+def parse_test_cases(documents: list[dict[str, Any]]) -> list[TestCase]:
+    """
+    Validates the test cases of a stored set.
+    """
+    return [TestCase.model_validate(document) for document in documents]
+
+
+def task_document(task: TaskCreateSchema, digest: str) -> dict[str, Any]:
+    """
+    Builds the document of a task whose test cases are stored under ``digest``.
+    """
+    return {**task.model_dump(exclude={"test_cases"}), "test_cases_hash": digest}
+
+
+def task_projection(
+    fields: list[TaskField] | None, include_test_cases: bool = False
+) -> dict[str, bool]:
+    """
+    Builds the MongoDB projection of a task list.
+
+    Args:
+        fields (list[TaskField] | None): Fields to return besides the name,
+            every field by default.
+        include_test_cases (bool): Keep the test cases when no fields are given.
+    """
+    if fields:
+        projection = {"_id": False, "name": True}
+        projection.update({field.value: True for field in fields})
+        return projection
+    if include_test_cases:
+        return {"_id": False}
+    return {"_id": False, "test_cases": False, "test_cases_hash": False}
+
+
+task_cache: TTLCache[str, StoredTaskSchema] = TTLCache(
+    name="task_cache",
+    maxsize=settings.TASK_CACHE_SIZE,
+    ttl=settings.TASK_CACHE_TTL,
+)
+
+test_case_cache: TTLCache[str, list[TestCase]] = TTLCache(
+    name="test_case_cache",
+    maxsize=settings.TEST_CASE_CACHE_SIZE,
+    ttl=settings.TEST_CASE_CACHE_TTL,
+)
@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Generic, TypeVar
+
+from app.core.metrics import metrics
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """
+    Thread-safe in-memory LRU cache whose entries expire after ``ttl`` seconds.
+
+    Hits and misses are counted in the metrics registry as ``<name>_hits`` and
+    ``<name>_misses``, and their ratio is kept in the ``<name>_hit_ratio``
+    gauge.
+    """
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: K) -> V | None:
+        """
+        Returns the cached value, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._entries.move_to_end(key)
+            hit_ratio = self._hits / (self._hits + self._misses)
+        metrics.set_gauge(f"{self.name}_hit_ratio", hit_ratio)
+        if entry is None:
+            metrics.increment(f"{self.name}_misses")
+            return None
+        metrics.increment(f"{self.name}_hits")
+        return entry[1]
+
+    def set(self, key: K, value: V) -> None:
+        """
+        Stores a value, evicting the least recently used entries when full.
+        """
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+            size = len(self._entries)
+        metrics.set_gauge(f"{self.name}_size", size)
+
+    def delete(self, key: K) -> None:
+        """
+        Removes a single entry if present.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            size = len(self._entries)
+        metrics.set_gauge(f"{self.name}_size", size)
+
+    def delete_where(self, predicate: Callable[[K], bool]) -> int:
+        """
+        Removes every entry whose key matches the predicate.
+
+        Returns:
+            int: Number of removed entries.
+        """
+        with self._lock:
+            keys = [key for key in self._entries if predicate(key)]
+            for key in keys:
+                del self._entries[key]
+            size = len(self._entries)
+        metrics.set_gauge(f"{self.name}_size", size)
+        return len(keys)
+
+    def clear(self) -> None:
+        """
+        Removes every entry.
+        """
+        with self._lock:
+            self._entries.clear()
+        metrics.set_gauge(f"{self.name}_size", 0)
+
+    @property
+    def hit_ratio(self) -> float:
+        """
+        Share of lookups answered from the cache since it was created.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return self._hits / lookups if lookups else 0.0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
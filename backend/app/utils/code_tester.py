@@ -1,45 +1,148 @@
-def get_testing_code(user_code: str, test_input: str, expected_output: str) -> str:
+import base64
+import io
+import json
+import tarfile
+import time
+from pathlib import Path
+from typing import Any
+
+from app.core.config import settings
+from app.schemas.task import ResourceLimits, TestCase
+from app.utils import harness
+from app.utils.harness import GROUP_PREFIX, RESULT_PREFIX, compile_code
+from app.utils.languages import Build, LanguageSpec
+
+__all__ = [
+    "GROUP_PREFIX",
+    "HARNESS_SOURCE",
+    "RESULT_PREFIX",
+    "check_syntax",
+    "get_source_archive",
+    "get_testing_archive",
+    "get_testing_payload",
+]
+
+HARNESS_SOURCE = Path(harness.__file__).read_bytes()
+
+
+def check_syntax(user_code: str) -> str | None:
     """
-    Generates a Python script to test user code with specified input and expected output.
+    Compiles the user code on the host without running it.
+
+    Uses the same compilation step as the harness, so code rejected here
+    would fail every test case in the sandbox as well.
+
+    Returns:
+        str | None: A description of the compilation error, None if the code compiles.
+    """
+    _, error = compile_code(user_code)
+    return error
+
+
+def get_testing_payload(
+    user_code: str,
+    test_cases: list[TestCase],
+    max_failures: int | None = None,
+    limits: ResourceLimits | None = None,
+    build: Build | None = None,
+) -> bytes:
+    """
+    Encodes a submission as the payload read by the test harness.
+
+    The program part, with the code and the inputs, comes first and is
+    prefixed with its length. The expected outputs follow, so the harness can
+    start the process running the code before it reads them.
+
+    The harness prints one JSON line prefixed with ``RESULT_PREFIX`` per test
+    case, in the order the test cases were given.
 
     Args:
-        user_code (str): The user's Python code as a string.
-        test_input (str): Input to be provided to the user's code.
-        expected_output (str): Expected output from the user's code.
+        user_code (str): The user's code as a string.
+        test_cases (list[TestCase]): Test cases to run.
+        max_failures (int | None): Stop after this many failed test cases.
+        limits (ResourceLimits | None): Resource limits of the task. Without a
+            time limit, ``SANDBOX_TEST_TIMEOUT_MS`` applies.
+        build (Build | None): Artifacts of a compiled submission, run with the
+            language's run command instead of the Python code.
 
     Returns:
-        str: A string representing the testing script.
-    """
-    escaped_user_code = user_code.replace('"', '\\"').replace("'", "\\'")
-
-    test_script = f"""
-import sys
-from io import StringIO
-from unittest.mock import patch
-
-# User-provided code
-user_code = \"\"\"{escaped_user_code}\"\"\"
-
-# Test runner function
-def run_test(input_data, expected_output):
-    try:
-        # Redirect input and capture output
-        with patch("builtins.input", side_effect=input_data.splitlines()), patch(
-            "sys.stdout", new_callable=StringIO
-        ) as mock_stdout:
-            exec(user_code, {{}}, {{"__name__": "__main__"}})
-            result = mock_stdout.getvalue().strip()
-
-        # Compare results
-        print(result, end=' ')
-        if result == expected_output:
-            print("PASS")
-        else:
-            print(f"FAIL: Expected '{{expected_output}}', got '{{result}}'")
-    except Exception as e:
-        print(f"FAIL: Exception occurred - {{e}}")
-
-# Run the test
-run_test('{test_input.replace("'", "\\'")}', '{expected_output.replace("'", "\\'")}')
-"""
-    return test_script
+        bytes: The UTF-8 encoded payload.
+    """
+    limits = limits or ResourceLimits()
+    program: dict[str, Any] = {
+        "code": user_code,
+        "inputs": [case.input for case in test_cases],
+        "max_failures": max_failures,
+        "time_limit_ms": limits.time_limit_ms or settings.SANDBOX_TEST_TIMEOUT_MS,
+        "memory_limit_mb": limits.memory_limit_mb,
+    }
+    if build is not None:
+        program["command"] = list(build.language.run_command)
+        program["files"] = {
+            name: base64.b64encode(content).decode("ascii")
+            for name, content in build.files.items()
+        }
+    header = json.dumps(program).encode("utf-8")
+    expected = json.dumps([case.expected_output for case in test_cases])
+    return b"%d\n" % len(header) + header + expected.encode("utf-8")
+
+
+def get_testing_archive(directory: str) -> bytes:
+    """
+    Builds a tar archive with the harness for ``put_archive``.
+
+    The payload is not part of it: it holds the expected outputs, so it is
+    only ever passed to the harness on stdin.
+
+    Args:
+        directory (str): Name of the directory the harness is placed in.
+
+    Returns:
+        bytes: The uncompressed tar archive.
+    """
+    return make_archive(directory, {"harness.py": HARNESS_SOURCE})
+
+
+def get_source_archive(directory: str, language: LanguageSpec, user_code: str) -> bytes:
+    """
+    Builds a tar archive with the source of a submission to compile.
+
+    The directory is writable by everyone, so the unprivileged sandbox user
+    can write the artifacts next to the source.
+
+    Args:
+        directory (str): Name of the directory the source is placed in.
+        language (LanguageSpec): Language of the submission.
+        user_code (str): The user's code as a string.
+
+    Returns:
+        bytes: The uncompressed tar archive.
+    """
+    return make_archive(
+        directory,
+        {language.source_file: user_code.encode("utf-8")},
+        directory_mode=0o777,
+    )
+
+
+def make_archive(
+    directory: str, files: dict[str, bytes], directory_mode: int = 0o755
+) -> bytes:
+    """
+    Builds an uncompressed tar archive with ``files`` in ``directory``.
+    """
+    buffer = io.BytesIO()
+    now = time.time()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        folder = tarfile.TarInfo(directory)
+        folder.type = tarfile.DIRTYPE
+        folder.mode = directory_mode
+        folder.mtime = now
+        archive.addfile(folder)
+        for name, content in files.items():
+            info = tarfile.TarInfo(f"{directory}/{name}")
+            info.size = len(content)
+            info.mode = 0o644
+            info.mtime = now
+            archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
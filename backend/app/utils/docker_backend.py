@@ -0,0 +1,209 @@
+import io
+import socket
+import tarfile
+import threading
+import uuid
+from collections.abc import Iterable, Iterator
+
+import docker
+from docker.models.containers import Container
+from docker.utils.socket import STDOUT, frames_iter
+
+from app.core.config import settings
+from app.core.logger_setup import get_logger
+from app.schemas.submission import TestCaseResult
+from app.schemas.task import ExecutionBackendName, ResourceLimits, TestCase
+from app.utils.code_tester import (
+    get_source_archive,
+    get_testing_archive,
+    get_testing_payload,
+)
+from app.utils.execution_backend import (
+    BatchResults,
+    ExecutionBackend,
+    iter_lines,
+    kill_after,
+)
+from app.utils.languages import (
+    COMPILE_TIMEOUT_ERROR,
+    Build,
+    LanguageSpec,
+    failed_build,
+)
+from app.utils.sandbox_pool import SandboxPool, sandbox_pool
+
+logger = get_logger(__name__)
+
+
+def kill_container(container: Container) -> None:
+    """
+    Kills a container, ignoring Docker errors.
+    """
+    try:
+        container.kill()
+    except docker.errors.DockerException as e:
+        logger.error(f"Failed to kill container {container.id}: {str(e)}")
+
+
+def exec_with_stdin(
+    container: Container, command: list[str], data: bytes
+) -> Iterator[bytes]:
+    """
+    Runs a command in a container with ``data`` on its stdin.
+
+    ``exec_run`` cannot write to stdin, so the exec is created with the
+    low-level API and ``data`` is sent over its attached socket.
+
+    Yields:
+        bytes: Chunks of the command's stdout, as they arrive.
+    """
+    api = container.client.api
+    exec_id = api.exec_create(
+        container.id, command, stdin=True, stdout=True, stderr=False
+    )["Id"]
+    stream = api.exec_start(exec_id, socket=True)
+    raw = getattr(stream, "_sock", stream)
+    try:
+        raw.sendall(data)
+        raw.shutdown(socket.SHUT_WR)
+        for kind, chunk in frames_iter(stream, tty=False):
+            if kind == STDOUT:
+                yield chunk
+    finally:
+        stream.close()
+
+
+def read_archive_file(chunks: Iterable[bytes]) -> bytes:
+    """
+    Extracts the single file of an archive returned by ``get_archive``.
+    """
+    with tarfile.open(fileobj=io.BytesIO(b"".join(chunks))) as archive:
+        for member in archive.getmembers():
+            extracted = archive.extractfile(member)
+            if extracted is not None:
+                return extracted.read()
+    raise FileNotFoundError("The archive contains no file")
+
+
+class DockerBackend(ExecutionBackend):
+    """
+    Runs the harness in locked-down containers leased from a ``SandboxPool``.
+
+    The harness is copied into the container and the payload with the code
+    and test vectors is written to its stdin, so nothing is generated or
+    passed through argv, and the expected outputs are never stored where the
+    user code could read them. The
+    harness enforces the per-test time limit, and the container is killed
+    once the whole run exceeds ``timeout`` seconds. A killed container is no
+    longer running and is removed by the pool when it is released.
+
+    ``pool`` serves the default sandbox image. Languages running or compiling
+    in other images get a pool of their own on first use, without warm
+    containers.
+    """
+
+    name = ExecutionBackendName.DOCKER
+
+    def __init__(
+        self,
+        pool: SandboxPool = sandbox_pool,
+        timeout: float = settings.SANDBOX_SUBMISSION_TIMEOUT,
+        compile_timeout: float = settings.SANDBOX_COMPILE_TIMEOUT,
+    ) -> None:
+        self.pool = pool
+        self.timeout = timeout
+        self.compile_timeout = compile_timeout
+        self.pools: dict[str, SandboxPool] = {pool.image: pool}
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        self.pool.start()
+
+    def stop(self) -> None:
+        with self._lock:
+            pools = list(self.pools.values())
+        for pool in pools:
+            pool.stop()
+
+    def pool_for(self, image: str) -> SandboxPool:
+        """
+        Returns the pool of an image, creating it on first use.
+        """
+        with self._lock:
+            pool = self.pools.get(image)
+            if pool is None:
+                pool = SandboxPool(
+                    size=0, image=image, docker_client=self.pool.docker_client
+                )
+                self.pools[image] = pool
+            return pool
+
+    def compile(self, language: LanguageSpec, user_code: str) -> Build:
+        assert language.compile_image is not None
+        build_dir = f"build-{uuid.uuid4().hex}"
+        killed = threading.Event()
+
+        try:
+            with self.pool_for(language.compile_image).lease() as container, kill_after(
+                self.compile_timeout, lambda: kill_container(container), killed
+            ):
+                logger.info(
+                    f"Compiling {language.name.value} code in container {container.id}"
+                )
+                container.put_archive(
+                    "/tmp", get_source_archive(build_dir, language, user_code)
+                )
+                exit_code, output = container.exec_run(
+                    list(language.compile_command), workdir=f"/tmp/{build_dir}"
+                )
+                if killed.is_set():
+                    return failed_build(
+                        language, COMPILE_TIMEOUT_ERROR, cacheable=False
+                    )
+                if exit_code != 0:
+                    return failed_build(
+                        language, output.decode("utf-8", errors="replace")
+                    )
+                files = {
+                    name: read_archive_file(
+                        container.get_archive(f"/tmp/{build_dir}/{name}")[0]
+                    )
+                    for name in language.artifacts
+                }
+        except (docker.errors.DockerException, FileNotFoundError) as e:
+            logger.error(f"Compilation failed due to a Docker error: {str(e)}")
+            return failed_build(language, "Compilation failed.", cacheable=False)
+
+        return Build(language=language, files=files)
+
+    def run_batch(
+        self,
+        user_code: str,
+        test_cases: list[TestCase],
+        max_failures: int | None = None,
+        limits: ResourceLimits | None = None,
+        build: Build | None = None,
+    ) -> Iterator[TestCaseResult]:
+        payload = get_testing_payload(
+            user_code, test_cases, max_failures, limits, build
+        )
+        pool = self.pool if build is None else self.pool_for(build.language.image)
+        run_dir = f"run-{uuid.uuid4().hex}"
+        results = BatchResults(len(test_cases), max_failures)
+
+        try:
+            with pool.lease() as container, kill_after(
+                self.timeout, lambda: kill_container(container), results.killed
+            ):
+                logger.info(
+                    f"Running {len(test_cases)} test case(s) in container {container.id}"
+                )
+                container.put_archive("/tmp", get_testing_archive(run_dir))
+                output = exec_with_stdin(
+                    container, ["python", f"/tmp/{run_dir}/harness.py"], payload
+                )
+                yield from results.feed(iter_lines(output))
+        except docker.errors.DockerException as e:
+            logger.error(f"Test run failed due to a Docker error: {str(e)}")
+
+        yield from results.finish()
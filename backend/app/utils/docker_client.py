@@ -0,0 +1,66 @@
+import threading
+
+import docker
+
+from app.core.config import settings
+from app.core.logger_setup import get_logger
+
+logger = get_logger(__name__)
+
+
+class DockerClientManager:
+    """
+    Long-lived Docker client shared by every sandbox.
+
+    The client is created once, in the application lifespan, so the
+    environment is read once and all sandbox threads share one connection
+    pool to the Docker daemon. The pool holds ``max_pool_size`` connections,
+    enough for every sandbox worker plus the pool maintenance thread.
+    """
+
+    def __init__(
+        self,
+        max_pool_size: int = settings.DOCKER_MAX_POOL_SIZE,
+        timeout: int = settings.DOCKER_TIMEOUT,
+    ) -> None:
+        self.max_pool_size = max_pool_size
+        self.timeout = timeout
+        self._client: docker.DockerClient | None = None
+        self._lock = threading.Lock()
+
+    def connect(self) -> docker.DockerClient:
+        """
+        Creates the client if needed and returns it.
+
+        Raises:
+            docker.errors.DockerException: If the Docker daemon is unreachable.
+        """
+        with self._lock:
+            if self._client is None:
+                self._client = docker.from_env(
+                    max_pool_size=self.max_pool_size, timeout=self.timeout
+                )
+                logger.info(
+                    f"Connected to Docker with a pool of {self.max_pool_size} connection(s)"
+                )
+            return self._client
+
+    @property
+    def client(self) -> docker.DockerClient:
+        """
+        The shared client, connected on first use if the lifespan could not.
+        """
+        return self.connect()
+
+    def close(self) -> None:
+        """
+        Closes the client and its connection pool.
+        """
+        with self._lock:
+            client, self._client = self._client, None
+        if client is not None:
+            client.close()
+            logger.info("Closed Docker client")
+
+
+docker_client = DockerClientManager()
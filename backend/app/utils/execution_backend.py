@@ -0,0 +1,224 @@
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+
+from app.core.logger_setup import get_logger
+from app.core.metrics import metrics
+from app.schemas.submission import TestCaseResult, Verdict
+from app.schemas.task import ExecutionBackendName, ResourceLimits, TestCase
+from app.utils.code_tester import RESULT_PREFIX
+from app.utils.languages import Build, LanguageSpec
+
+logger = get_logger(__name__)
+
+MISSING_RESULT_ERROR = "No result reported for this test case."
+SUBMISSION_TIMEOUT_ERROR = "Submission time limit exceeded."
+
+
+class ExecutionBackend(ABC):
+    """
+    Interface for the places the test harness can run in.
+
+    A backend runs the harness for one batch of test cases and turns its
+    output into results. All methods are blocking and are called from the
+    sandbox thread pool.
+    """
+
+    name: ExecutionBackendName
+
+    @abstractmethod
+    def start(self) -> None:
+        """
+        Prepares the backend, e.g. pre-starts sandboxes.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def stop(self) -> None:
+        """
+        Releases everything the backend holds.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def compile(self, language: LanguageSpec, user_code: str) -> Build:
+        """
+        Compiles a submission in a compiled language.
+
+        Compiler errors are reported in the build, not raised.
+
+        Args:
+            language (LanguageSpec): Language of the submission.
+            user_code (str): The user's code as a string.
+
+        Returns:
+            Build: The artifacts, or the compiler output.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def run_batch(
+        self,
+        user_code: str,
+        test_cases: list[TestCase],
+        max_failures: int | None = None,
+        limits: ResourceLimits | None = None,
+        build: Build | None = None,
+    ) -> Iterator[TestCaseResult]:
+        """
+        Runs every test case of a batch sequentially in one sandbox.
+
+        Results are yielded as soon as the harness reports them, and every
+        test case gets exactly one result.
+
+        Args:
+            user_code (str): The user's code as a string.
+            test_cases (list[TestCase]): Test cases to run.
+            max_failures (int | None): Stop after this many failed test cases.
+            limits (ResourceLimits | None): Resource limits of the task.
+            build (Build | None): Artifacts of a compiled submission.
+
+        Yields:
+            TestCaseResult: One result per test case.
+        """
+        raise NotImplementedError
+
+
+def parse_result_line(line: str) -> TestCaseResult | None:
+    """
+    Parses one structured result line printed by the testing script.
+
+    Returns:
+        TestCaseResult | None: The result, or None for unrelated or malformed lines.
+    """
+    if not line.startswith(RESULT_PREFIX):
+        return None
+    try:
+        return TestCaseResult.model_validate_json(line[len(RESULT_PREFIX) :])
+    except ValueError as e:
+        logger.warning(f"Skipping malformed test result line: {line!r} ({e})")
+        return None
+
+
+def missing_result(index: int) -> TestCaseResult:
+    """
+    Result for a test case the testing script never reported (e.g. it crashed).
+    """
+    return TestCaseResult(
+        index=index,
+        verdict=Verdict.RUNTIME_ERROR,
+        error=MISSING_RESULT_ERROR,
+    )
+
+
+def timed_out_result(index: int) -> TestCaseResult:
+    """
+    Result for a test case that did not finish before the sandbox was killed.
+    """
+    return TestCaseResult(
+        index=index,
+        verdict=Verdict.TIME_LIMIT_EXCEEDED,
+        error=SUBMISSION_TIMEOUT_ERROR,
+    )
+
+
+def skipped_result(index: int) -> TestCaseResult:
+    """
+    Result for a test case that was not run because execution stopped early.
+    """
+    return TestCaseResult(
+        index=index,
+        verdict=Verdict.SKIPPED,
+        error="Not run: the failure limit was reached.",
+    )
+
+
+def iter_lines(chunks: Iterable[bytes]) -> Iterator[str]:
+    """
+    Splits a stream of output chunks into decoded lines.
+    """
+    buffer = b""
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace")
+    if buffer:
+        yield buffer.decode("utf-8", errors="replace")
+
+
+class BatchResults:
+    """
+    Turns the harness output of one batch into exactly one result per test case.
+    """
+
+    def __init__(self, total: int, max_failures: int | None = None) -> None:
+        self.total = total
+        self.max_failures = max_failures
+        self.reported: set[int] = set()
+        self.failures = 0
+        self.killed = threading.Event()
+
+    def feed(self, lines: Iterable[str]) -> Iterator[TestCaseResult]:
+        """
+        Yields the results reported in the harness output, ignoring duplicates.
+        """
+        for line in lines:
+            result = parse_result_line(line)
+            if result is None or result.index in self.reported:
+                continue
+            self.reported.add(result.index)
+            if not result.passed:
+                self.failures += 1
+            if result.verdict is Verdict.TIME_LIMIT_EXCEEDED:
+                metrics.increment("time_limit_exceeded")
+            yield result
+
+    def finish(self) -> Iterator[TestCaseResult]:
+        """
+        Yields results for the test cases the harness never reported.
+
+        They are marked as time limit exceeded if the sandbox was killed, as
+        skipped if the failure limit was reached and as runtime errors
+        otherwise.
+        """
+        stopped_early = (
+            self.max_failures is not None and self.failures >= self.max_failures
+        )
+        for idx in range(1, self.total + 1):
+            if idx in self.reported:
+                continue
+            if self.killed.is_set():
+                metrics.increment("time_limit_exceeded")
+                yield timed_out_result(idx)
+            elif stopped_early:
+                yield skipped_result(idx)
+            else:
+                yield missing_result(idx)
+
+
+@contextmanager
+def kill_after(
+    timeout: float, kill: Callable[[], None], killed: threading.Event
+) -> Iterator[None]:
+    """
+    Calls ``kill`` if the ``with`` block is still running after ``timeout`` seconds.
+
+    Killing the sandbox ends its output stream, so a blocked reader returns.
+    ``killed`` is set before ``kill`` is called.
+    """
+
+    def fire() -> None:
+        killed.set()
+        metrics.increment("sandbox_submission_timeouts")
+        logger.warning(f"Killing sandbox after {timeout}s")
+        kill()
+
+    timer = threading.Timer(timeout, fire)
+    timer.daemon = True
+    timer.start()
+    try:
+        yield
+    finally:
+        timer.cancel()
@@ -0,0 +1,574 @@
+"""
+Fixed test harness executed inside the sandbox.
+
+The harness is copied into the sandbox as-is and must only depend on the
+standard library. It reads its payload from stdin, or from the file given as
+the first argument. The first line of the payload holds the length in bytes
+of the program part, a JSON object that follows right after it::
+
+    {
+        "code": "...",
+        "inputs": ["input", ...],
+        "max_failures": null,
+        "time_limit_ms": 5000,
+        "memory_limit_mb": null,
+        "command": null,
+        "files": {}
+    }
+
+The rest of the payload is the JSON list of expected outputs, one per input.
+
+With a ``command``, the submission was compiled beforehand: the ``files``
+(base64 encoded build artifacts) are written to a private directory and the
+command is run there once per test case instead of the Python ``code``.
+
+Optional resource limits, as a JSON object of ``resource.RLIMIT_*`` names to
+values, can be given with ``--limits`` before the payload path. They are
+applied before the payload is read.
+
+The user code is compiled once. The harness then forks a runner, before it
+reads the expected outputs, so they never are in the memory of a process
+running user code. The runner runs every test case in a forked child with
+fresh globals and reports its output, error, CPU time and peak RSS, and
+whether it was killed at the time limit. The harness grades the reports and
+prints one line prefixed with ``RESULT_PREFIX`` per test case, in order. It
+is not dumpable, so the user code, running as the same user, cannot read
+its memory either. The runner starts a test case only when the harness asks
+for it, so nothing runs past ``max_failures``.
+
+Each test case runs in a process group of its own, killed with everything
+left in it once the test case is over. Before a test case runs, the harness
+prints its process group on a line prefixed with ``GROUP_PREFIX``, so the
+caller can kill it too if it has to stop the harness halfway.
+"""
+
+import base64
+import functools
+import json
+import os
+import select
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from io import StringIO
+from types import CodeType
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from resource import struct_rusage
+
+RESULT_PREFIX = "__RESULT__"
+GROUP_PREFIX = "__GROUP__"
+
+MAX_STDERR = 1024
+# Characters of output, and of each error message, reported per test case.
+MAX_OUTPUT = 4096
+
+Outcome = tuple[str, str, str | None]
+# Output and error message of one run of the submission.
+RunOutput = tuple[str, str | None]
+# Runs the submission once with the given input.
+Program = Callable[[str], RunOutput]
+
+PR_SET_DUMPABLE = 4
+
+
+def compile_code(source: str) -> tuple[CodeType | None, str | None]:
+    """
+    Compiles the user code once for the whole submission.
+
+    Returns:
+        tuple[CodeType | None, str | None]: The code object, or None and a
+            description of the compilation error.
+    """
+    try:
+        return compile(source, "<submission>", "exec", dont_inherit=True), None
+    except SyntaxError as e:
+        return None, f"{type(e).__name__}: {e.msg} (line {e.lineno}, column {e.offset})"
+    except (ValueError, RecursionError, MemoryError) as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def execute(code: CodeType, input_data: str) -> RunOutput:
+    """
+    Executes the compiled code once with fresh globals and the given stdin.
+
+    Returns:
+        RunOutput: The output and the error message, None if the code succeeded.
+    """
+    result = ""
+    stdin, stdout = sys.stdin, sys.stdout
+    try:
+        sys.stdin, sys.stdout = StringIO(input_data), StringIO()
+        try:
+            exec(code, {"__name__": "__main__", "__builtins__": __builtins__})
+        except SystemExit as e:
+            if e.code not in (None, 0):
+                raise RuntimeError(f"exit status {e.code}") from None
+        finally:
+            result = sys.stdout.getvalue().strip()
+            sys.stdin, sys.stdout = stdin, stdout
+    except Exception as e:
+        return result, f"Exception occurred - {e}"
+    return result, None
+
+
+def execute_command(command: list[str], cwd: str, input_data: str) -> RunOutput:
+    """
+    Runs a compiled submission once with the given stdin.
+
+    Returns:
+        RunOutput: The output and the error message, None if the run succeeded.
+    """
+    completed = subprocess.run(
+        command,
+        cwd=cwd,
+        input=input_data.encode("utf-8"),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    result = completed.stdout.decode("utf-8", errors="replace").strip()
+    if completed.returncode < 0:
+        return result, f"Killed by signal {-completed.returncode}"
+    if completed.returncode > 0:
+        stderr = completed.stderr.decode("utf-8", errors="replace").strip()
+        message = f"Exit status {completed.returncode}"
+        if stderr:
+            message += f": {stderr[-MAX_STDERR:]}"
+        return result, message
+    return result, None
+
+
+def truncate(text: str, limit: int = MAX_OUTPUT) -> str:
+    """
+    Cuts text down to ``limit`` characters, saying how much was left out.
+    """
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... ({len(text) - limit} more characters)"
+
+
+def grade(result: str, expected: str) -> Outcome:
+    """
+    Compares the output of a successful run with the expected output.
+
+    The whole output is compared, only the reported texts are truncated.
+    """
+    if result == expected:
+        return "ACCEPTED", truncate(result), None
+    return (
+        "WRONG_ANSWER",
+        truncate(result),
+        f"Expected '{truncate(expected)}', got '{truncate(result)}'",
+    )
+
+
+def describe_status(status: int) -> str:
+    """
+    Describes how a test process that reported nothing ended.
+    """
+    if os.WIFSIGNALED(status):
+        return f"Process killed by signal {os.WTERMSIG(status)}"
+    return f"Process exited with status {os.waitstatus_to_exitcode(status)}"
+
+
+def wait_for_child(
+    pid: int, read_fd: int, time_limit_ms: int | None
+) -> tuple[bytes, int, "struct_rusage", bool]:
+    """
+    Collects the child's report and waits for it, killing it at the time limit.
+
+    Returns:
+        tuple[bytes, int, struct_rusage, bool]: The report, the wait status,
+            the resource usage and whether the child was killed.
+    """
+    deadline = None
+    if time_limit_ms is not None:
+        deadline = time.monotonic() + time_limit_ms / 1000
+    chunks: list[bytes] = []
+    reading = True
+    while True:
+        remaining = None if deadline is None else deadline - time.monotonic()
+        if remaining is not None and remaining <= 0:
+            # The child leads its own process group, so this also kills
+            # anything it started.
+            os.killpg(pid, signal.SIGKILL)
+            _, status, usage = os.wait4(pid, 0)
+            return b"".join(chunks), status, usage, True
+        if reading:
+            ready, _, _ = select.select([read_fd], [], [], remaining)
+            if ready:
+                chunk = os.read(read_fd, 65536)
+                chunks.append(chunk)
+                reading = bool(chunk)
+            continue
+        waited, status, usage = os.wait4(pid, 0 if deadline is None else os.WNOHANG)
+        if waited:
+            return b"".join(chunks), status, usage, False
+        time.sleep(0.001)
+
+
+def run_in_child(
+    program: Program,
+    input_data: str,
+    time_limit_ms: int | None = None,
+    private_fds: tuple[int, ...] = (),
+    on_start: Callable[[int], None] | None = None,
+) -> dict[str, Any]:
+    """
+    Runs one test case in a forked child and measures it with ``wait4``.
+
+    The child reports its output and error over a pipe. ``private_fds`` are
+    closed in the child before the user code runs. ``on_start`` is called
+    with the process group of the child once it is forked.
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(read_fd)
+        exit_code = 0
+        try:
+            os.setpgid(0, 0)
+            for fd in private_fds:
+                os.close(fd)
+            output = program(input_data)
+            with os.fdopen(write_fd, "w", encoding="utf-8") as pipe:
+                json.dump(output, pipe)
+        except BaseException:
+            exit_code = 1
+        finally:
+            os._exit(exit_code)
+
+    os.close(write_fd)
+    try:
+        if on_start is not None:
+            on_start(pid)
+        reported, status, usage, killed = wait_for_child(pid, read_fd, time_limit_ms)
+    finally:
+        os.close(read_fd)
+        # Nothing the test case started outlives it.
+        try:
+            os.killpg(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    if killed:
+        result, message = "", None
+    elif reported:
+        result, message = json.loads(reported)
+    else:
+        result, message = "", describe_status(status)
+    return {
+        "output": result,
+        "error": message,
+        "time_limit_exceeded": killed,
+        "cpu_time_ms": round((usage.ru_utime + usage.ru_stime) * 1000, 3),
+        # ru_maxrss is reported in kilobytes on Linux
+        "peak_memory_kb": usage.ru_maxrss,
+    }
+
+
+def run_in_process(program: Program, input_data: str) -> dict[str, Any]:
+    """
+    Fallback for platforms without ``fork``: no isolation, no time limit and
+    no memory figure.
+    """
+    started = time.process_time()
+    result, message = program(input_data)
+    return {
+        "output": result,
+        "error": message,
+        "time_limit_exceeded": False,
+        "cpu_time_ms": round((time.process_time() - started) * 1000, 3),
+        "peak_memory_kb": None,
+    }
+
+
+def judge(
+    run: dict[str, Any],
+    expected: str,
+    time_limit_ms: int | None = None,
+    memory_limit_mb: int | None = None,
+) -> dict[str, Any]:
+    """
+    Turns the report of one run into the result of its test case.
+    """
+    result, message = run["output"], run["error"]
+    if run["time_limit_exceeded"]:
+        verdict = "TIME_LIMIT_EXCEEDED"
+        message = f"Time limit of {time_limit_ms} ms exceeded"
+    elif message is not None:
+        verdict = "RUNTIME_ERROR"
+        result, message = truncate(result), truncate(message)
+    else:
+        verdict, result, message = grade(result, expected)
+
+    peak_memory_kb = run["peak_memory_kb"]
+    if (
+        memory_limit_mb is not None
+        and peak_memory_kb is not None
+        and peak_memory_kb > memory_limit_mb * 1024
+    ):
+        verdict = "MEMORY_LIMIT_EXCEEDED"
+        message = (
+            f"Peak memory {peak_memory_kb / 1024:.1f} MB exceeds {memory_limit_mb} MB"
+        )
+    return {
+        "verdict": verdict,
+        "output": result,
+        "error": message,
+        "cpu_time_ms": run["cpu_time_ms"],
+        "peak_memory_kb": peak_memory_kb,
+    }
+
+
+def serve(
+    program: Program,
+    inputs: list[str],
+    time_limit_ms: int | None,
+    control_fd: int,
+    report_fd: int,
+) -> None:
+    """
+    Runner loop: runs the next test case each time the harness asks for it.
+    """
+    with os.fdopen(report_fd, "w", encoding="utf-8") as reports:
+
+        def announce(group: int) -> None:
+            reports.write(f"{GROUP_PREFIX}{group}\n")
+            reports.flush()
+
+        for input_data in inputs:
+            if not os.read(control_fd, 1):
+                return
+            run = run_in_child(
+                program, input_data, time_limit_ms, (control_fd, report_fd), announce
+            )
+            reports.write(json.dumps(run) + "\n")
+            reports.flush()
+
+
+class Runner:
+    """
+    Forked process running the test cases for the harness.
+
+    It is forked before the expected outputs are read and keeps none of the
+    harness's file descriptors but the two pipes it talks over.
+    """
+
+    def __init__(
+        self,
+        program: Program,
+        inputs: list[str],
+        time_limit_ms: int | None,
+        source_fd: int,
+    ) -> None:
+        control_read, control_write = os.pipe()
+        report_read, report_write = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                for fd in (control_write, report_read, source_fd):
+                    os.close(fd)
+                # Keep the result stream out of reach of the user code.
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, 1)
+                serve(program, inputs, time_limit_ms, control_read, report_write)
+            except BaseException:
+                exit_code = 1
+            finally:
+                os._exit(exit_code)
+
+        os.close(control_read)
+        os.close(report_write)
+        self.pid = pid
+        self.control_fd = control_write
+        self.reports = os.fdopen(report_read, "r", encoding="utf-8")
+
+    def next_run(self) -> dict[str, Any] | None:
+        """
+        Runs the next test case, None if the runner is gone.
+
+        The process group of the test case is passed on to the caller as soon
+        as the runner announces it.
+        """
+        try:
+            os.write(self.control_fd, b"1")
+        except BrokenPipeError:
+            return None
+        line = self.reports.readline()
+        while line.startswith(GROUP_PREFIX):
+            print(line, end="", flush=True)
+            line = self.reports.readline()
+        return json.loads(line) if line else None
+
+    def close(self) -> None:
+        """
+        Tells the runner to stop and waits for it.
+        """
+        os.close(self.control_fd)
+        self.reports.close()
+        os.waitpid(self.pid, 0)
+
+
+def install_files(files: dict[str, str]) -> str:
+    """
+    Writes the build artifacts of a compiled submission to a fresh directory.
+
+    Returns:
+        str: The directory the artifacts were written to.
+    """
+    workdir = tempfile.mkdtemp(prefix="build-")
+    for name, content in files.items():
+        path = os.path.join(workdir, os.path.basename(name))
+        with open(path, "wb") as artifact:
+            artifact.write(base64.b64decode(content))
+        os.chmod(path, 0o755)
+    return workdir
+
+
+def read_exactly(fd: int, size: int) -> bytes:
+    """
+    Reads ``size`` bytes from a file descriptor, or less at end of file.
+    """
+    chunks: list[bytes] = []
+    while size > 0:
+        chunk = os.read(fd, min(size, 65536))
+        if not chunk:
+            break
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_program(fd: int) -> dict[str, Any]:
+    """
+    Reads the program part of the payload, and nothing past it.
+    """
+    length = b""
+    while not length.endswith(b"\n"):
+        byte = os.read(fd, 1)
+        if not byte:
+            break
+        length += byte
+    return dict(json.loads(read_exactly(fd, int(length))))
+
+
+def read_expected(fd: int) -> list[str]:
+    """
+    Reads the rest of the payload: the expected outputs.
+    """
+    chunks = iter(functools.partial(os.read, fd, 65536), b"")
+    return list(json.loads(b"".join(chunks)))
+
+
+def make_private() -> None:
+    """
+    Makes the process and its children non-dumpable, so processes of the
+    same user can neither trace them nor read their memory.
+    """
+    try:
+        import ctypes
+
+        ctypes.CDLL(None).prctl(PR_SET_DUMPABLE, 0, 0, 0, 0)
+    except (OSError, AttributeError):
+        pass
+
+
+def load_program(
+    payload: dict[str, Any],
+) -> tuple[Program | None, str | None, str | None]:
+    """
+    Prepares the submission to run.
+
+    Returns:
+        tuple[Program | None, str | None, str | None]: The program, or None and
+            the compilation error, and the directory of the build artifacts.
+    """
+    if payload.get("command"):
+        workdir = install_files(payload.get("files") or {})
+        return (
+            functools.partial(execute_command, payload["command"], workdir),
+            None,
+            workdir,
+        )
+    code, error = compile_code(payload["code"])
+    if code is None:
+        return None, error, None
+    return functools.partial(execute, code), None, None
+
+
+def run(payload: dict[str, Any], source_fd: int) -> None:
+    """
+    Runs and grades every test case, stopping early once enough of them failed.
+    """
+    program, error, workdir = load_program(payload)
+    inputs = payload["inputs"]
+    max_failures = payload.get("max_failures")
+    time_limit_ms = payload.get("time_limit_ms")
+    memory_limit_mb = payload.get("memory_limit_mb")
+    runner = None
+    failures = 0
+    try:
+        if program is not None and hasattr(os, "fork"):
+            runner = Runner(program, inputs, time_limit_ms, source_fd)
+        expected_outputs = read_expected(source_fd)
+        for index, (input_data, expected) in enumerate(
+            zip(inputs, expected_outputs, strict=True), start=1
+        ):
+            started = time.perf_counter()
+            if program is None:
+                outcome = None
+            elif runner is not None:
+                outcome = runner.next_run()
+                if outcome is None:
+                    break
+            else:
+                outcome = run_in_process(program, input_data)
+            report: dict[str, Any] = (
+                {"verdict": "COMPILATION_ERROR", "output": "", "error": error}
+                if outcome is None
+                else judge(outcome, expected, time_limit_ms, memory_limit_mb)
+            )
+            report["index"] = index
+            report["wall_time_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            print(RESULT_PREFIX + json.dumps(report), flush=True)
+
+            if report["verdict"] != "ACCEPTED":
+                failures += 1
+                if max_failures is not None and failures >= max_failures:
+                    break
+    finally:
+        if runner is not None:
+            runner.close()
+        if workdir is not None:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+
+def apply_limits(limits: dict[str, int]) -> None:
+    """
+    Lowers the resource limits of the harness and of everything it forks.
+    """
+    import resource
+
+    for name, value in limits.items():
+        resource.setrlimit(getattr(resource, name), (value, value))
+
+
+def main() -> None:
+    args = sys.argv[1:]
+    if args[:1] == ["--limits"]:
+        apply_limits(json.loads(args[1]))
+        args = args[2:]
+    make_private()
+    source_fd = os.open(args[0], os.O_RDONLY) if args else sys.stdin.fileno()
+    run(read_program(source_fd), source_fd)
+
+
+if __name__ == "__main__":
+    main()
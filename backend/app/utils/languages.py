@@ -0,0 +1,118 @@
+import hashlib
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.schemas.code import Language
+from app.utils.cache import TTLCache
+
+MAX_COMPILER_OUTPUT = 4096
+COMPILE_TIMEOUT_ERROR = "Compilation time limit exceeded."
+
+
+@dataclass(frozen=True)
+class LanguageSpec:
+    """
+    How submissions in one language are built and run.
+
+    Interpreted languages have no compile command: the harness compiles and
+    runs the source itself. Compiled languages are built once per submission
+    with ``compile_command`` in ``compile_image``, and the harness runs
+    ``run_command`` next to the ``artifacts`` for every test case. The run
+    image hosts the harness, so it must provide a Python interpreter.
+
+    Attributes:
+        name (Language): The language.
+        image (str): Image the test cases run in.
+        source_file (str): File name the source is compiled from.
+        compile_image (str | None): Image with the compiler.
+        compile_command (tuple[str, ...]): Command building the artifacts.
+        run_command (tuple[str, ...]): Command running one test case.
+        artifacts (tuple[str, ...]): Files kept from the build.
+    """
+
+    name: Language
+    image: str
+    source_file: str
+    compile_image: str | None = None
+    compile_command: tuple[str, ...] = ()
+    run_command: tuple[str, ...] = ()
+    artifacts: tuple[str, ...] = ()
+
+    @property
+    def compiled(self) -> bool:
+        return bool(self.compile_command)
+
+
+@dataclass(frozen=True)
+class Build:
+    """
+    Outcome of compiling a submission.
+
+    Attributes:
+        language (LanguageSpec): Language the submission is written in.
+        files (dict[str, bytes]): Artifacts by file name.
+        error (str | None): Compiler output if the build failed.
+        cacheable (bool): False if the build failed for reasons unrelated
+            to the code, e.g. a timeout or a sandbox error.
+    """
+
+    language: LanguageSpec
+    files: dict[str, bytes] = field(default_factory=dict)
+    error: str | None = None
+    cacheable: bool = True
+
+
+LANGUAGES: dict[Language, LanguageSpec] = {
+    Language.PYTHON: LanguageSpec(
+        name=Language.PYTHON,
+        image=settings.SANDBOX_IMAGE,
+        source_file="main.py",
+    ),
+    # Linked statically, so the binary runs in the default sandbox image.
+    Language.CPP: LanguageSpec(
+        name=Language.CPP,
+        image=settings.SANDBOX_IMAGE,
+        source_file="main.cpp",
+        compile_image=settings.CPP_COMPILE_IMAGE,
+        compile_command=(
+            "g++",
+            "-std=c++17",
+            "-O2",
+            "-static",
+            "-o",
+            "main",
+            "main.cpp",
+        ),
+        run_command=("./main",),
+        artifacts=("main",),
+    ),
+}
+
+build_cache: TTLCache[str, Build] = TTLCache(
+    name="build_cache",
+    maxsize=settings.BUILD_CACHE_SIZE,
+    ttl=settings.BUILD_CACHE_TTL,
+)
+
+
+def get_language(language: Language) -> LanguageSpec:
+    """
+    Returns the registered specification of a language.
+    """
+    return LANGUAGES[language]
+
+
+def build_key(language: LanguageSpec, user_code: str) -> str:
+    """
+    Builds the build cache key: the language and a digest of the exact source.
+    """
+    digest = hashlib.sha256(user_code.encode("utf-8")).hexdigest()
+    return f"{language.name.value}:{digest}"
+
+
+def failed_build(language: LanguageSpec, output: str, cacheable: bool = True) -> Build:
+    """
+    Build of code that does not compile, keeping the start of the compiler output.
+    """
+    error = output.strip()[:MAX_COMPILER_OUTPUT] or "Compilation failed."
+    return Build(language=language, error=error, cacheable=cacheable)
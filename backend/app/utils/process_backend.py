@@ -0,0 +1,367 @@
+import functools
+import json
+import math
+import os
+import pwd
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from collections import deque
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+
+from app.core.config import settings
+from app.core.logger_setup import get_logger
+from app.core.metrics import metrics
+from app.errors.sandbox_errors import SandboxPrivilegeError
+from app.schemas.submission import TestCaseResult
+from app.schemas.task import ExecutionBackendName, ResourceLimits, TestCase
+from app.utils.code_tester import (
+    GROUP_PREFIX,
+    HARNESS_SOURCE,
+    RESULT_PREFIX,
+    get_testing_payload,
+)
+from app.utils.execution_backend import (
+    BatchResults,
+    ExecutionBackend,
+    iter_lines,
+    kill_after,
+)
+from app.utils.languages import (
+    COMPILE_TIMEOUT_ERROR,
+    Build,
+    LanguageSpec,
+    failed_build,
+)
+
+logger = get_logger(__name__)
+
+MEGABYTE = 1024 * 1024
+
+
+@dataclass
+class WarmProcess:
+    """
+    Harness process started ahead of time, blocked reading its payload.
+
+    Attributes:
+        process (subprocess.Popen[bytes]): The harness process.
+        workdir (str): Private working directory of the process.
+        group (int | None): Process group of the test case running, as
+            announced by the harness.
+    """
+
+    process: subprocess.Popen[bytes]
+    workdir: str
+    group: int | None = None
+
+
+class ProcessBackend(ExecutionBackend):
+    """
+    Runs the harness in a pool of pre-forked local subprocesses.
+
+    Meant for trusted or low-risk tasks: there is no container, only
+    resource limits (CPU time, address space, open files, file size), a
+    session of its own, an empty environment, a private temporary working
+    directory and a dropped-privilege user. Only root can switch users, so
+    the backend refuses to start otherwise, unless ``allow_unprivileged``
+    accepts running the code as the server user, with access to its files
+    and environment.
+
+    Each warm process has already paid the interpreter start-up and waits
+    for its payload on stdin. It serves exactly one batch and is replaced
+    right away. The harness only needs the standard library, so ``python``
+    can be any interpreter the sandbox user may run. Compiled languages use
+    the toolchain installed on the host.
+    """
+
+    name = ExecutionBackendName.PROCESS
+
+    def __init__(
+        self,
+        size: int = settings.PROCESS_POOL_SIZE,
+        python: str | None = settings.PROCESS_PYTHON,
+        user: str = settings.PROCESS_SANDBOX_USER,
+        allow_unprivileged: bool = settings.PROCESS_ALLOW_UNPRIVILEGED,
+        memory_limit_mb: int = settings.PROCESS_MEMORY_LIMIT_MB,
+        max_open_files: int = settings.PROCESS_MAX_OPEN_FILES,
+        max_file_size_mb: int = settings.PROCESS_MAX_FILE_SIZE_MB,
+        timeout: float = settings.SANDBOX_SUBMISSION_TIMEOUT,
+        compile_timeout: float = settings.SANDBOX_COMPILE_TIMEOUT,
+    ) -> None:
+        self.size = size
+        self.python = python or sys.executable
+        self.user = user
+        self.allow_unprivileged = allow_unprivileged
+        self.memory_limit_mb = memory_limit_mb
+        self.max_open_files = max_open_files
+        self.max_file_size_mb = max_file_size_mb
+        self.timeout = timeout
+        self.compile_timeout = compile_timeout
+        self._idle: deque[WarmProcess] = deque()
+        self._spawning = 0
+        self._lock = threading.Lock()
+        self._harness_dir: str | None = None
+
+    def start(self) -> None:
+        """
+        Writes the harness to disk and pre-forks the pool.
+
+        Raises:
+            SandboxPrivilegeError: If the backend cannot drop privileges and
+                running unprivileged was not allowed.
+        """
+        with self._lock:
+            if self._harness_dir is not None:
+                return
+            if os.geteuid() != 0:
+                if not self.allow_unprivileged:
+                    raise SandboxPrivilegeError()
+                logger.warning(
+                    "Process backend is not running as root: submissions run as "
+                    "the server user and can read its files and environment"
+                )
+            self._harness_dir = tempfile.mkdtemp(prefix="harness-")
+            os.chmod(self._harness_dir, 0o755)
+            harness_path = os.path.join(self._harness_dir, "harness.py")
+            with open(harness_path, "wb") as harness_file:
+                harness_file.write(HARNESS_SOURCE)
+            os.chmod(harness_path, 0o644)
+        self._fill()
+        logger.info(f"Process backend started with {self.size} warm process(es)")
+
+    def stop(self) -> None:
+        """
+        Kills the idle processes and removes the harness.
+        """
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+            harness_dir, self._harness_dir = self._harness_dir, None
+        for warm in idle:
+            self._discard(warm)
+        if harness_dir is not None:
+            shutil.rmtree(harness_dir, ignore_errors=True)
+        metrics.set_gauge("process_pool_idle", 0)
+        logger.info("Process backend stopped")
+
+    def compile(self, language: LanguageSpec, user_code: str) -> Build:
+        self.start()
+        workdir = tempfile.mkdtemp(prefix="build-")
+        user = self._sandbox_user()
+        try:
+            source_path = os.path.join(workdir, language.source_file)
+            with open(source_path, "w", encoding="utf-8") as source_file:
+                source_file.write(user_code)
+            if user is not None:
+                os.chown(workdir, user.pw_uid, user.pw_gid)
+                os.chown(source_path, user.pw_uid, user.pw_gid)
+
+            logger.info(f"Compiling {language.name.value} code in {workdir}")
+            process = subprocess.Popen(
+                list(language.compile_command),
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                cwd=workdir,
+                env={"PATH": os.defpath},
+                user=user.pw_uid if user is not None else None,
+                group=user.pw_gid if user is not None else None,
+                extra_groups=[] if user is not None else None,
+                start_new_session=True,
+            )
+            try:
+                output, _ = process.communicate(timeout=self.compile_timeout)
+            except subprocess.TimeoutExpired:
+                # The compiler driver starts the actual compiler: kill them all.
+                self._kill(process)
+                process.communicate()
+                return failed_build(language, COMPILE_TIMEOUT_ERROR, cacheable=False)
+            if process.returncode != 0:
+                return failed_build(language, output.decode("utf-8", errors="replace"))
+
+            files = {}
+            for name in language.artifacts:
+                with open(os.path.join(workdir, name), "rb") as artifact:
+                    files[name] = artifact.read()
+            return Build(language=language, files=files)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def run_batch(
+        self,
+        user_code: str,
+        test_cases: list[TestCase],
+        max_failures: int | None = None,
+        limits: ResourceLimits | None = None,
+        build: Build | None = None,
+    ) -> Iterator[TestCaseResult]:
+        payload = get_testing_payload(
+            user_code, test_cases, max_failures, limits, build
+        )
+        results = BatchResults(len(test_cases), max_failures)
+        warm = self._acquire()
+        process = warm.process
+        assert process.stdin is not None and process.stdout is not None
+        stdout_fd = process.stdout.fileno()
+
+        try:
+            logger.info(
+                f"Running {len(test_cases)} test case(s) in process {process.pid}"
+            )
+            with kill_after(
+                self.timeout, lambda: self._kill(process, warm.group), results.killed
+            ):
+                try:
+                    process.stdin.write(payload)
+                    process.stdin.close()
+                except BrokenPipeError:
+                    logger.error(f"Process {process.pid} exited before its payload")
+                else:
+                    chunks = iter(functools.partial(os.read, stdout_fd, 65536), b"")
+                    yield from results.feed(self._track(warm, iter_lines(chunks)))
+        finally:
+            self._discard(warm)
+
+        yield from results.finish()
+
+    def _acquire(self) -> WarmProcess:
+        """
+        Takes a live warm process, or starts one, and tops the pool up.
+        """
+        self.start()
+        while True:
+            with self._lock:
+                warm = self._idle.popleft() if self._idle else None
+            if warm is None:
+                metrics.increment("process_pool_misses")
+                warm = self._spawn()
+                break
+            if warm.process.poll() is None:
+                metrics.increment("process_pool_hits")
+                break
+            self._discard(warm)
+        self._fill()
+        return warm
+
+    @staticmethod
+    def _track(warm: WarmProcess, lines: Iterable[str]) -> Iterator[str]:
+        """
+        Keeps track of the process group of the test case running.
+        """
+        for line in lines:
+            if line.startswith(GROUP_PREFIX):
+                warm.group = int(line[len(GROUP_PREFIX) :])
+            elif line.startswith(RESULT_PREFIX):
+                warm.group = None
+            yield line
+
+    def _fill(self) -> None:
+        """
+        Tops the pool up to ``size`` idle processes.
+
+        Processes being spawned count towards the size, so concurrent calls
+        never start more than are missing.
+        """
+        while True:
+            with self._lock:
+                if (
+                    self._harness_dir is None
+                    or len(self._idle) + self._spawning >= self.size
+                ):
+                    break
+                self._spawning += 1
+            try:
+                warm = self._spawn()
+            finally:
+                with self._lock:
+                    self._spawning -= 1
+            with self._lock:
+                stopped = self._harness_dir is None
+                if not stopped:
+                    self._idle.append(warm)
+            if stopped:
+                self._discard(warm)
+        with self._lock:
+            idle = len(self._idle)
+        metrics.set_gauge("process_pool_idle", idle)
+
+    def _spawn(self) -> WarmProcess:
+        """
+        Starts a harness process in a fresh working directory.
+
+        The harness applies the resource limits to itself before it reads
+        the payload, so they are in place before any user code runs.
+        """
+        assert self._harness_dir is not None
+        workdir = tempfile.mkdtemp(prefix="sandbox-")
+        user = self._sandbox_user()
+        if user is not None:
+            os.chown(workdir, user.pw_uid, user.pw_gid)
+
+        process = subprocess.Popen(
+            [
+                self.python,
+                "-I",
+                os.path.join(self._harness_dir, "harness.py"),
+                "--limits",
+                json.dumps(self._limits()),
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=workdir,
+            env={"PATH": os.defpath},
+            user=user.pw_uid if user is not None else None,
+            group=user.pw_gid if user is not None else None,
+            extra_groups=[] if user is not None else None,
+            start_new_session=True,
+        )
+        metrics.increment("process_pool_created")
+        return WarmProcess(process=process, workdir=workdir)
+
+    def _limits(self) -> dict[str, int]:
+        return {
+            "RLIMIT_CPU": math.ceil(self.timeout),
+            "RLIMIT_AS": self.memory_limit_mb * MEGABYTE,
+            "RLIMIT_NOFILE": self.max_open_files,
+            "RLIMIT_FSIZE": self.max_file_size_mb * MEGABYTE,
+        }
+
+    def _sandbox_user(self) -> pwd.struct_passwd | None:
+        """
+        User the processes run as: only root can switch, so None otherwise.
+        """
+        if os.geteuid() != 0:
+            return None
+        return pwd.getpwnam(self.user)
+
+    @staticmethod
+    def _kill(process: subprocess.Popen[bytes], group: int | None = None) -> None:
+        """
+        Kills the process and everything it started.
+
+        The process leads a process group of its own, killed as a whole. The
+        harness runs each test case in a further group, which it cleans up
+        itself once the test case is over and announces while it runs: that
+        ``group`` is killed first, while the harness still holds on to it.
+        """
+        for pgid in (group, process.pid):
+            if pgid is None:
+                continue
+            try:
+                os.killpg(pgid, signal.SIGKILL)
+            except ProcessLookupError:
+                continue
+
+    def _discard(self, warm: WarmProcess) -> None:
+        self._kill(warm.process, warm.group)
+        warm.process.wait()
+        for stream in (warm.process.stdin, warm.process.stdout):
+            if stream is not None:
+                stream.close()
+        shutil.rmtree(warm.workdir, ignore_errors=True)
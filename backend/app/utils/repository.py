@@ -1,12 +1,28 @@
 from abc import ABC, abstractmethod
-from typing import Any
+from collections.abc import AsyncIterator, Iterable, Mapping
+from typing import Any, ClassVar
 
-from pymongo import errors
+from pymongo import (
+    ASCENDING,
+    IndexModel,
+    ReplaceOne,
+    ReturnDocument,
+    UpdateOne,
+    errors,
+)
 from pymongo.asynchronous.collection import AsyncCollection
 
 from app.db.database import AsyncMongoDBClient
-from app.errors.base import NotFoundError, DatabaseConnectionError
+from app.schemas.bulk import BulkItemResult, BulkItemStatus
+from app.errors.base import (
+    AlreadyExistsError,
+    DatabaseConnectionError,
+    NotFoundError,
+    RepositoryError,
+    VersionConflictError,
+)
 from app.core.logger_setup import get_logger
+from app.core.metrics import metrics
 
 logger = get_logger(__name__)
 
@@ -21,7 +37,11 @@ class AbstractRepository(ABC):
         raise NotImplementedError
 
     @abstractmethod
-    async def find_one(self, filter_query: dict[str, Any]) -> dict[str, Any]:
+    async def find_one(
+        self,
+        filter_query: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
         raise NotImplementedError
 
     @abstractmethod
@@ -30,9 +50,23 @@ class AbstractRepository(ABC):
     ) -> list[dict[str, Any]]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def find_page(
+        self,
+        limit: int,
+        after: Any | None = None,
+        filter_query: dict[str, Any] | None = None,
+        projection: dict[str, Any] | None = None,
+        sort_field: str = "name",
+    ) -> list[dict[str, Any]]:
+        raise NotImplementedError
+
     @abstractmethod
     async def update_one(
-        self, filter_query: dict[str, Any], update_data: dict[str, Any]
+        self,
+        filter_query: dict[str, Any],
+        update_data: dict[str, Any],
+        expected_version: int | None = None,
     ) -> Any:
         raise NotImplementedError
 
@@ -40,12 +74,30 @@ class AbstractRepository(ABC):
     async def delete_one(self, filter_query: dict[str, Any]) -> None:
         raise NotImplementedError
 
+    @abstractmethod
+    async def upsert_one(
+        self, filter_query: dict[str, Any], data: dict[str, Any]
+    ) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_many(self, filter_query: dict[str, Any]) -> int:
+        raise NotImplementedError
+
 
 class MongoDBRepository(AbstractRepository):
     """
     Base repository for MongoDB
+
+    Subclasses declare the indexes their queries rely on in ``indexes``,
+    they are created by ``ensure_indexes`` at startup. Subclasses setting
+    ``version_field`` get a version number incremented by every update,
+    which enables optimistic concurrency in ``update_one``.
     """
 
+    indexes: ClassVar[tuple[IndexModel, ...]] = ()
+    version_field: ClassVar[str | None] = None
+
     def __init__(
         self,
         db_client: AsyncMongoDBClient,
@@ -53,12 +105,16 @@ class MongoDBRepository(AbstractRepository):
         log_name: str,
         not_found_error: type[NotFoundError],
         database_connection_error: type[DatabaseConnectionError],
+        already_exists_error: type[AlreadyExistsError] = AlreadyExistsError,
+        version_conflict_error: type[VersionConflictError] = VersionConflictError,
     ) -> None:
         self.db_client = db_client
         self.collection_name = collection_name
         self.log_name = log_name.lower()
         self.not_found_error = not_found_error
         self.database_connection_error = database_connection_error
+        self.already_exists_error = already_exists_error
+        self.version_conflict_error = version_conflict_error
 
     async def _get_collection(self) -> AsyncCollection[dict[str, Any]]:
         """
@@ -74,29 +130,104 @@ class MongoDBRepository(AbstractRepository):
                 f"Error while accessing collection '{self.collection_name}': {str(e)}"
             ) from e
 
+    async def missing_indexes(self) -> list[str]:
+        """
+        Returns the names of the declared indexes the collection does not have.
+        """
+        try:
+            collection = await self._get_collection()
+            existing = await collection.index_information()
+        except errors.PyMongoError as e:
+            logger.error(f"Database error while listing {self.log_name} indexes: {e}")
+            raise self.database_connection_error(
+                f"Error while listing {self.log_name} indexes: {str(e)}"
+            ) from e
+        return [
+            index.document["name"]
+            for index in self.indexes
+            if index.document["name"] not in existing
+        ]
+
+    async def ensure_indexes(self) -> list[str]:
+        """
+        Creates the declared indexes the collection does not have yet.
+
+        An index that cannot be built, e.g. a unique index over existing
+        duplicates, is logged and skipped.
+
+        Returns:
+            list[str]: Names of the declared indexes that are still missing.
+        """
+        missing = await self.missing_indexes()
+        if not missing:
+            return []
+        logger.warning(
+            f"Collection '{self.collection_name}' is missing indexes: {', '.join(missing)}"
+        )
+        collection = await self._get_collection()
+        still_missing = []
+        for index in self.indexes:
+            name = index.document["name"]
+            if name not in missing:
+                continue
+            try:
+                await collection.create_indexes([index])
+                logger.info(f"Created index '{name}' on '{self.collection_name}'")
+            except errors.OperationFailure as e:
+                logger.error(
+                    f"Failed to create index '{name}' on '{self.collection_name}': {e}"
+                )
+                still_missing.append(name)
+            except errors.PyMongoError as e:
+                raise self.database_connection_error(
+                    f"Error while creating {self.log_name} indexes: {str(e)}"
+                ) from e
+        return still_missing
+
+    def _already_exists(self, details: Mapping[str, Any] | None) -> AlreadyExistsError:
+        """
+        Builds the "already exists" error for a duplicate key error.
+        """
+        query = (details or {}).get("keyValue") or {}
+        logger.info(f"{self.log_name.capitalize()} already exists: {query}")
+        return self.already_exists_error(entity=self.log_name.capitalize(), query=query)
+
     async def add_one(self, data: dict[str, Any]) -> dict[str, Any]:
         """
         Adds a single document to the collection.
+
+        Versioned documents always start at version 0, whatever ``data`` says.
+
+        Raises:
+            AlreadyExistsError: If the document violates a unique index.
         """
+        if self.version_field is not None:
+            data = {**data, self.version_field: 0}
         try:
             collection = await self._get_collection()
             result = await collection.insert_one(data)
             data["_id"] = str(result.inserted_id)
             logger.info(f"Created {self.log_name} with data: {data}")
             return data
+        except errors.DuplicateKeyError as e:
+            raise self._already_exists(e.details) from e
         except errors.PyMongoError as e:
             logger.error(f"Database error while creating {self.log_name}: {str(e)}")
             raise self.database_connection_error(
                 f"Error while inserting {self.log_name} data: {str(e)}"
             ) from e
 
-    async def find_one(self, filter_query: dict[str, Any]) -> dict[str, Any]:
+    async def find_one(
+        self,
+        filter_query: dict[str, Any],
+        projection: dict[str, Any] | None = None,
+    ) -> dict[str, Any]:
         """
         Finds a single document in the collection based on a filter query.
         """
         try:
             collection = await self._get_collection()
-            document = await collection.find_one(filter_query)
+            document = await collection.find_one(filter_query, projection)
             if not document:
                 logger.info(
                     f"{self.log_name.capitalize()} not found for query: {filter_query}"
@@ -139,16 +270,165 @@ class MongoDBRepository(AbstractRepository):
                 f"Error while accessing database for all {self.log_name}s: {str(e)}"
             ) from e
 
+    async def find_page(
+        self,
+        limit: int,
+        after: Any | None = None,
+        filter_query: dict[str, Any] | None = None,
+        projection: dict[str, Any] | None = None,
+        sort_field: str = "name",
+    ) -> list[dict[str, Any]]:
+        """
+        Finds one page of documents ordered by ``sort_field``.
+
+        Keyset pagination: a page starts right after the ``sort_field`` value
+        ``after`` instead of skipping documents, so every page is an index
+        range scan however deep it is. ``sort_field`` must be unique and
+        indexed.
+
+        Args:
+            limit (int): Maximum number of documents returned.
+            after (Any | None): ``sort_field`` value of the last document of
+                the previous page, None for the first page.
+            filter_query (dict[str, Any] | None): Additional filter.
+            projection (dict[str, Any] | None): Fields to return, all by default.
+            sort_field (str): Field the pages are ordered by.
+
+        Returns:
+            list[dict[str, Any]]: The documents of the page.
+        """
+        query = dict(filter_query or {})
+        if after is not None:
+            query[sort_field] = {"$gt": after}
+        try:
+            collection = await self._get_collection()
+            cursor = (
+                collection.find(query, projection)
+                .sort(sort_field, ASCENDING)
+                .limit(limit)
+            )
+            documents = await cursor.to_list(length=limit)
+            logger.info(
+                f"Found a page of {len(documents)} {self.log_name}(s) after {after!r}"
+            )
+            return documents
+        except errors.PyMongoError as e:
+            logger.error(
+                f"Database error while fetching a page of {self.log_name}s: {str(e)}"
+            )
+            raise self.database_connection_error(
+                f"Error while accessing database for {self.log_name}s: {str(e)}"
+            ) from e
+
+    async def iter_all(
+        self,
+        filter_query: dict[str, Any] | None = None,
+        projection: dict[str, Any] | None = None,
+        batch_size: int = 500,
+        sort_field: str = "name",
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Iterates over every matching document, ordered by ``sort_field``.
+
+        Documents are fetched from the cursor ``batch_size`` at a time, so
+        memory use does not grow with the size of the result.
+
+        Yields:
+            dict[str, Any]: One document at a time.
+        """
+        count = 0
+        try:
+            collection = await self._get_collection()
+            cursor = (
+                collection.find(filter_query or {}, projection)
+                .sort(sort_field, ASCENDING)
+                .batch_size(batch_size)
+            )
+            async for document in cursor:
+                count += 1
+                yield document
+        except errors.PyMongoError as e:
+            logger.error(
+                f"Database error while iterating {self.log_name}s after {count}: {str(e)}"
+            )
+            raise self.database_connection_error(
+                f"Error while accessing database for {self.log_name}s: {str(e)}"
+            ) from e
+        logger.info(
+            f"Iterated over {count} {self.log_name}(s) for query: {filter_query}"
+        )
+
+    def _update_document(self, update_data: dict[str, Any]) -> dict[str, Any]:
+        """
+        Turns update data into a MongoDB update document.
+
+        Plain fields are applied with ``$set``, a mapping of update operators
+        is used as is. The version field, if any, is incremented.
+        """
+        operators = [key for key in update_data if key.startswith("$")]
+        if operators and len(operators) != len(update_data):
+            raise ValueError("Update data cannot mix update operators and fields.")
+        if operators:
+            update = dict(update_data)
+        else:
+            update = {"$set": dict(update_data)} if update_data else {}
+        if self.version_field is not None:
+            update["$inc"] = {**update.get("$inc", {}), self.version_field: 1}
+        return update
+
     async def update_one(
-        self, filter_query: dict[str, Any], update_data: dict[str, Any]
+        self,
+        filter_query: dict[str, Any],
+        update_data: dict[str, Any],
+        expected_version: int | None = None,
     ) -> Any:
         """
-        Updates a single document in the collection based on a filter query.
+        Atomically updates a single document and returns it as updated.
+
+        The update and the read of the result are one ``find_one_and_update``
+        round-trip, so concurrent writes cannot slip in between.
+
+        Args:
+            filter_query (dict[str, Any]): Filter matching the document.
+            update_data (dict[str, Any]): Fields to set, or a MongoDB update
+                document made of update operators.
+            expected_version (int | None): Only update the document if it is
+                still at this version. Requires ``version_field``.
+
+        Returns:
+            Any: The updated document.
+
+        Raises:
+            NotFoundError: If no document matches the filter query.
+            VersionConflictError: If the document is at another version.
+            AlreadyExistsError: If the update violates a unique index.
         """
+        update = self._update_document(update_data)
+        if not update:
+            return await self.find_one(filter_query)
+        query = dict(filter_query)
+        if expected_version is not None:
+            if self.version_field is None:
+                raise ValueError(f"{self.log_name.capitalize()}s are not versioned.")
+            # Documents written before versioning have no version field.
+            query[self.version_field] = (
+                expected_version if expected_version else {"$in": [0, None]}
+            )
         try:
             collection = await self._get_collection()
-            result = await collection.update_one(filter_query, {"$set": update_data})
-            if result.matched_count == 0:
+            updated_document = await collection.find_one_and_update(
+                query, update, return_document=ReturnDocument.AFTER
+            )
+            if updated_document is None:
+                if expected_version is not None and await collection.count_documents(
+                    filter_query, limit=1
+                ):
+                    logger.info(
+                        f"{self.log_name.capitalize()} changed since version {expected_version}: {filter_query}"
+                    )
+                    raise self.version_conflict_error(
+                        self.log_name.capitalize(), filter_query, expected_version
+                    )
                 logger.info(
                     f"{self.log_name.capitalize()} not found for update: {filter_query}"
                 )
@@ -156,11 +436,12 @@ class MongoDBRepository(AbstractRepository):
                     entity=self.log_name.capitalize(),
                     query=filter_query,
                 )
-            updated_document = await collection.find_one(filter_query)
             logger.info(f"Updated {self.log_name}: {updated_document}")
             return updated_document
-        except self.not_found_error as e:
+        except (self.not_found_error, self.version_conflict_error) as e:
             raise e
+        except errors.DuplicateKeyError as e:
+            raise self._already_exists(e.details) from e
         except errors.PyMongoError as e:
             logger.error(f"Database error while updating {self.log_name}: {str(e)}")
             raise self.database_connection_error(
@@ -191,26 +472,180 @@ class MongoDBRepository(AbstractRepository):
                 f"Error while deleting {self.log_name}: {str(e)}"
             ) from e
 
-    async def add_many(self, data: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    async def upsert_one(
+        self, filter_query: dict[str, Any], data: dict[str, Any]
+    ) -> None:
         """
-        Adds multiple documents to the collection.
+        Replaces the document matching the filter query, inserting it if missing.
         """
         try:
-            if not data:
-                raise ValueError("Input data for 'add_many' cannot be empty.")
             collection = await self._get_collection()
-            result = await collection.insert_many(data)
-            for i, doc_id in enumerate(result.inserted_ids):
-                data[i]["_id"] = str(doc_id)
-            logger.info(f"Inserted {len(data)} {self.log_name}(s) into the collection.")
-            return data
-        except errors.BulkWriteError as bwe:
-            logger.error(f"Bulk write error: {bwe.details}")
+            await collection.replace_one(filter_query, data, upsert=True)
+            logger.info(f"Upserted {self.log_name} with query: {filter_query}")
+        except errors.PyMongoError as e:
+            logger.error(f"Database error while upserting {self.log_name}: {str(e)}")
             raise self.database_connection_error(
-                f"Bulk write error while inserting {self.log_name} data: {str(bwe)}"
-            ) from bwe
+                f"Error while upserting {self.log_name}: {str(e)}"
+            ) from e
+
+    async def delete_many(self, filter_query: dict[str, Any]) -> int:
+        """
+        Deletes all documents matching the filter query.
+
+        Returns:
+            int: Number of deleted documents.
+        """
+        try:
+            collection = await self._get_collection()
+            result = await collection.delete_many(filter_query)
+            logger.info(
+                f"Deleted {result.deleted_count} {self.log_name}(s) with query: {filter_query}"
+            )
+            return result.deleted_count
         except errors.PyMongoError as e:
-            logger.error(f"Database error while adding many {self.log_name}: {str(e)}")
+            logger.error(f"Database error while deleting {self.log_name}s: {str(e)}")
             raise self.database_connection_error(
-                f"Error while inserting many {self.log_name} data: {str(e)}"
+                f"Error while deleting {self.log_name}s: {str(e)}"
             ) from e
+
+    async def bulk_upsert(
+        self, data: list[dict[str, Any]], key: str = "name", chunk_size: int = 1000
+    ) -> list[BulkItemResult]:
+        """
+        Replaces or inserts documents by ``key`` with unordered bulk writes.
+
+        Documents are written ``chunk_size`` at a time. A failing document
+        does not stop the others, and a document whose key already appeared
+        earlier in ``data`` is reported as failed without being written.
+
+        Args:
+            data (list[dict[str, Any]]): Documents to write.
+            key (str): Field identifying a document, backed by a unique index.
+            chunk_size (int): Maximum number of documents per ``bulk_write``.
+
+        Returns:
+            list[BulkItemResult]: What happened to each document, in order.
+        """
+        results: list[BulkItemResult] = []
+        seen: set[Any] = set()
+        chunk: list[tuple[int, dict[str, Any]]] = []
+        for index, document in enumerate(data):
+            if document[key] in seen:
+                results.append(
+                    BulkItemResult(
+                        index=index,
+                        key=str(document[key]),
+                        status=BulkItemStatus.FAILED,
+                        error=f"Duplicate {key} in the request.",
+                    )
+                )
+                continue
+            seen.add(document[key])
+            chunk.append((index, document))
+            if len(chunk) >= chunk_size:
+                results.extend(await self._bulk_upsert_chunk(chunk, key))
+                chunk = []
+        if chunk:
+            results.extend(await self._bulk_upsert_chunk(chunk, key))
+
+        results.sort(key=lambda result: result.index)
+        logger.info(
+            f"Bulk upserted {len(data)} {self.log_name}(s) in chunks of {chunk_size}"
+        )
+        return results
+
+    def _upsert_request(
+        self, document: dict[str, Any], key: str
+    ) -> ReplaceOne[Any] | UpdateOne:
+        """
+        Builds the request replacing or inserting one document by ``key``.
+
+        Versioned documents are replaced through an update pipeline instead,
+        so their version is never taken from ``document``: it goes up by one
+        from the stored version, and starts at 0 for new documents.
+        """
+        if self.version_field is None:
+            return ReplaceOne({key: document[key]}, document, upsert=True)
+        version = self.version_field
+        content = {
+            field: value for field, value in document.items() if field != version
+        }
+        next_version = {"$add": [{"$ifNull": [f"${version}", -1]}, 1]}
+        # $literal keeps values starting with "$" from being read as expressions.
+        pipeline = [
+            {
+                "$replaceWith": {
+                    "$mergeObjects": [{"$literal": content}, {version: next_version}]
+                }
+            }
+        ]
+        return UpdateOne({key: document[key]}, pipeline, upsert=True)
+
+    async def _bulk_upsert_chunk(
+        self, chunk: list[tuple[int, dict[str, Any]]], key: str
+    ) -> list[BulkItemResult]:
+        """
+        Writes one chunk with ``bulk_write`` and reports each of its documents.
+        """
+        requests = [self._upsert_request(document, key) for _, document in chunk]
+        details: Mapping[str, Any]
+        try:
+            collection = await self._get_collection()
+            result = await collection.bulk_write(requests, ordered=False)
+            details = result.bulk_api_result
+        except errors.BulkWriteError as bwe:
+            # Unordered: every request but the failed ones was applied.
+            details = bwe.details
+        except errors.PyMongoError as e:
+            logger.error(f"Database error while bulk writing {self.log_name}s: {e}")
+            raise self.database_connection_error(
+                f"Error while bulk writing {self.log_name} data: {str(e)}"
+            ) from e
+
+        upserted = {item["index"] for item in details.get("upserted", [])}
+        failed = {
+            error["index"]: error.get("errmsg", "Write failed.")
+            for error in details.get("writeErrors", [])
+        }
+        results = []
+        for position, (index, document) in enumerate(chunk):
+            if position in failed:
+                status, error = BulkItemStatus.FAILED, failed[position]
+            elif position in upserted:
+                status, error = BulkItemStatus.CREATED, None
+            else:
+                status, error = BulkItemStatus.UPDATED, None
+            results.append(
+                BulkItemResult(
+                    index=index, key=str(document[key]), status=status, error=error
+                )
+            )
+        return results
+
+
+async def ensure_indexes(repositories: Iterable[MongoDBRepository]) -> int:
+    """
+    Creates the declared indexes of every repository and reports what is missing.
+
+    Runs at startup. Failures are logged rather than raised: queries still
+    work without their indexes, only as collection scans. The number of
+    indexes still missing is exported as the ``mongo_missing_indexes`` gauge.
+
+    Returns:
+        int: Number of declared indexes that are still missing.
+    """
+    missing = 0
+    for repository in repositories:
+        try:
+            missing += len(await repository.ensure_indexes())
+        except RepositoryError as e:
+            logger.error(
+                f"Failed to ensure indexes on '{repository.collection_name}': {e}"
+            )
+            missing += len(repository.indexes)
+    metrics.set_gauge("mongo_missing_indexes", missing)
+    if missing:
+        logger.warning(f"{missing} declared index(es) are missing")
+    else:
+        logger.info("All declared indexes exist")
+    return missing
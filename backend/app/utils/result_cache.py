@@ -0,0 +1,187 @@
+import hashlib
+import json
+from datetime import UTC, datetime, timedelta
+
+from app.core.config import settings
+from app.core.logger_setup import get_logger
+from app.core.metrics import metrics
+from app.db.database import db_client
+from app.errors.base import RepositoryError
+from app.repositories.submission_result import SubmissionResultRepository
+from app.schemas.code import Language
+from app.schemas.submission import ExecutionOptions, SubmissionResult
+from app.schemas.task import TaskSchema
+from app.utils.cache import TTLCache
+
+logger = get_logger(__name__)
+
+CacheKey = tuple[str, str]
+
+
+def normalize_code(user_code: str) -> str:
+    """
+    Normalizes code so that formatting-only differences hash the same.
+
+    Line endings are unified and leading/trailing blank lines are dropped.
+    Nothing else is touched: whitespace inside a line may be part of a string
+    literal and change what the code prints.
+    """
+    code = user_code.replace("\r\n", "\n").replace("\r", "\n")
+    return code.strip("\n")
+
+
+def hash_code(user_code: str) -> str:
+    """
+    Returns the SHA-256 hex digest of the normalized code.
+    """
+    return hashlib.sha256(normalize_code(user_code).encode("utf-8")).hexdigest()
+
+
+def hash_task(task: TaskSchema) -> str:
+    """
+    Returns a version hash of everything in a task that affects grading.
+
+    Test cases loaded from their set are represented by its hash. Only inline
+    test cases, of tasks stored before the split, are serialized here.
+    """
+    test_cases = task.test_cases_hash or [case.model_dump() for case in task.test_cases]
+    payload = json.dumps(
+        {"test_cases": test_cases, "limits": task.limits.model_dump()},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SubmissionResultCache:
+    """
+    Cache of submission results keyed on (task version, normalized code hash).
+
+    The first tier is an in-memory LRU with TTL. When a repository is given,
+    results are also stored in MongoDB as a second tier shared between
+    processes and surviving restarts.
+    """
+
+    def __init__(
+        self,
+        memory: TTLCache[CacheKey, SubmissionResult],
+        repository: SubmissionResultRepository | None = None,
+        ttl: int = settings.RESULT_CACHE_TTL,
+        max_output: int = settings.RESULT_CACHE_MAX_OUTPUT,
+    ) -> None:
+        self.memory = memory
+        self.repository = repository
+        self.ttl = ttl
+        self.max_output = max_output
+
+    @staticmethod
+    def make_key(
+        task: TaskSchema,
+        user_code: str,
+        options: ExecutionOptions,
+        language: Language = Language.PYTHON,
+    ) -> CacheKey:
+        """
+        Builds the cache key: the task name and a digest of what decides the result.
+        """
+        digest = ":".join(
+            [
+                hash_task(task),
+                language.value,
+                hash_code(user_code),
+                str(options.max_failures),
+            ]
+        )
+        return task.name, digest
+
+    async def get(
+        self,
+        task: TaskSchema,
+        user_code: str,
+        options: ExecutionOptions,
+        language: Language = Language.PYTHON,
+    ) -> SubmissionResult | None:
+        """
+        Returns the cached result for a submission, or None.
+        """
+        key = self.make_key(task, user_code, options, language)
+        result = self.memory.get(key)
+        if result is not None or self.repository is None:
+            return result
+
+        try:
+            document = await self.repository.find_one({"_id": self._document_id(key)})
+        except RepositoryError:
+            return None
+        if document["expires_at"].replace(tzinfo=UTC) <= datetime.now(UTC):
+            return None
+        metrics.increment("result_cache_mongo_hits")
+        result = SubmissionResult.model_validate(document["result"])
+        self.memory.set(key, result)
+        return result
+
+    async def set(
+        self,
+        task: TaskSchema,
+        user_code: str,
+        options: ExecutionOptions,
+        result: SubmissionResult,
+        language: Language = Language.PYTHON,
+    ) -> None:
+        """
+        Stores the result of a submission in every tier.
+
+        Results with more than ``max_output`` characters of output and error
+        text in total are not stored, so the cache size stays bounded.
+        """
+        size = sum(len(r.output or "") + len(r.error or "") for r in result.results)
+        if size > self.max_output:
+            metrics.increment("result_cache_skipped_large")
+            return
+        key = self.make_key(task, user_code, options, language)
+        self.memory.set(key, result)
+        if self.repository is None:
+            return
+
+        document_id = self._document_id(key)
+        try:
+            await self.repository.upsert_one(
+                {"_id": document_id},
+                {
+                    "_id": document_id,
+                    "task_name": task.name,
+                    "result": result.model_dump(mode="json"),
+                    "expires_at": datetime.now(UTC) + timedelta(seconds=self.ttl),
+                },
+            )
+        except RepositoryError as e:
+            logger.warning(f"Failed to store submission result in MongoDB: {e}")
+
+    async def invalidate_task(self, task_name: str) -> None:
+        """
+        Drops every cached result of a task.
+        """
+        removed = self.memory.delete_where(lambda key: key[0] == task_name)
+        logger.info(f"Invalidated {removed} cached result(s) for task '{task_name}'")
+        if self.repository is not None:
+            try:
+                await self.repository.delete_many({"task_name": task_name})
+            except RepositoryError as e:
+                logger.warning(f"Failed to invalidate cached results in MongoDB: {e}")
+
+    @staticmethod
+    def _document_id(key: CacheKey) -> str:
+        return f"{key[0]}:{key[1]}"
+
+
+result_cache = SubmissionResultCache(
+    memory=TTLCache(
+        name="result_cache",
+        maxsize=settings.RESULT_CACHE_SIZE,
+        ttl=settings.RESULT_CACHE_TTL,
+    ),
+    repository=(
+        SubmissionResultRepository(db_client)
+        if settings.RESULT_CACHE_MONGO_ENABLED
+        else None
+    ),
+)
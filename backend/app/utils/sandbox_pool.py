@@ -0,0 +1,243 @@
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+import docker
+from docker.models.containers import Container
+
+from app.core.config import settings
+from app.core.logger_setup import get_logger
+from app.core.metrics import metrics
+from app.utils.docker_client import DockerClientManager, docker_client
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class PooledContainer:
+    """
+    Sandbox container tracked by the pool.
+
+    Attributes:
+        container (Container): The running Docker container.
+        created_at (float): Monotonic timestamp of the container creation.
+        uses (int): Number of submissions executed in the container.
+    """
+
+    container: Container
+    created_at: float
+    uses: int = 0
+
+
+class SandboxPool:
+    """
+    Pool of pre-started, locked-down sandbox containers.
+
+    Idle containers run ``sleep infinity`` and user code is executed in them
+    with ``exec``. A leased container is either returned to the pool or
+    destroyed, depending on its age, number of uses and health. A background
+    thread keeps the pool topped up to ``size`` idle containers.
+    """
+
+    def __init__(
+        self,
+        size: int = settings.SANDBOX_POOL_SIZE,
+        max_lifetime: int = settings.SANDBOX_POOL_MAX_LIFETIME,
+        max_uses: int = settings.SANDBOX_POOL_MAX_USES,
+        healthcheck_interval: int = settings.SANDBOX_POOL_HEALTHCHECK_INTERVAL,
+        image: str = settings.SANDBOX_IMAGE,
+        docker_client: DockerClientManager = docker_client,
+    ) -> None:
+        self.size = size
+        self.max_lifetime = max_lifetime
+        self.max_uses = max_uses
+        self.healthcheck_interval = healthcheck_interval
+        self.image = image
+        self.docker_client = docker_client
+        self._idle: deque[PooledContainer] = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._maintainer: threading.Thread | None = None
+
+    def start(self) -> None:
+        """
+        Starts the background thread that fills and health-checks the pool.
+        """
+        if self._maintainer is not None:
+            return
+        self._stopped.clear()
+        self._maintainer = threading.Thread(
+            target=self._maintain, name="sandbox-pool", daemon=True
+        )
+        self._maintainer.start()
+        logger.info(f"Sandbox pool started with target size {self.size}")
+
+    def stop(self) -> None:
+        """
+        Stops the background thread and destroys all idle containers.
+        """
+        self._stopped.set()
+        self._wake.set()
+        if self._maintainer is not None:
+            self._maintainer.join()
+            self._maintainer = None
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        for pooled in idle:
+            self._destroy(pooled)
+        self._update_idle_gauge()
+        logger.info("Sandbox pool stopped")
+
+    @contextmanager
+    def lease(self) -> Iterator[Container]:
+        """
+        Leases a sandbox container for the duration of the ``with`` block.
+
+        A pre-started idle container is used when available (pool hit),
+        otherwise a new one is started on demand (pool miss). Containers whose
+        run was interrupted by an exception are always destroyed.
+        """
+        pooled = self._acquire()
+        try:
+            yield pooled.container
+        except BaseException:
+            # The run was interrupted and may still be going: never reuse it.
+            pooled.uses = self.max_uses
+            raise
+        finally:
+            pooled.uses += 1
+            self._release(pooled)
+
+    def _acquire(self) -> PooledContainer:
+        """
+        Takes a healthy idle container from the pool or creates a new one.
+        """
+        while True:
+            with self._lock:
+                pooled = self._idle.popleft() if self._idle else None
+            self._update_idle_gauge()
+            if pooled is None:
+                metrics.increment("sandbox_pool_misses")
+                self._wake.set()
+                return self._create()
+            if self._is_reusable(pooled):
+                metrics.increment("sandbox_pool_hits")
+                self._wake.set()
+                return pooled
+            self._destroy(pooled)
+
+    def _release(self, pooled: PooledContainer) -> None:
+        """
+        Returns a container to the pool or destroys it.
+        """
+        if self._stopped.is_set() or not self._is_reusable(pooled):
+            self._destroy(pooled)
+        else:
+            with self._lock:
+                self._idle.append(pooled)
+            metrics.increment("sandbox_pool_recycled")
+            self._update_idle_gauge()
+        self._wake.set()
+
+    def _is_reusable(self, pooled: PooledContainer) -> bool:
+        """
+        Checks whether a container may run another submission.
+        """
+        if pooled.uses >= self.max_uses:
+            return False
+        if time.monotonic() - pooled.created_at >= self.max_lifetime:
+            return False
+        return self._is_healthy(pooled)
+
+    def _is_healthy(self, pooled: PooledContainer) -> bool:
+        """
+        Health check: the container must still be running.
+        """
+        try:
+            pooled.container.reload()
+            return bool(pooled.container.status == "running")
+        except docker.errors.DockerException as e:
+            logger.warning(f"Health check failed for container: {e}")
+            return False
+
+    def _create(self) -> PooledContainer:
+        """
+        Starts a new idle sandbox container.
+        """
+        container = self.docker_client.client.containers.run(
+            self.image,
+            command=["sleep", "infinity"],
+            detach=True,
+            user="nobody",
+            working_dir="/tmp",
+            network_disabled=True,
+            mem_limit=settings.SANDBOX_MEM_LIMIT,
+            cpu_quota=settings.SANDBOX_CPU_QUOTA,
+            pids_limit=settings.SANDBOX_PIDS_LIMIT,
+            cap_drop=["ALL"],
+            security_opt=["no-new-privileges"],
+        )
+        metrics.increment("sandbox_pool_created")
+        logger.debug(f"Started sandbox container {container.id}")
+        return PooledContainer(container=container, created_at=time.monotonic())
+
+    def _destroy(self, pooled: PooledContainer) -> None:
+        """
+        Force-removes a container, ignoring Docker errors.
+        """
+        try:
+            pooled.container.remove(force=True)
+            metrics.increment("sandbox_pool_destroyed")
+            logger.debug(f"Removed sandbox container {pooled.container.id}")
+        except docker.errors.DockerException as e:
+            logger.warning(f"Failed to remove sandbox container: {e}")
+
+    def _maintain(self) -> None:
+        """
+        Background loop: evicts stale idle containers and tops up the pool.
+        """
+        while not self._stopped.is_set():
+            self._wake.clear()
+            try:
+                self._evict_stale()
+                self._fill()
+            except docker.errors.DockerException as e:
+                logger.error(f"Sandbox pool maintenance failed: {e}")
+            self._wake.wait(self.healthcheck_interval)
+
+    def _evict_stale(self) -> None:
+        with self._lock:
+            idle = list(self._idle)
+            self._idle.clear()
+        healthy = []
+        for pooled in idle:
+            if self._is_reusable(pooled):
+                healthy.append(pooled)
+            else:
+                self._destroy(pooled)
+        with self._lock:
+            self._idle.extendleft(reversed(healthy))
+        self._update_idle_gauge()
+
+    def _fill(self) -> None:
+        while not self._stopped.is_set():
+            with self._lock:
+                if len(self._idle) >= self.size:
+                    return
+            pooled = self._create()
+            with self._lock:
+                self._idle.append(pooled)
+            self._update_idle_gauge()
+
+    def _update_idle_gauge(self) -> None:
+        with self._lock:
+            idle = len(self._idle)
+        metrics.set_gauge("sandbox_pool_idle", idle)
+
+
+sandbox_pool = SandboxPool()
@@ -1,130 +1,521 @@
 import asyncio
-from typing import Any
+import functools
+import threading
+from collections.abc import AsyncIterator, Callable, Generator, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from typing import ParamSpec, TypeVar, cast
 
-import httpx
-import docker
-
-from fastapi import HTTPException, status
-
-from app.utils.code_tester import get_testing_code
+from app.schemas.code import Language
+from app.schemas.submission import (
+    ExecutionOptions,
+    SubmissionResult,
+    TestCaseResult,
+    Verdict,
+)
+from app.schemas.task import (
+    ExecutionBackendName,
+    ResourceLimits,
+    TaskSchema,
+    TestCase,
+)
+from app.services.task import TaskService
+from app.utils.code_tester import check_syntax
+from app.utils.docker_backend import DockerBackend
+from app.utils.execution_backend import (
+    MISSING_RESULT_ERROR,
+    ExecutionBackend,
+    missing_result,
+    skipped_result,
+)
+from app.utils.languages import (
+    Build,
+    LanguageSpec,
+    build_cache,
+    build_key,
+    get_language,
+)
+from app.utils.process_backend import ProcessBackend
+from app.utils.result_cache import SubmissionResultCache, result_cache
+from app.utils.sandbox_pool import sandbox_pool
 from app.core.logger_setup import get_logger
 from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.database import db_client
+from app.repositories.task import TaskRepository
+from app.repositories.test_case import TestCaseSetRepository
 
 logger = get_logger(__name__)
-BASE_URL = f"http://{settings.BACKEND_HOST}:{settings.BACKEND_PORT}"
-API_PREFIX = settings.API_V1_STR
 
+P = ParamSpec("P")
+T = TypeVar("T")
 
-async def fetch_task_by_name(name: str) -> dict[str, Any]:
+
+class SandboxExecutor:
     """
-    Sends a request to fetch a task by its name.
+    Bounded thread pool the sandbox runs are made on.
 
-    Args:
-        name (str): Name of the task.
+    Execution backends are synchronous, so every batch runs on this pool
+    instead of the event loop. Its size caps concurrent sandbox runs. The
+    pool is created on first use and again after a shutdown, so the
+    application can be started more than once in the same process.
+    """
 
-    Returns:
-        dict: Task data if found.
+    def __init__(self, max_workers: int = settings.SANDBOX_MAX_WORKERS) -> None:
+        self.max_workers = max_workers
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
 
-    Raises:
-        HTTPException: If the request fails or task not found.
+    def get(self) -> ThreadPoolExecutor:
+        """
+        Returns the running pool, creating it if needed.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="sandbox",
+                )
+            return self._executor
+
+    def shutdown(self) -> None:
+        """
+        Cancels the queued runs and waits for the running ones.
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+sandbox_executor = SandboxExecutor()
+
+execution_backends: dict[ExecutionBackendName, ExecutionBackend] = {
+    ExecutionBackendName.DOCKER: DockerBackend(sandbox_pool),
+    ExecutionBackendName.PROCESS: ProcessBackend(),
+}
+
+
+def get_default_backend() -> ExecutionBackend:
+    """
+    Returns the backend configured by ``EXECUTION_BACKEND``.
     """
-    async with httpx.AsyncClient() as client:
-        url = f"{BASE_URL}{API_PREFIX}/tasks/{name}"
-        logger.info(f"Fetching task from '{url}'.")
-        response = await client.get(url)
-        response.raise_for_status()
-        task_data: dict[str, Any] = response.json()
-        logger.info(f"Task data fetched successfully for '{name}'.")
-        return task_data
+    return execution_backends[ExecutionBackendName(settings.EXECUTION_BACKEND)]
 
 
-async def run_code_in_docker(task_name: str, user_code: str) -> str:
+def get_execution_backend(task: TaskSchema) -> ExecutionBackend:
     """
-    Runs the user's code in a Docker container and validates it against test cases.
+    Returns the backend the task asks for, or the default one.
+    """
+    if task.execution_backend is not None:
+        return execution_backends[task.execution_backend]
+    return get_default_backend()
 
-    Args:
-        task_name (str): The name of the task to be tested.
-        user_code (str): The user's Python code as a string.
 
-    Returns:
-        str: A summary string indicating the number and percentage of tests passed.
+async def run_in_sandbox_executor(
+    func: Callable[P, T], *args: P.args, **kwargs: P.kwargs
+) -> T:
+    """
+    Runs a blocking function on the sandbox thread pool without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        sandbox_executor.get(), functools.partial(func, *args, **kwargs)
+    )
+
+
+Publish = Callable[[bool, T | None, BaseException | None], None]
+
+
+def drain_iterator(
+    iterator_factory: Callable[[], Iterator[T]],
+    publish: Publish[T],
+    stopped: threading.Event,
+) -> None:
     """
-    client = docker.from_env()
-    passed_tests = 0
+    Publishes every item of an iterator, then a final ``done`` message.
 
+    Runs on a worker thread. Errors are published instead of raised, and the
+    iterator is closed as soon as ``stopped`` is set. If it is set while the
+    job still waits for a worker, the iterator is never created.
+    """
+    iterator: Iterator[T] | None = None
     try:
-        data = await fetch_task_by_name(task_name)
-        logger.info(f"Loaded task '{task_name}' successfully.")
-    except httpx.HTTPStatusError as e:
-        logger.error(
-            f"HTTP error while fetching task '{task_name}': {e.response.status_code} - {e.response.text}"
-        )
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Task '{task_name}' not found",
-        ) from e
-    except ValueError as e:
-        logger.error(f"Failed to parse JSON for task '{task_name}': {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Error parsing JSON",
-        ) from e
-
-    test_cases: list[dict[str, str]] = data.get("test_cases", [])
-    logger.debug("Test cases: {}".format(test_cases))
-
-    if not test_cases:
-        logger.warning(f"No test cases found for task '{task_name}'.")
-        return "Warning: No test cases found."
+        if stopped.is_set():
+            return
+        iterator = iterator_factory()
+        for item in iterator:
+            if stopped.is_set():
+                break
+            publish(False, item, None)
+    except BaseException as e:
+        publish(True, None, e)
+        return
+    finally:
+        if isinstance(iterator, Generator):
+            iterator.close()
+    publish(True, None, None)
 
-    for idx, test_case in enumerate(test_cases, start=1):
-        test_input = test_case["input"]
-        expected_output = test_case["expected_output"]
 
-        test_script = get_testing_code(user_code, test_input, expected_output)
+async def iterate_in_sandbox_executor(
+    func: Callable[P, Iterator[T]], *args: P.args, **kwargs: P.kwargs
+) -> AsyncIterator[T]:
+    """
+    Consumes a blocking iterator on the sandbox thread pool, yielding its items as they arrive.
+
+    If the consumer stops early, the iterator is closed on its thread after
+    the item currently being produced.
+    """
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue[tuple[bool, T | None, BaseException | None]] = asyncio.Queue()
+    stopped = threading.Event()
 
+    def publish(done: bool, item: T | None, error: BaseException | None) -> None:
         try:
-            logger.info(f"Running test case {idx} with input: {test_input}")
-            container = client.containers.run(
-                "python:3.12-slim",
-                command=["python", "-c", test_script],
-                detach=True,
-                stderr=True,
-                stdout=True,
-                remove=True,
-                mem_limit="128m",
-                cpu_quota=50000,
-            )
-            container.wait()
-            logs = container.logs().decode("utf-8").strip()
+            loop.call_soon_threadsafe(queue.put_nowait, (done, item, error))
+        except RuntimeError:
+            stopped.set()  # the event loop is gone, nobody is listening
 
-            logger.debug(f"Container logs for test case {idx}: {logs}")
+    loop.run_in_executor(
+        sandbox_executor.get(),
+        drain_iterator,
+        functools.partial(func, *args, **kwargs),
+        publish,
+        stopped,
+    )
+    try:
+        while True:
+            done, item, error = await queue.get()
+            if error is not None:
+                raise error
+            if done:
+                return
+            yield cast(T, item)
+    finally:
+        stopped.set()
 
-            if "PASS" in logs:
-                passed_tests += 1
-                logger.info(f"Test case {idx} passed.")
-            else:
-                logger.warning(
-                    f"Test case {idx} failed. Expected: {expected_output}, Got: {logs}"
-                )
-        except docker.errors.ContainerError as e:
-            logger.error(
-                f"Test case {idx} failed due to a container error: {e.stderr.decode('utf-8')}"
+
+def compile_submission(
+    backend: ExecutionBackend, language: LanguageSpec, user_code: str
+) -> Build:
+    """
+    Compiles a submission once for all of its test cases and sandboxes.
+
+    Builds are cached by language and exact source, so resubmitting the same
+    code, e.g. with another execution mode, does not compile it again.
+    Builds that failed for reasons unrelated to the code are not cached.
+    """
+    key = build_key(language, user_code)
+    build = build_cache.get(key)
+    if build is not None:
+        return build
+    build = backend.compile(language, user_code)
+    if build.cacheable:
+        build_cache.set(key, build)
+    return build
+
+
+def compilation_error_result(index: int, error: str) -> TestCaseResult:
+    """
+    Result for a test case of a submission that does not compile.
+    """
+    return TestCaseResult(index=index, verdict=Verdict.COMPILATION_ERROR, error=error)
+
+
+def split_round_robin(total: int, parts: int) -> list[list[int]]:
+    """
+    Deals test case indices (1-based) round-robin into at most ``parts`` groups.
+
+    Round-robin keeps every group spread over the whole suite, so results in
+    index order become available at roughly the same pace from every group.
+    """
+    parts = max(1, min(parts, total))
+    return [list(range(start, total + 1, parts)) for start in range(1, parts + 1)]
+
+
+async def run_test_group(
+    backend: ExecutionBackend,
+    user_code: str,
+    test_cases: list[TestCase],
+    indices: list[int],
+    max_failures: int | None,
+    limits: ResourceLimits | None,
+    queue: asyncio.Queue[TestCaseResult],
+    build: Build | None = None,
+) -> None:
+    """
+    Runs the test cases at ``indices`` in one sandbox, putting their results on the queue.
+
+    Results are renumbered to the indices of the whole suite. Every index
+    gets exactly one result, even if the batch fails.
+    """
+    reported: set[int] = set()
+    try:
+        async for result in iterate_in_sandbox_executor(
+            backend.run_batch,
+            user_code,
+            [test_cases[idx - 1] for idx in indices],
+            max_failures,
+            limits,
+            build,
+        ):
+            if not 1 <= result.index <= len(indices):
+                continue
+            index = indices[result.index - 1]
+            reported.add(index)
+            await queue.put(result.model_copy(update={"index": index}))
+    except Exception as e:
+        logger.error(f"Parallel test group failed: {str(e)}")
+    for index in indices:
+        if index not in reported:
+            await queue.put(missing_result(index))
+
+
+async def stream_parallel_results(
+    backend: ExecutionBackend,
+    user_code: str,
+    test_cases: list[TestCase],
+    max_failures: int | None = None,
+    limits: ResourceLimits | None = None,
+    parallelism: int = settings.SANDBOX_PARALLELISM,
+    build: Build | None = None,
+) -> AsyncIterator[TestCaseResult]:
+    """
+    Runs groups of test cases concurrently in separate sandboxes.
+
+    Every group is a regular batch on the sandbox thread pool, whose size is
+    the global cap on concurrent sandboxes, so a parallel submission never
+    exceeds it either. Results are yielded in test case order, and the
+    failure limit is applied in that order too, giving the same verdicts as
+    a sequential run.
+
+    Args:
+        backend (ExecutionBackend): Backend every group runs in.
+        user_code (str): The user's code as a string.
+        test_cases (list[TestCase]): Test cases to run.
+        max_failures (int | None): Stop after this many failed test cases.
+        limits (ResourceLimits | None): Resource limits of the task.
+        parallelism (int): Maximum number of sandboxes used by the submission.
+        build (Build | None): Artifacts of a compiled submission, shared by
+            every group.
+
+    Yields:
+        TestCaseResult: One result per test case, in order.
+    """
+    queue: asyncio.Queue[TestCaseResult] = asyncio.Queue()
+    parallelism = min(parallelism, settings.SANDBOX_MAX_WORKERS)
+    groups = split_round_robin(len(test_cases), parallelism)
+    workers = [
+        asyncio.create_task(
+            run_test_group(
+                backend,
+                user_code,
+                test_cases,
+                group,
+                max_failures,
+                limits,
+                queue,
+                build,
             )
-        except docker.errors.DockerException as e:
-            logger.error(f"Test case {idx} failed due to a Docker error: {str(e)}")
+        )
+        for group in groups
+    ]
+    logger.info(f"Running {len(test_cases)} test case(s) in {len(groups)} sandbox(es)")
+
+    pending: dict[int, TestCaseResult] = {}
+    failures = 0
+    try:
+        for index in range(1, len(test_cases) + 1):
+            if max_failures is not None and failures >= max_failures:
+                yield skipped_result(index)
+                continue
+            while index not in pending:
+                result = await queue.get()
+                pending.setdefault(result.index, result)
+            result = pending.pop(index)
+            if not result.passed and result.verdict is not Verdict.SKIPPED:
+                failures += 1
+            yield result
+    finally:
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
 
-    total_tests = len(test_cases)
-    percentage = (passed_tests / total_tests) * 100 if total_tests > 0 else 0
-    result_string = (
-        f"{passed_tests} out of {total_tests} tests passed ({percentage:.2f}%)."
+
+def is_cacheable(result: TestCaseResult) -> bool:
+    """
+    Whether a result depends only on the code, not on sandbox failures or load.
+    """
+    return (
+        result.error != MISSING_RESULT_ERROR
+        and result.verdict is not Verdict.TIME_LIMIT_EXCEEDED
     )
-    logger.info(f"Testing summary for {task_name}: {result_string}")
-    client.close()
-    return result_string
 
 
-if __name__ == "__main__":
+def run_submission(
+    backend: ExecutionBackend,
+    task: TaskSchema,
+    user_code: str,
+    options: ExecutionOptions,
+    build: Build | None = None,
+) -> AsyncIterator[TestCaseResult]:
+    """
+    Runs a submission that compiles, in one sandbox or spread over several.
+    """
+    if options.parallel and len(task.test_cases) > 1:
+        return stream_parallel_results(
+            backend,
+            user_code,
+            task.test_cases,
+            options.max_failures,
+            task.limits,
+            build=build,
+        )
+    return iterate_in_sandbox_executor(
+        backend.run_batch,
+        user_code,
+        task.test_cases,
+        options.max_failures,
+        task.limits,
+        build,
+    )
+
+
+async def stream_test_results(
+    task: TaskSchema,
+    user_code: str,
+    options: ExecutionOptions | None = None,
+    cache: SubmissionResultCache | None = result_cache,
+    language: Language = Language.PYTHON,
+) -> AsyncIterator[TestCaseResult]:
+    """
+    Runs the user's code against the task's test cases, yielding each result as it completes.
+
+    Code that does not compile gets a compilation error verdict for every
+    test case without running any of them. Python is checked on the host,
+    compiled languages are built once in a sandbox and the artifacts are
+    shared by every test case. With ``options.parallel`` the test cases are
+    spread over several sandboxes, otherwise they run one after another in a
+    single sandbox of the task's execution backend.
+
+    Submissions already graded for the same task version, language and
+    normalized code are answered from the result cache without starting a
+    sandbox. Runs that lost results to a sandbox failure or hit a time limit
+    are not cached.
+
+    Args:
+        task (TaskSchema): The task to be tested.
+        user_code (str): The user's code as a string.
+        options (ExecutionOptions | None): Execution mode, runs everything by default.
+        cache (SubmissionResultCache | None): Result cache, None disables caching.
+        language (Language): Language the code is written in.
+
+    Yields:
+        TestCaseResult: One result per test case, in order.
+    """
+    options = options or ExecutionOptions()
+    spec = get_language(language)
+    compile_error = None
+    if not spec.compiled:
+        # Compiling is CPU-bound and grows with the code: keep it off the loop.
+        compile_error = await run_in_sandbox_executor(check_syntax, user_code)
+
+    if compile_error is None and cache is not None:
+        cached = await cache.get(task, user_code, options, language)
+        if cached is not None:
+            logger.info(f"Serving cached result for task '{task.name}'")
+            for result in cached.results:
+                yield result
+            return
+
+    backend = get_execution_backend(task)
+    build = None
+    if compile_error is None and spec.compiled:
+        build = await run_in_sandbox_executor(
+            compile_submission, backend, spec, user_code
+        )
+        compile_error = build.error
+
+    if compile_error is not None:
+        metrics.increment("submissions_compilation_errors")
+        logger.info(f"Submission for task '{task.name}' does not compile")
+        for idx in range(1, len(task.test_cases) + 1):
+            yield compilation_error_result(idx, compile_error)
+        return
+
+    results: list[TestCaseResult] = []
+    async for result in run_submission(backend, task, user_code, options, build):
+        if result.passed:
+            logger.info(f"Test case {result.index} passed.")
+        else:
+            logger.warning(f"Test case {result.index} failed: {result.error}")
+        results.append(result)
+        yield result
+
+    if cache is not None and all(is_cacheable(r) for r in results):
+        await cache.set(
+            task,
+            user_code,
+            options,
+            SubmissionResult.from_results(task.name, len(task.test_cases), results),
+            language,
+        )
+
+
+async def run_code_in_docker(
+    task_name: str,
+    user_code: str,
+    task_service: TaskService,
+    options: ExecutionOptions | None = None,
+    language: Language = Language.PYTHON,
+) -> SubmissionResult:
+    """
+    Runs the user's code in a sandbox and validates it against test cases.
+
+    The sandbox is provided by the task's execution backend, a Docker
+    container unless configured otherwise.
+
+    Args:
+        task_name (str): The name of the task to be tested.
+        user_code (str): The user's code as a string.
+        task_service (TaskService): Service the task definition is loaded from.
+        options (ExecutionOptions | None): Execution mode, runs everything by default.
+        language (Language): Language the code is written in.
+
+    Returns:
+        SubmissionResult: Per-test-case results and a summary string indicating
+            the number and percentage of tests passed.
+
+    Raises:
+        TaskNotFound: If the task does not exist.
+        TestCaseSetNotFound: If the test cases of the task are missing.
+    """
+    task = await task_service.get_task_for_execution(task_name)
+    logger.info(f"Loaded task '{task_name}' successfully.")
+    logger.debug("Test cases: {}".format(task.test_cases))
+
+    if not task.test_cases:
+        logger.warning(f"No test cases found for task '{task_name}'.")
+        return SubmissionResult.no_test_cases(task_name)
+
+    results = [
+        result
+        async for result in stream_test_results(
+            task, user_code, options, language=language
+        )
+    ]
+
+    submission_result = SubmissionResult.from_results(
+        task_name, len(task.test_cases), results
+    )
+    logger.info(f"Testing summary for {task_name}: {submission_result.summary}")
+    return submission_result
+
+
+async def main() -> None:
+    await db_client.connect()
+    task_service = TaskService(
+        TaskRepository(db_client), TestCaseSetRepository(db_client)
+    )
     task_name = "sum_with_inversion"
 
     user_code = """
@@ -133,5 +524,12 @@ reversed_number = int(str(number)[::-1])
 print(f"{number} + {reversed_number} = {number + reversed_number}")
     """
 
-    result = asyncio.run(run_code_in_docker(task_name, user_code))
-    print(result)
+    try:
+        result = await run_code_in_docker(task_name, user_code, task_service)
+        print(result.summary)
+    finally:
+        await db_client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, patch
+
+from app.api.v1.dependencies import get_task_service
+from app.main import app
+from app.schemas.submission import TestCaseResult, Verdict
+from app.schemas.task import TaskSchema
+from app.utils.task_runner import sandbox_executor
+
+SUBMISSIONS = 8
+CONTAINER_SECONDS = 0.5
+
+TASK = TaskSchema(
+    name="slow_task",
+    description="",
+    input="",
+    output="",
+    examples=[],
+    test_cases=[{"input": "1", "expected_output": "1"}],
+)
+
+
+def blocking_test_batch(
+    user_code, test_cases, max_failures=None, limits=None, build=None
+):
+    """Stands in for a container run: blocks its thread like the docker SDK does."""
+    time.sleep(CONTAINER_SECONDS)
+    yield TestCaseResult(index=1, verdict=Verdict.ACCEPTED, output="1")
+
+
+@pytest.fixture
+def task_service():
+    service = AsyncMock()
+    service.get_task_for_execution.return_value = TASK
+    app.dependency_overrides[get_task_service] = lambda: service
+    yield service
+    app.dependency_overrides.clear()
+
+
+@pytest.mark.asyncio
+async def test_slow_submissions_do_not_block_the_event_loop(task_service):
+    assert sandbox_executor.max_workers >= SUBMISSIONS
+
+    with patch(
+        "app.utils.docker_backend.DockerBackend.run_batch",
+        side_effect=blocking_test_batch,
+    ):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            started = time.perf_counter()
+            submissions = [
+                asyncio.create_task(
+                    client.post(
+                        "/api/v1/tasks/send_task/slow_task", json={"code": "print(1)"}
+                    )
+                )
+                for _ in range(SUBMISSIONS)
+            ]
+            await asyncio.sleep(CONTAINER_SECONDS / 5)
+
+            probe_started = time.perf_counter()
+            probe = await client.get("/api/v1/")
+            probe_latency = time.perf_counter() - probe_started
+
+            responses = await asyncio.gather(*submissions)
+            elapsed = time.perf_counter() - started
+
+    assert probe.status_code == 200
+    assert probe_latency < CONTAINER_SECONDS / 2
+    assert all(response.status_code == 200 for response in responses)
+    assert all(
+        response.json() == {"result": "1 out of 1 tests passed (100.00%)."}
+        for response in responses
+    )
+    # Submissions ran concurrently instead of one after another.
+    assert elapsed < SUBMISSIONS * CONTAINER_SECONDS / 2
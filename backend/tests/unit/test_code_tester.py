@@ -0,0 +1,256 @@
+import io
+import subprocess
+import sys
+import tarfile
+
+from app.schemas.code import Language
+from app.schemas.submission import Verdict
+from app.schemas.task import ResourceLimits, TestCase
+from app.utils.code_tester import (
+    HARNESS_SOURCE,
+    check_syntax,
+    get_testing_archive,
+    get_testing_payload,
+)
+from app.utils.execution_backend import BatchResults
+from app.utils.languages import Build, LanguageSpec
+
+USER_CODE = """
+number = int(input())
+reversed_number = int(str(number)[::-1])
+print(f"{number} + {reversed_number} = {number + reversed_number}")
+"""
+
+TEST_CASES = [
+    TestCase(input="34", expected_output="34 + 43 = 77"),
+    TestCase(input="45", expected_output="45 + 54 = 100"),
+    TestCase(input="ab", expected_output="ab"),
+]
+
+
+def run_harness(payload: bytes, tmp_path) -> str:
+    harness = tmp_path / "harness.py"
+    harness.write_bytes(HARNESS_SOURCE)
+    completed = subprocess.run(
+        [sys.executable, str(harness)],
+        input=payload,
+        capture_output=True,
+        timeout=30,
+    )
+    return completed.stdout.decode()
+
+
+def parse_results(logs: str, total: int):
+    results = BatchResults(total)
+    return sorted(
+        [*results.feed(logs.splitlines()), *results.finish()],
+        key=lambda result: result.index,
+    )
+
+
+def test_harness_reports_every_test_case(tmp_path):
+    logs = run_harness(get_testing_payload(USER_CODE, TEST_CASES), tmp_path)
+
+    results = parse_results(logs, len(TEST_CASES))
+
+    assert [result.index for result in results] == [1, 2, 3]
+    assert results[0].verdict is Verdict.ACCEPTED
+    assert results[1].verdict is Verdict.WRONG_ANSWER
+    assert results[1].output == "45 + 54 = 99"
+    assert results[2].verdict is Verdict.RUNTIME_ERROR
+
+
+def test_harness_handles_quotes_and_backslashes(tmp_path):
+    user_code = 's = r"""a\\b\'c"""\nprint(input() + s)'
+    test_cases = [TestCase(input='x"', expected_output="x\"a\\b'c")]
+
+    logs = run_harness(get_testing_payload(user_code, test_cases), tmp_path)
+
+    assert parse_results(logs, 1)[0].verdict is Verdict.ACCEPTED
+
+
+def test_batch_results_fill_missing_cases(tmp_path):
+    logs = run_harness(get_testing_payload(USER_CODE, TEST_CASES[:1]), tmp_path)
+
+    results = parse_results(logs + "garbage line\n", 2)
+
+    assert results[0].verdict is Verdict.ACCEPTED
+    assert results[1].verdict is Verdict.RUNTIME_ERROR
+    assert results[1].error == "No result reported for this test case."
+
+
+def test_harness_truncates_large_output(tmp_path):
+    user_code = "print('x' * 100000)"
+    test_cases = [
+        TestCase(input="", expected_output="x" * 100000),
+        TestCase(input="", expected_output="y"),
+    ]
+
+    logs = run_harness(get_testing_payload(user_code, test_cases), tmp_path)
+    accepted, wrong = parse_results(logs, 2)
+
+    assert accepted.verdict is Verdict.ACCEPTED
+    assert wrong.verdict is Verdict.WRONG_ANSWER
+    assert wrong.output == "x" * 4096 + "... (95904 more characters)"
+    assert len(wrong.error) < 2 * 4096 + 100
+    assert len(logs) < 20000
+
+
+def test_harness_stops_after_max_failures(tmp_path):
+    payload = get_testing_payload(USER_CODE, TEST_CASES, max_failures=1)
+    logs = run_harness(payload, tmp_path)
+
+    reported = [line for line in logs.splitlines() if line.startswith("__RESULT__")]
+
+    assert len(reported) == 2
+
+
+def test_testing_archive_contains_only_the_harness(tmp_path):
+    payload = get_testing_payload(USER_CODE, TEST_CASES)
+
+    with tarfile.open(fileobj=io.BytesIO(get_testing_archive("run"))) as tar:
+        tar.extractall(tmp_path, filter="data")
+
+    assert [path.name for path in (tmp_path / "run").iterdir()] == ["harness.py"]
+    assert (tmp_path / "run" / "harness.py").read_bytes() == HARNESS_SOURCE
+    completed = subprocess.run(
+        [sys.executable, "run/harness.py"],
+        input=payload.decode(),
+        cwd=tmp_path,
+        capture_output=True,
+        text=True,
+        timeout=30,
+    )
+    assert len(parse_results(completed.stdout, len(TEST_CASES))) == 3
+
+
+def test_check_syntax_describes_the_error():
+    assert check_syntax(USER_CODE) is None
+    assert check_syntax("x = (1,\n") == (
+        "SyntaxError: '(' was never closed (line 1, column 5)"
+    )
+
+
+def test_harness_reports_compilation_error_for_every_case(tmp_path):
+    logs = run_harness(get_testing_payload("print(", TEST_CASES), tmp_path)
+
+    results = parse_results(logs, len(TEST_CASES))
+
+    assert {result.verdict for result in results} == {Verdict.COMPILATION_ERROR}
+
+
+def test_harness_measures_each_test_case(tmp_path):
+    logs = run_harness(get_testing_payload(USER_CODE, TEST_CASES[:1]), tmp_path)
+
+    result = parse_results(logs, 1)[0]
+
+    assert result.verdict is Verdict.ACCEPTED
+    assert result.cpu_time_ms is not None and result.cpu_time_ms >= 0
+    assert result.peak_memory_kb is not None and result.peak_memory_kb > 0
+
+
+def test_harness_enforces_memory_limit(tmp_path):
+    user_code = "data = bytearray(64 * 1024 * 1024)\nprint(input())"
+    payload = get_testing_payload(
+        user_code,
+        [TestCase(input="1", expected_output="1")],
+        limits=ResourceLimits(memory_limit_mb=48),
+    )
+
+    result = parse_results(run_harness(payload, tmp_path), 1)[0]
+
+    assert result.verdict is Verdict.MEMORY_LIMIT_EXCEEDED
+    assert result.output == "1"
+
+
+def test_harness_survives_user_code_that_exits(tmp_path):
+    payload = get_testing_payload(
+        "print(input())\nraise SystemExit(3)", TEST_CASES[:1] * 2
+    )
+
+    results = parse_results(run_harness(payload, tmp_path), 2)
+
+    assert [r.verdict for r in results] == [Verdict.RUNTIME_ERROR] * 2
+
+
+def test_harness_kills_test_cases_over_the_time_limit(tmp_path):
+    user_code = "if input() == 'loop':\n    while True:\n        pass\nprint('done')"
+    payload = get_testing_payload(
+        user_code,
+        [
+            TestCase(input="loop", expected_output="done"),
+            TestCase(input="go", expected_output="done"),
+        ],
+        limits=ResourceLimits(time_limit_ms=200),
+    )
+
+    results = parse_results(run_harness(payload, tmp_path), 2)
+
+    assert [r.verdict for r in results] == [
+        Verdict.TIME_LIMIT_EXCEEDED,
+        Verdict.ACCEPTED,
+    ]
+    assert results[0].wall_time_ms < 2000
+
+
+def test_harness_runs_the_command_of_a_compiled_submission(tmp_path):
+    language = LanguageSpec(
+        name=Language.CPP,
+        image="",
+        source_file="main.sh",
+        compile_command=("true",),
+        run_command=("./main",),
+    )
+    build = Build(
+        language=language,
+        files={"main": b"#!/bin/sh\nread line\n[ $line = 2 ] && exit 3\necho $line\n"},
+    )
+    payload = get_testing_payload(
+        "",
+        [
+            TestCase(input="1", expected_output="1"),
+            TestCase(input="2", expected_output="2"),
+        ],
+        build=build,
+    )
+
+    results = parse_results(run_harness(payload, tmp_path), 2)
+
+    assert [r.verdict for r in results] == [
+        Verdict.ACCEPTED,
+        Verdict.RUNTIME_ERROR,
+    ]
+    assert results[1].error == "Exit status 3"
+
+
+def test_user_code_cannot_replace_the_grader(tmp_path):
+    user_code = (
+        "import sys\n"
+        "sys.modules['__main__'].grade = lambda r, e: ('ACCEPTED', e, None)\n"
+        "print('forged')"
+    )
+    payload = get_testing_payload(user_code, TEST_CASES[:1] * 2)
+
+    results = parse_results(run_harness(payload, tmp_path), 2)
+
+    assert [r.verdict for r in results] == [Verdict.WRONG_ANSWER] * 2
+    assert [r.output for r in results] == ["forged"] * 2
+
+
+def test_expected_outputs_are_not_in_the_memory_of_the_user_code(tmp_path):
+    user_code = (
+        "import gc\n"
+        "secret = 'hid' + 'den-'\n"
+        "print(any(\n"
+        "    isinstance(o, list) and any(isinstance(x, str) and x.startswith(secret) for x in o)\n"
+        "    for o in gc.get_objects()\n"
+        "))"
+    )
+    test_cases = [TestCase(input="", expected_output="hidden-answer")]
+
+    result = parse_results(
+        run_harness(get_testing_payload(user_code, test_cases), tmp_path), 1
+    )[0]
+
+    assert result.verdict is Verdict.WRONG_ANSWER
+    assert result.output == "False"
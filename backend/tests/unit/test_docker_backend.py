@@ -0,0 +1,174 @@
+import io
+import socket
+import struct
+import tarfile
+import threading
+import time
+from contextlib import contextmanager
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.schemas.code import Language
+from app.schemas.submission import Verdict
+from app.schemas.task import TestCase
+from app.utils import docker_backend
+from app.utils.docker_backend import DockerBackend, exec_with_stdin
+from app.utils.languages import get_language
+
+
+@pytest.fixture(autouse=True)
+def exec_output(monkeypatch):
+    """Serves the harness output from the ``exec_run`` mock of the container."""
+    monkeypatch.setattr(
+        docker_backend,
+        "exec_with_stdin",
+        lambda container, command, data: container.exec_run(command, data)[1],
+    )
+
+
+def make_pool(chunks):
+    container = MagicMock()
+    container.exec_run.return_value = (None, iter(chunks))
+    pool = MagicMock()
+
+    @contextmanager
+    def lease():
+        yield container
+
+    pool.lease = lease
+    return pool
+
+
+def test_run_batch_yields_results_split_across_chunks():
+    pool = make_pool(
+        [
+            b'__RESULT__{"index": 1, "verdict": "ACCEPTED", ',
+            b'"output": "1"}\nnoise\n__RESULT__{"index": 2, "verdict": "WRONG_ANSWER"}',
+        ]
+    )
+    test_cases = [TestCase(input="1", expected_output="1")] * 2
+
+    results = list(DockerBackend(pool).run_batch("print(input())", test_cases))
+
+    assert [(r.index, r.verdict) for r in results] == [
+        (1, Verdict.ACCEPTED),
+        (2, Verdict.WRONG_ANSWER),
+    ]
+
+
+def test_run_batch_reports_missing_cases_last():
+    pool = make_pool([b'__RESULT__{"index": 2, "verdict": "ACCEPTED"}\n'])
+    test_cases = [TestCase(input="1", expected_output="1")] * 2
+
+    results = list(DockerBackend(pool).run_batch("print(input())", test_cases))
+
+    assert [(r.index, r.verdict) for r in results] == [
+        (2, Verdict.ACCEPTED),
+        (1, Verdict.RUNTIME_ERROR),
+    ]
+
+
+def test_run_batch_kills_container_after_submission_timeout():
+    killed = threading.Event()
+
+    def output():
+        yield b'__RESULT__{"index": 1, "verdict": "ACCEPTED"}\n'
+        killed.wait(5)
+
+    container = MagicMock()
+    container.exec_run.return_value = (None, output())
+    container.kill.side_effect = killed.set
+    pool = make_pool([])
+    pool.lease = contextmanager(lambda: (yield container))
+    test_cases = [TestCase(input="1", expected_output="1")] * 2
+
+    started = time.perf_counter()
+    results = list(DockerBackend(pool, timeout=0.2).run_batch("", test_cases))
+
+    assert time.perf_counter() - started < 2
+    container.kill.assert_called_once()
+    assert [(r.index, r.verdict) for r in results] == [
+        (1, Verdict.ACCEPTED),
+        (2, Verdict.TIME_LIMIT_EXCEEDED),
+    ]
+
+
+def test_run_batch_marks_cases_after_failure_limit_as_skipped():
+    pool = make_pool([b'__RESULT__{"index": 1, "verdict": "WRONG_ANSWER"}\n'])
+    test_cases = [TestCase(input="1", expected_output="1")] * 3
+
+    results = list(
+        DockerBackend(pool).run_batch("print(0)", test_cases, max_failures=1)
+    )
+
+    assert [(r.index, r.verdict) for r in results] == [
+        (1, Verdict.WRONG_ANSWER),
+        (2, Verdict.SKIPPED),
+        (3, Verdict.SKIPPED),
+    ]
+
+
+def make_tar(name, content):
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w") as archive:
+        info = tarfile.TarInfo(name)
+        info.size = len(content)
+        archive.addfile(info, io.BytesIO(content))
+    return buffer.getvalue()
+
+
+def test_compile_runs_in_a_pool_of_the_compiler_image():
+    pool = make_pool([])
+    backend = DockerBackend(pool)
+    language = get_language(Language.CPP)
+    container = pool.docker_client.client.containers.run.return_value
+    container.exec_run.return_value = (0, b"")
+    container.get_archive.return_value = ([make_tar("main", b"\x7fELF")], {})
+
+    build = backend.compile(language, "int main() {}")
+
+    assert build.error is None and build.files == {"main": b"\x7fELF"}
+    assert backend.pools[language.compile_image].image == language.compile_image
+    image = pool.docker_client.client.containers.run.call_args.args[0]
+    assert image == language.compile_image
+    command = container.exec_run.call_args.args[0]
+    assert command == list(language.compile_command)
+    container.remove.assert_called_once_with(force=True)
+
+
+def test_compile_reports_compiler_output():
+    pool = make_pool([])
+    container = pool.docker_client.client.containers.run.return_value
+    container.exec_run.return_value = (1, b"main.cpp:1: error: expected '}'\n")
+
+    build = DockerBackend(pool).compile(get_language(Language.CPP), "int main() {")
+
+    assert build.error == "main.cpp:1: error: expected '}'"
+    container.get_archive.assert_not_called()
+
+
+def test_exec_with_stdin_sends_the_payload_and_reads_stdout():
+    ours, theirs = socket.socketpair()
+    container = MagicMock()
+    container.client.api.exec_create.return_value = {"Id": "exec"}
+    container.client.api.exec_start.return_value = ours
+    received = []
+
+    def harness():
+        chunks = iter(lambda: theirs.recv(65536), b"")
+        received.append(b"".join(chunks))
+        for stream, data in [(1, b"out\n"), (2, b"err\n"), (1, b"more")]:
+            theirs.sendall(struct.pack(">BxxxL", stream, len(data)) + data)
+        theirs.close()
+
+    thread = threading.Thread(target=harness)
+    thread.start()
+    output = b"".join(exec_with_stdin(container, ["python"], b"payload"))
+    thread.join()
+
+    assert received == [b"payload"]
+    assert output == b"out\nmore"
+    container.client.api.exec_create.assert_called_once_with(
+        container.id, ["python"], stdin=True, stdout=True, stderr=False
+    )
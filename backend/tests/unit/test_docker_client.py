@@ -0,0 +1,28 @@
+from unittest.mock import MagicMock, patch
+
+from app.utils.docker_client import DockerClientManager
+
+
+def test_connect_creates_one_client_with_the_configured_pool():
+    manager = DockerClientManager(max_pool_size=8, timeout=30)
+
+    with patch("app.utils.docker_client.docker.from_env") as from_env:
+        first = manager.connect()
+        second = manager.client
+
+    assert first is second
+    from_env.assert_called_once_with(max_pool_size=8, timeout=30)
+
+
+def test_close_closes_the_client_and_allows_reconnecting():
+    manager = DockerClientManager()
+    clients = [MagicMock(), MagicMock()]
+
+    with patch("app.utils.docker_client.docker.from_env", side_effect=clients):
+        manager.connect()
+        manager.close()
+        manager.close()
+        reconnected = manager.client
+
+    clients[0].close.assert_called_once()
+    assert reconnected is clients[1]
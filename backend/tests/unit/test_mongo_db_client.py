@@ -2,9 +2,12 @@ import re
 import pytest
 
 from unittest.mock import AsyncMock, patch
+from pymongo import monitoring
 from pymongo.errors import ConnectionFailure
 
+from app.core.metrics import metrics
 from app.db.database import AsyncMongoDBClient
+from app.db.pool_metrics import PoolMetricsListener
 
 
 @pytest.mark.asyncio
@@ -87,3 +90,74 @@ async def test_connect_failure():
         with pytest.raises(ConnectionFailure):
             await client.connect()
         assert client._connected is False
+
+
+def test_pool_options_come_from_the_settings():
+    """Check the connection pool is configured"""
+    client = AsyncMongoDBClient(
+        max_pool_size=8,
+        min_pool_size=2,
+        max_idle_time_ms=1000,
+        wait_queue_timeout_ms=500,
+        compressors="zlib",
+    )
+
+    pool_options = client._client.options.pool_options
+    assert pool_options.max_pool_size == 8
+    assert pool_options.min_pool_size == 2
+    assert pool_options.max_idle_time_seconds == 1
+    assert pool_options.wait_queue_timeout == 0.5
+    assert any(
+        isinstance(listener, PoolMetricsListener)
+        for listener in client._client.options.event_listeners
+    )
+
+
+def test_pool_listener_exports_pool_metrics():
+    """Check pool events are turned into metrics"""
+    address = ("mongo", 27017)
+    listener = PoolMetricsListener()
+    checkouts = metrics.get("mongo_pool_checkouts")
+
+    listener.connection_created(monitoring.ConnectionCreatedEvent(address, 1))
+    listener.connection_check_out_started(
+        monitoring.ConnectionCheckOutStartedEvent(address)
+    )
+    listener.connection_check_out_started(
+        monitoring.ConnectionCheckOutStartedEvent(address)
+    )
+    listener.connection_checked_out(
+        monitoring.ConnectionCheckedOutEvent(address, 1, 0.25)
+    )
+
+    assert metrics.get("mongo_pool_connections") == 1
+    assert metrics.get("mongo_pool_in_use") == 1
+    assert metrics.get("mongo_pool_wait_queue") == 1
+    assert metrics.get("mongo_pool_checkouts") == checkouts + 1
+    assert metrics.get("mongo_pool_checkout_last_ms") == 250
+
+    listener.connection_check_out_failed(
+        monitoring.ConnectionCheckOutFailedEvent(
+            address, monitoring.ConnectionCheckOutFailedReason.TIMEOUT, 1.0
+        )
+    )
+    listener.connection_checked_in(monitoring.ConnectionCheckedInEvent(address, 1))
+
+    assert metrics.get("mongo_pool_in_use") == 0
+    assert metrics.get("mongo_pool_wait_queue") == 0
+    assert metrics.get("mongo_pool_checkout_timeouts") >= 1
+
+
+@pytest.mark.asyncio
+async def test_get_collection_reuses_the_handle():
+    """Check collection handles are resolved once per client"""
+    mock_db = AsyncMock()
+    with patch("app.db.database.AsyncMongoClient.__getitem__", return_value=mock_db):
+        client = AsyncMongoDBClient()
+        client._connected = True
+
+        first = await client.get_collection("test_collection")
+        second = await client.get_collection("test_collection")
+
+        assert first is second
+        mock_db.__getitem__.assert_called_once_with("test_collection")
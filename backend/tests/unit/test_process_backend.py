@@ -0,0 +1,241 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+import pytest
+from unittest.mock import patch
+
+from app.errors.sandbox_errors import SandboxPrivilegeError
+from app.schemas.code import Language
+from app.schemas.submission import Verdict
+from app.schemas.task import ResourceLimits, TestCase
+from app.utils.languages import get_language
+from app.utils.process_backend import ProcessBackend
+
+
+def sandbox_can_run_python() -> bool:
+    """
+    Whether the sandbox user may execute the interpreter of the backend.
+
+    As root the backend runs the harness as an unprivileged user, which cannot
+    run an interpreter installed under a private home directory.
+    """
+    backend = ProcessBackend(size=0)
+    user = backend._sandbox_user()
+    if user is None:
+        return True
+    try:
+        subprocess.run(
+            [backend.python, "-I", "-c", ""],
+            cwd="/",
+            user=user.pw_uid,
+            group=user.pw_gid,
+            extra_groups=[],
+            capture_output=True,
+            check=True,
+            timeout=30,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return True
+
+
+pytestmark = pytest.mark.skipif(
+    not sandbox_can_run_python(),
+    reason="the sandbox user cannot run the interpreter, set PROCESS_PYTHON",
+)
+
+ECHO_CASES = [
+    TestCase(input="1", expected_output="1"),
+    TestCase(input="2", expected_output="3"),
+]
+
+
+def is_running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def wait_until_gone(pid: int, timeout: float = 2) -> bool:
+    deadline = time.monotonic() + timeout
+    while is_running(pid):
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def backend():
+    backend = ProcessBackend(size=2, timeout=5, allow_unprivileged=True)
+    backend.start()
+    yield backend
+    backend.stop()
+
+
+def test_backend_refuses_to_run_code_unprivileged_by_default():
+    backend = ProcessBackend(size=1)
+
+    with patch("os.geteuid", return_value=1000):
+        with pytest.raises(SandboxPrivilegeError):
+            backend.start()
+
+    assert backend._harness_dir is None and not backend._idle
+
+
+def test_backend_warns_when_allowed_to_run_unprivileged(caplog):
+    backend = ProcessBackend(size=0, allow_unprivileged=True)
+
+    with patch("os.geteuid", return_value=1000):
+        backend.start()
+    backend.stop()
+
+    assert "not running as root" in caplog.text
+
+
+def test_run_batch_grades_every_test_case(backend):
+    results = list(backend.run_batch("print(input())", ECHO_CASES))
+
+    assert [(r.index, r.verdict) for r in results] == [
+        (1, Verdict.ACCEPTED),
+        (2, Verdict.WRONG_ANSWER),
+    ]
+    assert results[0].peak_memory_kb is not None
+
+
+def test_run_batch_uses_a_warm_process_and_replaces_it(backend):
+    warm_pids = {warm.process.pid for warm in backend._idle}
+
+    user_code = "import os\nprint(os.getsid(0))"
+    result = next(
+        backend.run_batch(user_code, [TestCase(input="", expected_output="")])
+    )
+
+    assert int(result.output) in warm_pids
+    assert len(backend._idle) == 2
+    assert warm_pids - {warm.process.pid for warm in backend._idle}
+
+
+def test_run_batch_isolates_the_process(backend):
+    user_code = (
+        "import os\nprint(os.getcwd().startswith('/tmp/sandbox-'), os.geteuid())"
+    )
+
+    result = next(
+        backend.run_batch(user_code, [TestCase(input="", expected_output="")])
+    )
+
+    in_workdir, euid = result.output.split()
+    assert in_workdir == "True"
+    if os.geteuid() == 0:
+        assert int(euid) != 0
+
+
+def test_run_batch_kills_the_process_after_the_submission_timeout():
+    backend = ProcessBackend(size=1, timeout=0.5, allow_unprivileged=True)
+    user_code = "import time\ntime.sleep(60)"
+    cases = [TestCase(input="", expected_output="")] * 2
+
+    try:
+        started = time.perf_counter()
+        results = list(
+            backend.run_batch(
+                user_code, cases, limits=ResourceLimits(time_limit_ms=60000)
+            )
+        )
+    finally:
+        backend.stop()
+
+    assert time.perf_counter() - started < 5
+    assert [r.verdict for r in results] == [Verdict.TIME_LIMIT_EXCEEDED] * 2
+
+
+def test_run_batch_kills_what_a_test_case_left_running(backend):
+    user_code = "import subprocess\nprint(subprocess.Popen(['sleep', '60']).pid)"
+
+    result = next(
+        backend.run_batch(user_code, [TestCase(input="", expected_output="")])
+    )
+
+    assert wait_until_gone(int(result.output))
+
+
+def test_submission_timeout_kills_the_processes_of_the_test_case():
+    backend = ProcessBackend(size=1, timeout=0.5, allow_unprivileged=True)
+    shared = tempfile.mkdtemp()
+    os.chmod(shared, 0o777)
+    pid_file = os.path.join(shared, "pid")
+    user_code = (
+        "import os, time\n"
+        "if os.fork() == 0:\n"
+        f"    open({pid_file!r}, 'w').write(str(os.getpid()))\n"
+        "time.sleep(60)"
+    )
+
+    try:
+        list(
+            backend.run_batch(
+                user_code,
+                [TestCase(input="", expected_output="")],
+                limits=ResourceLimits(time_limit_ms=60000),
+            )
+        )
+        with open(pid_file) as f:
+            pid = int(f.read())
+    finally:
+        backend.stop()
+        shutil.rmtree(shared, ignore_errors=True)
+
+    assert wait_until_gone(pid)
+
+
+def test_concurrent_fills_do_not_overfill_the_pool(backend):
+    spawn = backend._spawn
+    spawned = []
+
+    def slow_spawn():
+        time.sleep(0.05)
+        warm = spawn()
+        spawned.append(warm)
+        return warm
+
+    backend._spawn = slow_spawn
+    while backend._idle:
+        backend._discard(backend._idle.popleft())
+
+    threads = [threading.Thread(target=backend._fill) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(spawned) == 2
+    assert len(backend._idle) == 2
+
+
+@pytest.mark.skipif(shutil.which("g++") is None, reason="g++ is not installed")
+def test_compiled_submission_is_built_once_and_run_per_test_case(backend):
+    user_code = (
+        "#include <iostream>\nint main() { int x; std::cin >> x; std::cout << x; }"
+    )
+
+    build = backend.compile(get_language(Language.CPP), user_code)
+    results = list(backend.run_batch(user_code, ECHO_CASES, build=build))
+
+    assert build.error is None and build.files["main"]
+    assert [r.verdict for r in results] == [Verdict.ACCEPTED, Verdict.WRONG_ANSWER]
+
+
+@pytest.mark.skipif(shutil.which("g++") is None, reason="g++ is not installed")
+def test_compile_reports_compiler_errors(backend):
+    build = backend.compile(get_language(Language.CPP), "int main() { return x; }")
+
+    assert build.files == {}
+    assert "'x' was not declared" in build.error
+    assert build.cacheable
@@ -0,0 +1,129 @@
+import pytest
+from unittest.mock import patch
+
+from app.schemas.submission import (
+    ExecutionOptions,
+    SubmissionResult,
+    TestCaseResult,
+    Verdict,
+)
+from app.schemas.task import TaskSchema
+from app.utils.cache import TTLCache
+from app.utils.result_cache import SubmissionResultCache, hash_code, hash_task
+from app.utils.execution_backend import MISSING_RESULT_ERROR
+from app.utils.task_runner import stream_test_results
+
+TASK = TaskSchema(
+    name="echo",
+    description="",
+    input="",
+    output="",
+    examples=[],
+    test_cases=[{"input": "1", "expected_output": "1"}],
+)
+
+
+@pytest.fixture
+def cache():
+    return SubmissionResultCache(TTLCache(name="test_cache", maxsize=8, ttl=60))
+
+
+def test_hash_code_ignores_formatting_only_differences():
+    assert hash_code("x = input()\r\nprint(x)\n\n") == hash_code(
+        "\nx = input()\nprint(x)"
+    )
+    assert hash_code("print(1)") != hash_code("print(2)")
+
+
+def test_hash_code_keeps_whitespace_inside_string_literals():
+    assert hash_code('print("""a  \nb""")') != hash_code('print("""a\nb""")')
+
+
+def test_hash_task_uses_the_stored_test_case_hash():
+    stored = TASK.model_copy(update={"test_cases_hash": "abc"})
+    other_cases = stored.model_copy(update={"test_cases": []})
+
+    assert hash_task(stored) == hash_task(other_cases)
+    assert hash_task(stored) != hash_task(
+        stored.model_copy(update={"test_cases_hash": "def"})
+    )
+    assert hash_task(TASK) != hash_task(TASK.model_copy(update={"test_cases": []}))
+
+
+@pytest.mark.asyncio
+async def test_results_with_large_output_are_not_cached():
+    cache = SubmissionResultCache(
+        TTLCache(name="test_large", maxsize=8, ttl=60), max_output=10
+    )
+    options = ExecutionOptions()
+    large = SubmissionResult.from_results(
+        "echo",
+        1,
+        [TestCaseResult(index=1, verdict=Verdict.WRONG_ANSWER, output="x" * 11)],
+    )
+
+    await cache.set(TASK, "print(1)", options, large)
+
+    assert await cache.get(TASK, "print(1)", options) is None
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(name="test_lru", maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+
+def accepted_batch(user_code, test_cases, max_failures=None, limits=None, build=None):
+    yield TestCaseResult(index=1, verdict=Verdict.ACCEPTED, output="1")
+
+
+def crashed_batch(user_code, test_cases, max_failures=None, limits=None, build=None):
+    yield TestCaseResult(
+        index=1, verdict=Verdict.RUNTIME_ERROR, error=MISSING_RESULT_ERROR
+    )
+
+
+async def collect(cache, code, options=None):
+    return [r async for r in stream_test_results(TASK, code, options, cache)]
+
+
+@pytest.mark.asyncio
+async def test_repeated_submission_is_served_from_cache(cache):
+    with patch(
+        "app.utils.docker_backend.DockerBackend.run_batch", side_effect=accepted_batch
+    ) as batch:
+        first = await collect(cache, "print(input())")
+        second = await collect(cache, "print(input())\r\n")
+
+    assert batch.call_count == 1
+    assert first == second
+
+
+@pytest.mark.asyncio
+async def test_execution_mode_and_task_changes_miss_the_cache(cache):
+    with patch(
+        "app.utils.docker_backend.DockerBackend.run_batch", side_effect=accepted_batch
+    ) as batch:
+        await collect(cache, "print(input())")
+        await collect(cache, "print(input())", ExecutionOptions(mode="fail_fast"))
+        await cache.invalidate_task(TASK.name)
+        await collect(cache, "print(input())")
+
+    assert batch.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_sandbox_failures_are_not_cached(cache):
+    with patch(
+        "app.utils.docker_backend.DockerBackend.run_batch", side_effect=crashed_batch
+    ) as batch:
+        await collect(cache, "print(input())")
+        await collect(cache, "print(input())")
+
+    assert batch.call_count == 2
@@ -0,0 +1,88 @@
+import pytest
+from unittest.mock import MagicMock
+
+from app.core.metrics import metrics
+from app.utils.sandbox_pool import PooledContainer, SandboxPool
+
+
+@pytest.fixture(autouse=True)
+def reset_metrics():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+@pytest.fixture
+def docker_client():
+    client = MagicMock()
+
+    def make_container(*args, **kwargs):
+        container = MagicMock()
+        container.status = "running"
+        return container
+
+    client.containers.run.side_effect = make_container
+    return client
+
+
+def make_pool(docker_client, **kwargs) -> SandboxPool:
+    params = {"size": 2, "max_lifetime": 300, "max_uses": 1, "healthcheck_interval": 30}
+    params.update(kwargs)
+    return SandboxPool(docker_client=MagicMock(client=docker_client), **params)
+
+
+def test_lease_miss_creates_locked_down_container(docker_client):
+    pool = make_pool(docker_client)
+
+    with pool.lease() as container:
+        assert container.status == "running"
+
+    kwargs = docker_client.containers.run.call_args.kwargs
+    assert kwargs["network_disabled"] is True
+    assert kwargs["cap_drop"] == ["ALL"]
+    assert metrics.get("sandbox_pool_misses") == 1
+    assert metrics.get("sandbox_pool_hits") == 0
+    container.remove.assert_called_once_with(force=True)
+
+
+def test_lease_hit_uses_prestarted_container(docker_client):
+    pool = make_pool(docker_client)
+    pool._fill()
+    assert metrics.get("sandbox_pool_idle") == 2
+
+    with pool.lease():
+        pass
+
+    assert metrics.get("sandbox_pool_hits") == 1
+    assert metrics.get("sandbox_pool_misses") == 0
+    assert docker_client.containers.run.call_count == 2
+
+
+def test_container_is_recycled_until_max_uses(docker_client):
+    pool = make_pool(docker_client, max_uses=2)
+    pool._fill()
+
+    with pool.lease() as first:
+        pass
+    first.remove.assert_not_called()
+    assert metrics.get("sandbox_pool_recycled") == 1
+
+    leased = []
+    for _ in range(2):
+        with pool.lease() as container:
+            leased.append(container)
+    assert first in leased
+    first.remove.assert_called_once_with(force=True)
+
+
+def test_expired_and_unhealthy_containers_are_evicted(docker_client):
+    pool = make_pool(docker_client, max_lifetime=10)
+    expired = PooledContainer(container=MagicMock(status="running"), created_at=-100)
+    unhealthy = PooledContainer(container=MagicMock(status="exited"), created_at=1e12)
+    pool._idle.extend([expired, unhealthy])
+
+    pool._evict_stale()
+
+    assert len(pool._idle) == 0
+    expired.container.remove.assert_called_once_with(force=True)
+    unhealthy.container.remove.assert_called_once_with(force=True)
@@ -0,0 +1,123 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, patch
+
+from app.errors.submission_errors import SubmissionNotFound, SubmissionQueueFull
+from app.errors.task_errors import TaskNotFound
+from app.schemas.submission import SubmissionResult, SubmissionStatus
+from app.services.submission import (
+    EXECUTION_ERROR,
+    SHUTDOWN_ERROR,
+    SubmissionService,
+)
+
+
+async def wait_until_finished(service, submission_id):
+    for _ in range(100):
+        submission = await service.get_submission(submission_id)
+        if submission.status in (SubmissionStatus.COMPLETED, SubmissionStatus.FAILED):
+            return submission
+        await asyncio.sleep(0.01)
+    raise AssertionError("Submission did not finish")
+
+
+@pytest_asyncio.fixture
+async def service():
+    service = SubmissionService(AsyncMock(), max_queue_size=2, workers=1)
+    await service.start()
+    yield service
+    await service.stop()
+
+
+@pytest.mark.asyncio
+async def test_submission_completes_with_result(service):
+    result = SubmissionResult.from_results("task", 0, [])
+    with patch(
+        "app.services.submission.run_code_in_docker",
+        new_callable=AsyncMock,
+        return_value=result,
+    ):
+        submission = await service.submit("task", "print(1)")
+        assert submission.status is SubmissionStatus.QUEUED
+
+        finished = await wait_until_finished(service, submission.id)
+
+    assert finished.status is SubmissionStatus.COMPLETED
+    assert finished.result == result
+    assert finished.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_submission_for_unknown_task_fails(service):
+    with patch(
+        "app.services.submission.run_code_in_docker",
+        new_callable=AsyncMock,
+        side_effect=TaskNotFound("Task", {"name": "missing"}),
+    ):
+        submission = await service.submit("missing", "print(1)")
+        finished = await wait_until_finished(service, submission.id)
+
+    assert finished.status is SubmissionStatus.FAILED
+    assert finished.error == "Task with name 'missing' not found."
+
+
+@pytest.mark.asyncio
+async def test_internal_errors_are_not_shown_to_the_client(service):
+    with patch(
+        "app.services.submission.run_code_in_docker",
+        new_callable=AsyncMock,
+        side_effect=RuntimeError("mongodb://user:secret@db"),
+    ):
+        submission = await service.submit("task", "print(1)")
+        finished = await wait_until_finished(service, submission.id)
+
+    assert finished.status is SubmissionStatus.FAILED
+    assert finished.error == EXECUTION_ERROR
+
+
+@pytest.mark.asyncio
+async def test_stop_fails_unfinished_submissions():
+    service = SubmissionService(AsyncMock(), max_queue_size=2, workers=1)
+    await service.start()
+
+    async def blocked_run(*args):
+        await asyncio.Event().wait()
+
+    with patch("app.services.submission.run_code_in_docker", side_effect=blocked_run):
+        running = await service.submit("task", "print(1)")
+        await asyncio.sleep(0.01)  # the single worker picks up the first job
+        queued = await service.submit("task", "print(2)")
+        await service.stop()
+
+    for submission_id in (running.id, queued.id):
+        submission = await service.get_submission(submission_id)
+        assert submission.status is SubmissionStatus.FAILED
+        assert submission.error == SHUTDOWN_ERROR
+        assert submission.finished_at is not None
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_submissions(service):
+    release = asyncio.Event()
+
+    async def blocked_run(*args):
+        await release.wait()
+        return SubmissionResult.from_results("task", 0, [])
+
+    with patch("app.services.submission.run_code_in_docker", side_effect=blocked_run):
+        await service.submit("task", "print(1)")
+        await asyncio.sleep(0.01)  # the single worker picks up the first job
+        await service.submit("task", "print(2)")
+        await service.submit("task", "print(3)")
+
+        with pytest.raises(SubmissionQueueFull):
+            await service.submit("task", "print(4)")
+        release.set()
+
+
+@pytest.mark.asyncio
+async def test_unknown_submission_not_found(service):
+    with pytest.raises(SubmissionNotFound):
+        await service.get_submission("unknown")
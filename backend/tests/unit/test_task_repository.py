@@ -1,11 +1,17 @@
 import pytest
 from unittest.mock import AsyncMock, MagicMock, patch
-from pymongo import errors
+from pymongo import ReturnDocument, UpdateOne, errors
 from pymongo.asynchronous.collection import AsyncCollection
 
 from app.db.database import AsyncMongoDBClient
-from app.errors.task_errors import TaskNotFound, DatabaseConnectionError
+from app.errors.task_errors import (
+    DatabaseConnectionError,
+    TaskAlreadyExists,
+    TaskNotFound,
+    TaskVersionConflict,
+)
 from app.repositories.task import TaskRepository
+from app.utils.repository import ensure_indexes
 
 
 @pytest.fixture
@@ -35,7 +41,7 @@ async def test_get_task_success(task_repository):
     result = await task_repository.find_one({"name": "test_task"})
 
     assert result == {"name": "test_task", "description": "Test description"}
-    mock_collection.find_one.assert_called_once_with({"name": "test_task"})
+    mock_collection.find_one.assert_called_once_with({"name": "test_task"}, None)
 
 
 @pytest.mark.asyncio
@@ -98,21 +104,17 @@ async def test_create_task_success(task_repository):
     mock_collection.insert_one.return_value = MagicMock(inserted_id="new_id")
 
     task_data = {"name": "new_task", "description": "New task description"}
-    result = await task_repository.add_one(task_data)
+    result = await task_repository.add_one({**task_data, "version": 7})
 
-    assert result == {
-        "name": "new_task",
-        "description": "New task description",
-        "_id": "new_id",
-    }
-    mock_collection.insert_one.assert_called_once_with(task_data)
+    assert result == {**task_data, "version": 0, "_id": "new_id"}
+    mock_collection.insert_one.assert_called_once()
+    assert mock_collection.insert_one.call_args.args[0]["version"] == 0
 
 
 @pytest.mark.asyncio
 async def test_update_task_success(task_repository):
     mock_collection = await task_repository.db_client.get_collection("tasks")
-    mock_collection.update_one.return_value = MagicMock(matched_count=1)
-    mock_collection.find_one.return_value = {
+    mock_collection.find_one_and_update.return_value = {
         "name": "updated_task",
         "description": "Updated description",
     }
@@ -121,15 +123,35 @@ async def test_update_task_success(task_repository):
     result = await task_repository.update_one({"name": "existing_task"}, update_data)
 
     assert result == {"name": "updated_task", "description": "Updated description"}
-    mock_collection.update_one.assert_called_once_with(
-        {"name": "existing_task"}, {"$set": update_data}
+    mock_collection.find_one_and_update.assert_called_once_with(
+        {"name": "existing_task"},
+        {"$set": update_data, "$inc": {"version": 1}},
+        return_document=ReturnDocument.AFTER,
     )
+    mock_collection.find_one.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_update_task_keeps_update_operators(task_repository):
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    mock_collection.find_one_and_update.return_value = {"name": "existing_task"}
+
+    await task_repository.update_one(
+        {"name": "existing_task"}, {"$unset": {"time_limit_ms": ""}}
+    )
+
+    (_, update), _ = mock_collection.find_one_and_update.call_args
+    assert update == {"$unset": {"time_limit_ms": ""}, "$inc": {"version": 1}}
+    with pytest.raises(ValueError):
+        await task_repository.update_one(
+            {"name": "existing_task"}, {"$unset": {"input": ""}, "output": ""}
+        )
 
 
 @pytest.mark.asyncio
 async def test_update_task_not_found(task_repository):
     mock_collection = await task_repository.db_client.get_collection("tasks")
-    mock_collection.update_one.return_value = MagicMock(matched_count=0)
+    mock_collection.find_one_and_update.return_value = None
 
     with pytest.raises(TaskNotFound):
         await task_repository.update_one(
@@ -137,6 +159,21 @@ async def test_update_task_not_found(task_repository):
         )
 
 
+@pytest.mark.asyncio
+async def test_update_task_at_another_version_conflicts(task_repository):
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    mock_collection.find_one_and_update.return_value = None
+    mock_collection.count_documents.return_value = 1
+
+    with pytest.raises(TaskVersionConflict):
+        await task_repository.update_one(
+            {"name": "existing_task"}, {"description": "new"}, expected_version=3
+        )
+
+    (query, _), _ = mock_collection.find_one_and_update.call_args
+    assert query == {"name": "existing_task", "version": 3}
+
+
 @pytest.mark.asyncio
 async def test_delete_task_success(task_repository):
     mock_collection = await task_repository.db_client.get_collection("tasks")
@@ -154,3 +191,137 @@ async def test_delete_task_not_found(task_repository):
 
     with pytest.raises(TaskNotFound):
         await task_repository.delete_one({"name": "non_existent_task"})
+
+
+@pytest.mark.asyncio
+async def test_create_duplicate_task_raises_already_exists(task_repository):
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    mock_collection.insert_one.side_effect = errors.DuplicateKeyError(
+        "E11000 duplicate key error",
+        11000,
+        {"code": 11000, "keyValue": {"name": "test_task"}},
+    )
+
+    with pytest.raises(TaskAlreadyExists, match="test_task"):
+        await task_repository.add_one({"name": "test_task"})
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_creates_only_missing_indexes(task_repository):
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    mock_collection.index_information.return_value = {"_id_": {}}
+
+    assert await task_repository.missing_indexes() == ["name_unique"]
+    assert await task_repository.ensure_indexes() == []
+
+    (created,), _ = mock_collection.create_indexes.call_args
+    assert [index.document["name"] for index in created] == ["name_unique"]
+    assert created[0].document["unique"] is True
+
+    mock_collection.index_information.return_value = {"_id_": {}, "name_unique": {}}
+    mock_collection.create_indexes.reset_mock()
+    assert await task_repository.ensure_indexes() == []
+    mock_collection.create_indexes.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_ensure_indexes_reports_indexes_that_cannot_be_built(task_repository):
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    mock_collection.index_information.return_value = {"_id_": {}}
+    mock_collection.create_indexes.side_effect = errors.OperationFailure(
+        "E11000 duplicate key error", 11000
+    )
+
+    assert await ensure_indexes([task_repository]) == 1
+
+
+@pytest.mark.asyncio
+async def test_find_page_continues_after_the_cursor(task_repository):
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.limit.return_value = mock_cursor
+    mock_cursor.to_list = AsyncMock(return_value=[{"name": "b"}])
+    mock_collection.find.return_value = mock_cursor
+
+    result = await task_repository.find_page(
+        2, after="a", projection={"test_cases": False}
+    )
+
+    assert result == [{"name": "b"}]
+    mock_collection.find.assert_called_once_with(
+        {"name": {"$gt": "a"}}, {"test_cases": False}
+    )
+    mock_cursor.sort.assert_called_once_with("name", 1)
+    mock_cursor.limit.assert_called_once_with(2)
+
+
+@pytest.mark.asyncio
+async def test_iter_all_streams_the_cursor_in_batches(task_repository):
+    async def documents():
+        for name in ("a", "b"):
+            yield {"name": name}
+
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    mock_cursor = MagicMock()
+    mock_cursor.sort.return_value = mock_cursor
+    mock_cursor.batch_size.return_value = documents()
+    mock_collection.find.return_value = mock_cursor
+
+    result = [doc async for doc in task_repository.iter_all(batch_size=100)]
+
+    assert result == [{"name": "a"}, {"name": "b"}]
+    mock_cursor.batch_size.assert_called_once_with(100)
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_reports_every_item_across_chunks(task_repository):
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    first_chunk = MagicMock(bulk_api_result={"upserted": [{"index": 0}]})
+    mock_collection.bulk_write.side_effect = [
+        first_chunk,
+        errors.BulkWriteError(
+            {
+                "upserted": [{"index": 0}],
+                "writeErrors": [{"index": 1, "code": 121, "errmsg": "invalid"}],
+            }
+        ),
+    ]
+    documents = [{"name": name} for name in ("a", "b", "a", "c", "d")]
+
+    results = await task_repository.bulk_upsert(documents, chunk_size=2)
+
+    assert [(r.index, r.key, r.status.value) for r in results] == [
+        (0, "a", "created"),
+        (1, "b", "updated"),
+        (2, "a", "failed"),
+        (3, "c", "created"),
+        (4, "d", "failed"),
+    ]
+    assert results[4].error == "invalid"
+    for call in mock_collection.bulk_write.call_args_list:
+        assert call.kwargs == {"ordered": False}
+        assert len(call.args[0]) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_increments_the_version_of_replaced_tasks(task_repository):
+    mock_collection = await task_repository.db_client.get_collection("tasks")
+    mock_collection.bulk_write.return_value = MagicMock(bulk_api_result={})
+
+    await task_repository.bulk_upsert([{"name": "a", "version": 0, "input": "$x"}])
+
+    (request,) = mock_collection.bulk_write.call_args.args[0]
+    assert isinstance(request, UpdateOne)
+    assert request._filter == {"name": "a"}
+    assert request._upsert is True
+    assert request._doc == [
+        {
+            "$replaceWith": {
+                "$mergeObjects": [
+                    {"$literal": {"name": "a", "input": "$x"}},
+                    {"version": {"$add": [{"$ifNull": ["$version", -1]}, 1]}},
+                ]
+            }
+        }
+    ]
@@ -0,0 +1,293 @@
+import threading
+import time
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, Mock, patch
+
+from app.api.v1.dependencies import get_task_service
+from app.core.config import settings
+from app.errors import task_errors
+from app.main import app
+from app.schemas.code import Language
+from app.schemas.submission import ExecutionOptions, TestCaseResult, Verdict
+from app.schemas.task import ExecutionBackendName, TaskSchema, TestCase
+from app.utils.languages import Build, build_cache
+from app.utils.task_runner import (
+    SandboxExecutor,
+    drain_iterator,
+    execution_backends,
+    iterate_in_sandbox_executor,
+    run_in_sandbox_executor,
+    split_round_robin,
+    stream_test_results,
+    stream_parallel_results,
+)
+
+RUN_BATCH = "app.utils.docker_backend.DockerBackend.run_batch"
+COMPILE = "app.utils.docker_backend.DockerBackend.compile"
+DOCKER = execution_backends[ExecutionBackendName.DOCKER]
+
+TASK = TaskSchema(
+    name="echo",
+    description="",
+    input="",
+    output="",
+    examples=[],
+    test_cases=[
+        {"input": "1", "expected_output": "1"},
+        {"input": "2", "expected_output": "2"},
+    ],
+)
+
+
+@pytest.fixture
+def task_service():
+    service = AsyncMock()
+    service.get_task_for_execution.return_value = TASK
+    app.dependency_overrides[get_task_service] = lambda: service
+    yield service
+    app.dependency_overrides.clear()
+
+
+def fake_test_batch(user_code, test_cases, max_failures=None, limits=None, build=None):
+    yield TestCaseResult(index=1, verdict=Verdict.ACCEPTED, output="1")
+    yield TestCaseResult(index=2, verdict=Verdict.WRONG_ANSWER, output="3")
+
+
+@pytest.mark.asyncio
+async def test_send_task_stream_pushes_each_test_case_then_summary(task_service):
+    with patch(RUN_BATCH, side_effect=fake_test_batch):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.post(
+                "/api/v1/tasks/send_task/echo/stream", json={"code": "print(1)"}
+            )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [
+        line.removeprefix("event: ")
+        for line in response.text.splitlines()
+        if line.startswith("event: ")
+    ]
+    assert events == ["start", "test_case", "test_case", "summary"]
+    assert '"summary":"1 out of 2 tests passed (50.00%)."' in response.text
+
+
+@pytest.mark.asyncio
+async def test_missing_test_cases_are_reported_as_server_errors(task_service):
+    task_service.get_task_for_execution.side_effect = task_errors.TestCaseSetNotFound(
+        "Test case set", {"hash": "abc"}
+    )
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/v1/tasks/send_task/echo", json={"code": "print(1)"}
+        )
+        stream = await client.post(
+            "/api/v1/tasks/send_task/echo/stream", json={"code": "print(1)"}
+        )
+
+    assert response.status_code == 500
+    assert response.json() == {"detail": "The test cases of task 'echo' are missing."}
+    assert stream.text == (
+        "event: error\n"
+        'data: {"detail": "The test cases of task \'echo\' are missing."}\n\n'
+    )
+
+
+def failing_iterator():
+    raise RuntimeError("no sandbox")
+
+
+@pytest.mark.asyncio
+async def test_errors_creating_the_iterator_reach_the_consumer():
+    with pytest.raises(RuntimeError, match="no sandbox"):
+        async for _ in iterate_in_sandbox_executor(failing_iterator):
+            pass
+
+
+def sleeping_test_batch(
+    user_code, test_cases, max_failures=None, limits=None, build=None
+):
+    """Sleeps for ``input`` seconds per case, passes when it matches the expectation."""
+    for idx, case in enumerate(test_cases, start=1):
+        time.sleep(float(case.input))
+        verdict = (
+            Verdict.ACCEPTED if case.expected_output == "ok" else Verdict.WRONG_ANSWER
+        )
+        yield TestCaseResult(index=idx, verdict=verdict, output=case.input)
+
+
+def test_split_round_robin_spreads_indices_over_groups():
+    assert split_round_robin(5, 2) == [[1, 3, 5], [2, 4]]
+    assert split_round_robin(2, 8) == [[1], [2]]
+
+
+@pytest.mark.asyncio
+async def test_parallel_results_keep_order_and_overlap():
+    delays = ["0.3", "0.05", "0.3", "0.05"]
+    test_cases = [TestCase(input=d, expected_output="ok") for d in delays]
+
+    with patch(RUN_BATCH, side_effect=sleeping_test_batch):
+        started = time.perf_counter()
+        results = [
+            r
+            async for r in stream_parallel_results(
+                DOCKER, "", test_cases, parallelism=4
+            )
+        ]
+        elapsed = time.perf_counter() - started
+
+    assert [(r.index, r.output) for r in results] == list(
+        zip(range(1, 5), delays, strict=True)
+    )
+    assert elapsed < 0.55
+
+
+@pytest.mark.asyncio
+async def test_parallel_results_apply_failure_limit_in_order():
+    test_cases = [
+        TestCase(input="0.2", expected_output="ok"),
+        TestCase(input="0.1", expected_output="bad"),
+        TestCase(input="0", expected_output="bad"),
+        TestCase(input="0", expected_output="ok"),
+    ]
+
+    with patch(RUN_BATCH, side_effect=sleeping_test_batch):
+        results = [
+            r
+            async for r in stream_parallel_results(
+                DOCKER, "", test_cases, max_failures=1, parallelism=4
+            )
+        ]
+
+    assert [r.verdict for r in results] == [
+        Verdict.ACCEPTED,
+        Verdict.WRONG_ANSWER,
+        Verdict.SKIPPED,
+        Verdict.SKIPPED,
+    ]
+
+
+@pytest.mark.asyncio
+async def test_code_that_does_not_compile_never_reaches_a_sandbox():
+    with patch(RUN_BATCH) as batch:
+        results = [r async for r in stream_test_results(TASK, "def f(:", cache=None)]
+
+    batch.assert_not_called()
+    assert [(r.index, r.verdict) for r in results] == [
+        (1, Verdict.COMPILATION_ERROR),
+        (2, Verdict.COMPILATION_ERROR),
+    ]
+    assert results[0].error.startswith("SyntaxError: invalid syntax (line 1")
+
+
+@pytest.mark.asyncio
+async def test_syntax_check_runs_off_the_event_loop():
+    loop_thread = threading.get_ident()
+    threads = []
+
+    def check_syntax(user_code):
+        threads.append(threading.get_ident())
+        return "SyntaxError"
+
+    with patch("app.utils.task_runner.check_syntax", side_effect=check_syntax):
+        results = [r async for r in stream_test_results(TASK, "print(", cache=None)]
+
+    assert threads and threads[0] != loop_thread
+    assert {r.verdict for r in results} == {Verdict.COMPILATION_ERROR}
+
+
+@pytest.mark.asyncio
+async def test_oversized_code_is_rejected(task_service):
+    code = "#" * (settings.MAX_CODE_LENGTH + 1)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            "/api/v1/tasks/send_task/echo", json={"code": code}
+        )
+
+    assert response.status_code == 422
+    task_service.get_task_for_execution.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_compiled_submission_is_built_once_for_all_sandboxes():
+    build_cache.clear()
+    batches = []
+
+    def fake_batch(user_code, test_cases, max_failures=None, limits=None, build=None):
+        batches.append(build)
+        return fake_test_batch(user_code, test_cases)
+
+    with (
+        patch(COMPILE, side_effect=lambda language, code: Build(language)) as compiler,
+        patch(RUN_BATCH, side_effect=fake_batch),
+    ):
+        for _ in range(2):
+            results = [
+                r
+                async for r in stream_test_results(
+                    TASK,
+                    "int main() {}",
+                    ExecutionOptions(parallel=True),
+                    cache=None,
+                    language=Language.CPP,
+                )
+            ]
+
+    compiler.assert_called_once()
+    assert len(batches) == 4 and len({id(build) for build in batches}) == 1
+    assert [r.verdict for r in results] == [Verdict.ACCEPTED] * 2
+
+
+@pytest.mark.asyncio
+async def test_compiler_errors_are_reported_for_every_test_case():
+    build_cache.clear()
+
+    with (
+        patch(
+            COMPILE,
+            side_effect=lambda language, code: Build(language, error="main.cpp: error"),
+        ),
+        patch(RUN_BATCH) as batch,
+    ):
+        results = [
+            r
+            async for r in stream_test_results(
+                TASK, "int main(", cache=None, language=Language.CPP
+            )
+        ]
+
+    batch.assert_not_called()
+    assert [(r.verdict, r.error) for r in results] == [
+        (Verdict.COMPILATION_ERROR, "main.cpp: error")
+    ] * 2
+
+
+@pytest.mark.asyncio
+async def test_sandbox_executor_runs_again_after_a_shutdown():
+    executor = SandboxExecutor(max_workers=1)
+    first = executor.get()
+
+    executor.shutdown()
+
+    assert executor.get() is not first
+    with patch("app.utils.task_runner.sandbox_executor", executor):
+        assert await run_in_sandbox_executor(sum, [1, 2]) == 3
+    executor.shutdown()
+
+
+def test_drain_iterator_skips_jobs_whose_consumer_is_gone():
+    stopped = threading.Event()
+    stopped.set()
+    factory, publish = Mock(), Mock()
+
+    drain_iterator(factory, publish, stopped)
+
+    factory.assert_not_called()
+    publish.assert_not_called()
@@ -0,0 +1,278 @@
+import json
+
+import httpx
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.api.v1.dependencies import get_task_service
+from app.core.config import settings
+from app.schemas.bulk import BulkItemResult, BulkItemStatus
+from app.core.metrics import metrics
+from app.main import app
+from app.schemas.task import TaskCreateSchema, TaskUpdateSchema, TestCase
+from app.services.task import TaskService, hash_test_cases
+from app.utils.cache import TTLCache
+
+TASK = {
+    "name": "echo",
+    "description": "",
+    "input": "",
+    "output": "",
+    "examples": [],
+    "test_cases": [{"input": "1", "expected_output": "1"}],
+}
+DIGEST = hash_test_cases([TestCase(input="1", expected_output="1")])
+STORED = {
+    **{key: value for key, value in TASK.items() if key != "test_cases"},
+    "test_cases_hash": DIGEST,
+}
+
+
+@pytest.fixture
+def repository():
+    repository = AsyncMock()
+    repository.find_one.return_value = STORED
+    repository.update_one.return_value = {**STORED, "description": "updated"}
+    repository.add_one.side_effect = lambda data: data
+    return repository
+
+
+@pytest.fixture
+def test_case_repository():
+    repository = AsyncMock()
+    repository.find_one.return_value = {"_id": DIGEST, "test_cases": TASK["test_cases"]}
+    repository.bulk_upsert.return_value = []
+    return repository
+
+
+@pytest.fixture
+def service(repository, test_case_repository):
+    return TaskService(
+        repository,
+        test_case_repository,
+        task_cache=TTLCache(name="test_task_cache", maxsize=8, ttl=60),
+        test_case_cache=TTLCache(name="test_test_case_cache", maxsize=8, ttl=60),
+    )
+
+
+@pytest.mark.asyncio
+async def test_hot_tasks_are_served_without_the_repository(service, repository):
+    for _ in range(3):
+        task = await service.get_task_by_name("echo")
+
+    assert task.name == "echo"
+    repository.find_one.assert_awaited_once_with(
+        {"name": "echo"}, projection={"test_cases": False}
+    )
+    assert service.task_cache.hit_ratio == pytest.approx(2 / 3)
+    assert metrics.get("test_task_cache_hit_ratio") == pytest.approx(2 / 3)
+
+
+@pytest.mark.asyncio
+async def test_writes_invalidate_the_cached_task(service, repository):
+    await service.get_task_by_name("echo")
+    await service.update_task("echo", TaskUpdateSchema(description="updated"))
+    await service.get_task_by_name("echo")
+
+    await service.delete_task("echo")
+    await service.get_task_by_name("echo")
+
+    await service.create_task(TaskCreateSchema(**TASK))
+    await service.get_task_by_name("echo")
+
+    assert repository.find_one.await_count == 4
+
+
+@pytest.mark.asyncio
+async def test_task_list_is_paginated_and_projected(service, repository):
+    repository.find_page.return_value = [
+        {"name": "a", "description": "first"},
+        {"name": "b", "description": "second"},
+        {"name": "c", "description": "third"},
+    ]
+    app.dependency_overrides[get_task_service] = lambda: service
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get(
+                "/api/v1/tasks/",
+                params={"limit": 2, "after": "0", "fields": "description"},
+            )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "items": [
+            {"name": "a", "description": "first"},
+            {"name": "b", "description": "second"},
+        ],
+        "next_after": "b",
+    }
+    repository.find_page.assert_awaited_once_with(
+        3,
+        after="0",
+        projection={"_id": False, "name": True, "description": True},
+    )
+
+
+@pytest.mark.asyncio
+async def test_task_list_hides_test_cases_by_default(service, repository):
+    repository.find_page.return_value = [
+        {k: v for k, v in TASK.items() if k != "test_cases"}
+    ]
+
+    page = await service.get_tasks_page(limit=2)
+
+    assert page.next_after is None
+    assert page.items[0].name == "echo"
+    _, kwargs = repository.find_page.call_args
+    assert kwargs["projection"] == {
+        "_id": False,
+        "test_cases": False,
+        "test_cases_hash": False,
+    }
+
+
+@pytest.mark.asyncio
+async def test_export_streams_tasks_as_ndjson(
+    service, repository, test_case_repository
+):
+    async def iter_all(filter_query, projection, batch_size):
+        yield {"name": "a", "test_cases": []}
+        yield {"name": "b", "test_cases_hash": DIGEST}
+
+    repository.iter_all = MagicMock(side_effect=iter_all)
+    test_case_repository.find_all.return_value = [
+        {"_id": DIGEST, "test_cases": TASK["test_cases"]}
+    ]
+    app.dependency_overrides[get_task_service] = lambda: service
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get("/api/v1/tasks/export", params={"after": "0"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["name"] for line in lines] == ["a", "b"]
+    assert lines[1] == {
+        "name": "b",
+        "test_cases": [{"input": "1", "expected_output": "1"}],
+    }
+    test_case_repository.find_all.assert_awaited_once_with({"_id": {"$in": [DIGEST]}})
+    repository.iter_all.assert_called_once_with(
+        {"name": {"$gt": "0"}}, {"_id": False}, settings.TASK_EXPORT_BATCH_SIZE
+    )
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_reports_counts_and_invalidates_tasks(service, repository):
+    repository.bulk_upsert.return_value = [
+        BulkItemResult(index=0, key="echo", status=BulkItemStatus.UPDATED),
+        BulkItemResult(index=1, key="new", status=BulkItemStatus.CREATED),
+    ]
+    await service.get_task_by_name("echo")
+
+    report = await service.upsert_many_tasks(
+        [TaskCreateSchema(**TASK), TaskCreateSchema(**{**TASK, "name": "new"})]
+    )
+    await service.get_task_by_name("echo")
+
+    assert (report.created, report.updated, report.failed) == (1, 1, 0)
+    assert repository.find_one.await_count == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_upsert_skips_tasks_whose_test_cases_failed(
+    service, repository, test_case_repository
+):
+    big = TaskCreateSchema(
+        **{**TASK, "name": "big", "test_cases": [{"input": "2", "expected_output": ""}]}
+    )
+    test_case_repository.bulk_upsert.return_value = [
+        BulkItemResult(
+            index=1,
+            key=hash_test_cases(big.test_cases),
+            status=BulkItemStatus.FAILED,
+            error="document too large",
+        )
+    ]
+    repository.bulk_upsert.return_value = [
+        BulkItemResult(index=0, key="new", status=BulkItemStatus.CREATED)
+    ]
+
+    report = await service.upsert_many_tasks(
+        [big, TaskCreateSchema(**{**TASK, "name": "new"})]
+    )
+
+    assert [(item.index, item.key, item.status) for item in report.items] == [
+        (0, "big", BulkItemStatus.FAILED),
+        (1, "new", BulkItemStatus.CREATED),
+    ]
+    (documents,), _ = repository.bulk_upsert.call_args
+    assert [document["name"] for document in documents] == ["new"]
+    assert documents[0]["test_cases_hash"] == DIGEST
+
+
+@pytest.mark.asyncio
+async def test_test_cases_are_stored_apart_by_content_hash(
+    service, repository, test_case_repository
+):
+    await service.create_task(TaskCreateSchema(**TASK, version=5))
+
+    test_case_repository.upsert_one.assert_awaited_once_with(
+        {"_id": DIGEST}, {"_id": DIGEST, "test_cases": TASK["test_cases"]}
+    )
+    (document,), _ = repository.add_one.call_args
+    assert document["test_cases_hash"] == DIGEST
+    assert "test_cases" not in document and "version" not in document
+
+
+@pytest.mark.asyncio
+async def test_execution_loads_test_cases_once_per_hash(service, test_case_repository):
+    for _ in range(2):
+        task = await service.get_task_for_execution("echo")
+
+    assert task.test_cases == [TestCase(input="1", expected_output="1")]
+    assert task.test_cases_hash == DIGEST
+    test_case_repository.find_one.assert_awaited_once_with({"_id": DIGEST})
+
+
+@pytest.mark.asyncio
+async def test_inline_test_cases_of_older_tasks_are_still_loaded(
+    service, repository, test_case_repository
+):
+    repository.find_one.return_value = TASK
+
+    task = await service.get_task_for_execution("echo")
+
+    assert task.test_cases == [TestCase(input="1", expected_output="1")]
+    repository.find_one.assert_awaited_with(
+        {"name": "echo"}, projection={"test_cases": True}
+    )
+    test_case_repository.find_one.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_public_task_view_has_examples_but_no_test_cases(service):
+    app.dependency_overrides[get_task_service] = lambda: service
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url="http://test"
+        ) as client:
+            response = await client.get("/api/v1/tasks/echo")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["examples"] == []
+    assert "test_cases" not in body and "test_cases_hash" not in body
@@ -16,7 +16,7 @@ import {
 import CodeMirror from "@uiw/react-codemirror";
 import {python} from "@codemirror/lang-python";
 import {Brightness4, Brightness7} from "@mui/icons-material";
-import {fetchTasks, fetchTaskDetails, executeTask} from "./api";
+import {fetchTasks, fetchTaskDetails, executeTaskStream} from "./api";
 import {dracula} from "@uiw/codemirror-theme-dracula";
 import {githubLight} from "@uiw/codemirror-theme-github";
 import ResultCard from "./ResultCard";
@@ -89,8 +89,21 @@ const CodeExecutor = ({toggleTheme, theme}) => {
         setResult("");
 
         try {
-            const result = await executeTask(taskName, code);
-            setResult(result);
+            let total = 0;
+            let passed = 0;
+            await executeTaskStream(taskName, code, (event, data) => {
+                if (event === "start") {
+                    total = data.total;
+                } else if (event === "test_case") {
+                    if (data.verdict === "ACCEPTED") passed += 1;
+                    const percentage = ((passed / total) * 100).toFixed(2);
+                    setResult(`${passed} out of ${total} tests passed (${percentage}%).`);
+                } else if (event === "summary") {
+                    setResult(data.summary);
+                } else if (event === "error") {
+                    setResult("Error executing code");
+                }
+            });
         } catch (error) {
             console.error("Error executing code:", error);
             setResult("Error executing code");
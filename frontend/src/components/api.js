@@ -16,3 +16,34 @@ export const executeTask = async (taskName, code) => {
     const response = await axios.post(`${BASE_URL}send_task/${taskName}`, {code});
     return response.data.result;
 };
+
+export const executeTaskStream = async (taskName, code, onEvent) => {
+    const response = await fetch(`${BASE_URL}send_task/${taskName}/stream`, {
+        method: "POST",
+        headers: {"Content-Type": "application/json"},
+        body: JSON.stringify({code}),
+    });
+    if (!response.ok) {
+        throw new Error(`Request failed with status ${response.status}`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = "";
+
+    while (true) {
+        const {done, value} = await reader.read();
+        if (done) break;
+        buffer += decoder.decode(value, {stream: true});
+
+        const messages = buffer.split("\n\n");
+        buffer = messages.pop();
+        for (const message of messages) {
+            const event = message.match(/^event: (.*)$/m);
+            const data = message.match(/^data: (.*)$/m);
+            if (event && data) {
+                onEvent(event[1], JSON.parse(data[1]));
+            }
+        }
+    }
+};